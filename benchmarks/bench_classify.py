@@ -0,0 +1,89 @@
+"""Benchmark config classification: full parse vs. header-only streaming.
+
+Usage::
+
+    python benchmarks/bench_classify.py [--files N] [--steps N]
+
+Builds a throwaway flat configs directory with ``--files`` small configs
+plus one generated protocol of ``--steps`` steps, then times classifying
+every file both ways with the same YAML loader (libyaml's when PyYAML
+was built with it, as in ``classify_config_file``):
+
+- a full parse + ``classify_config``, i.e. the old ``list_configs`` path;
+- the header-only ``classify_config_file``.
+
+Every file is timed once per method, so the big protocol's time is part
+of the total rather than a separate run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from zoo.services.yaml_io import classify_config, classify_config_file
+
+# The loader classify_config_file parses with, so both sides compare alike.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_SMALL_CONFIGS = [
+    {"labware": {"plate_1": {"type": "well_plate", "rows": 8, "columns": 12}}},
+    {"instruments": {"pipette": {"type": "pipette", "offset_x": 0.0, "offset_y": 0.0}}},
+    {"serial_port": "", "working_volume": {"x_min": 0, "x_max": 300, "y_min": 0,
+                                           "y_max": 200, "z_min": -80, "z_max": 0}},
+]
+
+
+def _build_dir(root: Path, files: int, steps: int) -> None:
+    for i in range(files):
+        with (root / f"config_{i}.yaml").open("w") as f:
+            yaml.safe_dump(_SMALL_CONFIGS[i % len(_SMALL_CONFIGS)], f)
+    with (root / "big_protocol.yaml").open("w") as f:
+        f.write("protocol:\n")
+        for i in range(steps):
+            f.write(f"- aspirate: {{position: plate_1.A{i % 12 + 1}, volume_ul: 10.0}}\n")
+
+
+def _time(fn, paths) -> dict:
+    """Seconds per path."""
+    times = {}
+    for p in paths:
+        start = time.perf_counter()
+        fn(p)
+        times[p] = time.perf_counter() - start
+    return times
+
+
+def _full_parse(path: Path) -> None:
+    with path.open() as f:
+        classify_config(yaml.load(f, Loader=_Loader) or {})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--steps", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        _build_dir(root, args.files, args.steps)
+        paths = sorted(root.glob("*.yaml"))
+        big = root / "big_protocol.yaml"
+        size_mb = big.stat().st_size / 1e6
+
+        print(f"{args.files} small configs + {args.steps}-step protocol ({size_mb:.1f} MB), "
+              f"loader {_Loader.__name__}")
+        for label, fn in (("full parse + classify_config", _full_parse),
+                          ("classify_config_file", classify_config_file)):
+            times = _time(fn, paths)
+            print(f"  {label:<29} all files {sum(times.values()) * 1e3:9.1f} ms"
+                  f"   of which big protocol {times[big] * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,13 @@ import DeckEditor from "./components/editor/DeckEditor";
 import BoardEditor from "./components/editor/BoardEditor";
 import GantryEditor from "./components/editor/GantryEditor";
 import ProtocolEditor from "./components/editor/ProtocolEditor";
-import { settingsApi, deckApi, protocolApi } from "./api/client";
+import { settingsApi, deckApi } from "./api/client";
+import { loadSelection, saveSelection } from "./api/workspace";
 import { useDeckConfigs, useDeck, useSaveDeck } from "./hooks/useDeck";
 import { useBoardConfigs, useBoard, useSaveBoard, useInstrumentTypes, useInstrumentSchemas } from "./hooks/useBoard";
 import { useGantryPosition, useGantryConfigs, useGantry, useSaveGantry } from "./hooks/useGantryPosition";
-import { useProtocolCommands, useProtocolConfigs, useProtocol, useSaveProtocol, useValidateProtocol } from "./hooks/useProtocol";
+import { useConfigEvents } from "./hooks/useConfigEvents";
+import { useProtocolCommands, useProtocolConfigs, useProtocol, useSaveProtocol, useValidateProtocol, useProtocolRun } from "./hooks/useProtocol";
 import type { DeckResponse, WellPosition, ProtocolValidationResponse, WorkingVolume } from "./types";
 
 export default function App() {
@@ -22,14 +24,19 @@ export default function App() {
   const [pandaCorePath, setPandaCorePath] = useState<string | null>(null);
   const [browseLoading, setBrowseLoading] = useState(false);
 
-  const [deckFile, setDeckFile] = useState<string | null>(null);
-  const [boardFile, setBoardFile] = useState<string | null>(null);
-  const [gantryFile, setGantryFile] = useState<string | null>(null);
-  const [protocolFile, setProtocolFile] = useState<string | null>(null);
+  const [selection] = useState(loadSelection);
+  const [deckFile, setDeckFile] = useState<string | null>(selection.deck ?? null);
+  const [boardFile, setBoardFile] = useState<string | null>(selection.board ?? null);
+  const [gantryFile, setGantryFile] = useState<string | null>(selection.gantry ?? null);
+  const [protocolFile, setProtocolFile] = useState<string | null>(selection.protocol ?? null);
   const [validationResult, setValidationResult] = useState<ProtocolValidationResponse | null>(null);
-  const [runResult, setRunResult] = useState<{ status: string; steps_executed: number } | null>(null);
-  const [runError, setRunError] = useState<string | null>(null);
-  const [isRunning, setIsRunning] = useState(false);
+  const protocolRun = useProtocolRun();
+  useConfigEvents();
+
+  // Remembered so the next start can prime these files from one snapshot.
+  React.useEffect(() => {
+    saveSelection({ gantry: gantryFile, deck: deckFile, board: boardFile, protocol: protocolFile });
+  }, [gantryFile, deckFile, boardFile, protocolFile]);
 
   // Load current PANDA_CORE path on mount
   React.useEffect(() => {
@@ -62,7 +69,7 @@ export default function App() {
   const gantryConfigs = useGantryConfigs();
   const gantryQuery = useGantry(gantryFile);
   const saveGantry = useSaveGantry(gantryFile ?? "");
-  const gantryPosition = useGantryPosition(!isRunning);
+  const gantryPosition = useGantryPosition();
 
   const protocolCommands = useProtocolCommands();
   const protocolConfigs = useProtocolConfigs();
@@ -73,6 +80,8 @@ export default function App() {
   const [localDeck, setLocalDeck] = useState<DeckResponse | null>(null);
   const [previewWells, setPreviewWells] = useState<Record<string, Record<string, WellPosition>>>({});
   const previewTimerRef = useRef<ReturnType<typeof setTimeout> | undefined>(undefined);
+  // Preview results by plate config, so editing one plate only re-fetches that plate.
+  const previewCacheRef = useRef(new Map<string, Record<string, WellPosition>>());
 
   // Compute well positions via PANDA_CORE when user edits a deck locally.
   React.useEffect(() => {
@@ -82,16 +91,26 @@ export default function App() {
     }
     clearTimeout(previewTimerRef.current);
     previewTimerRef.current = setTimeout(async () => {
+      const cache = previewCacheRef.current;
       const result: Record<string, Record<string, WellPosition>> = {};
-      for (const item of localDeck.labware) {
-        if (item.config.type === "well_plate") {
-          try {
-            result[item.key] = await deckApi.previewWells(item.config);
-          } catch {
-            // Config may be incomplete during editing — skip.
+      await Promise.all(
+        localDeck.labware.map(async (item) => {
+          if (item.config.type !== "well_plate") return;
+          const key = JSON.stringify(item.config);
+          let wells = cache.get(key);
+          if (!wells) {
+            try {
+              wells = await deckApi.previewWells(item.config);
+            } catch {
+              // Config may be incomplete during editing — skip.
+              return;
+            }
+            cache.set(key, wells);
+            if (cache.size > 64) cache.delete(cache.keys().next().value!);
           }
-        }
-      }
+          result[item.key] = wells;
+        }),
+      );
       setPreviewWells(result);
     }, 300);
     return () => clearTimeout(previewTimerRef.current);
@@ -127,26 +146,26 @@ export default function App() {
     setLocalDeck(null);
   };
 
-  const handleRunProtocol = async () => {
+  const handleRunProtocol = () => {
     if (!gantryFile || !deckFile || !boardFile || !protocolFile) return;
-    setIsRunning(true);
-    setRunResult(null);
-    setRunError(null);
-    try {
-      const result = await protocolApi.run({
-        gantry_file: gantryFile,
-        deck_file: deckFile,
-        board_file: boardFile,
-        protocol_file: protocolFile,
-      });
-      setRunResult(result);
-    } catch (err: unknown) {
-      setRunError(err instanceof Error ? err.message : String(err));
-    } finally {
-      setIsRunning(false);
-    }
+    protocolRun.start({
+      gantry_file: gantryFile,
+      deck_file: deckFile,
+      board_file: boardFile,
+      protocol_file: protocolFile,
+    });
   };
 
+  const run = protocolRun.run;
+  const runResult = run?.status === "done" ? { status: "ok", steps_executed: run.steps_completed } : null;
+  const runError =
+    protocolRun.error ??
+    (run?.status === "failed"
+      ? `Execution failed: ${run.error}`
+      : run?.status === "cancelled"
+        ? `Cancelled after ${run.steps_completed} of ${run.total_steps} steps.`
+        : null);
+
   const left = (
     <div>
       <div style={{ marginBottom: 16 }}>
@@ -246,7 +265,9 @@ export default function App() {
           isValidating={validateProtocol.isPending}
           onRefresh={refreshAll}
           onRun={handleRunProtocol}
-          isRunning={isRunning}
+          onCancelRun={protocolRun.cancel}
+          isRunning={protocolRun.isRunning}
+          runProgress={protocolRun.isRunning && run ? { completed: run.steps_completed, total: run.total_steps } : null}
           runResult={runResult}
           runError={runError}
         />
@@ -1,5 +1,13 @@
+import { decodeBinaryDeck } from "./deckPayload";
+
 const BASE = "/api";
 
+/** Absolute ws:// or wss:// URL for an API path on the current host. */
+export function wsUrl(path: string): string {
+  const proto = window.location.protocol === "https:" ? "wss:" : "ws:";
+  return `${proto}//${window.location.host}${BASE}${path}`;
+}
+
 async function request<T>(path: string, init?: RequestInit): Promise<T> {
   const res = await fetch(`${BASE}${path}`, {
     headers: { "Content-Type": "application/json" },
@@ -12,16 +20,34 @@ async function request<T>(path: string, init?: RequestInit): Promise<T> {
   return res.json();
 }
 
+/** RFC 7396 merge patch: `null` removes a key, objects merge recursively. */
+function mergePatch<T>(path: string, patch: unknown): Promise<T> {
+  return request<T>(path, {
+    method: "PATCH",
+    headers: { "Content-Type": "application/merge-patch+json" },
+    body: JSON.stringify(patch),
+  });
+}
+
 // Deck
 export const deckApi = {
   listConfigs: () => request<string[]>("/deck/configs"),
-  get: (filename: string) =>
-    request<import("../types").DeckResponse>(`/deck/${filename}`),
+  get: async (filename: string) => {
+    // Packed float32 wells: a fraction of the JSON size and no per-well parsing.
+    const res = await fetch(`${BASE}/deck/${filename}?format=binary`);
+    if (!res.ok) {
+      const text = await res.text();
+      throw new Error(`${res.status}: ${text}`);
+    }
+    return decodeBinaryDeck(await res.arrayBuffer());
+  },
   put: (filename: string, body: import("../types").DeckConfig) =>
     request<import("../types").DeckResponse>(`/deck/${filename}`, {
       method: "PUT",
       body: JSON.stringify(body),
     }),
+  patch: (filename: string, patch: Record<string, unknown>) =>
+    mergePatch<import("../types").DeckPatchResponse>(`/deck/${filename}`, patch),
   previewWells: (config: import("../types").WellPlateConfig) =>
     request<Record<string, import("../types").WellPosition>>("/deck/preview-wells", {
       method: "POST",
@@ -38,6 +64,7 @@ export const boardApi = {
     request<import("../types").PipetteModelInfo[]>("/board/pipette-models"),
   getInstrumentSchemas: () =>
     request<import("../types").InstrumentSchemas>("/board/instrument-schemas"),
+  getCatalogue: () => request<import("../types").BoardCatalogue>("/board/catalogue"),
   get: (filename: string) =>
     request<import("../types").BoardResponse>(`/board/${filename}`),
   put: (filename: string, body: import("../types").BoardConfig) =>
@@ -45,6 +72,8 @@ export const boardApi = {
       method: "PUT",
       body: JSON.stringify(body),
     }),
+  patch: (filename: string, patch: Record<string, unknown>) =>
+    mergePatch<import("../types").BoardPatchResponse>(`/board/${filename}`, patch),
 };
 
 // Gantry
@@ -77,10 +106,20 @@ export const gantryApi = {
       method: "POST",
     }),
   moveTo: (x: number, y: number, z: number) =>
-    request<{ status: string }>("/gantry/move-to", {
+    request<import("../types").MoveJob>("/gantry/move-to", {
       method: "POST",
       body: JSON.stringify({ x, y, z }),
     }),
+  getMove: (jobId: string) =>
+    request<import("../types").MoveJob>(`/gantry/moves/${jobId}`),
+  cancelMove: (jobId: string) =>
+    request<import("../types").MoveJob>(`/gantry/moves/${jobId}`, {
+      method: "DELETE",
+    }),
+  flushMoves: () =>
+    request<import("../types").MoveJob[]>("/gantry/moves/flush", {
+      method: "POST",
+    }),
   unlock: () =>
     request<import("../types").GantryPosition>("/gantry/unlock", {
       method: "POST",
@@ -99,6 +138,11 @@ export const protocolApi = {
       method: "PUT",
       body: JSON.stringify(body),
     }),
+  patch: (filename: string, ops: import("../types").StepOperation[]) =>
+    request<import("../types").ProtocolPatchResponse>(`/protocol/${filename}`, {
+      method: "PATCH",
+      body: JSON.stringify({ ops }),
+    }),
   validate: (body: import("../types").ProtocolConfig) =>
     request<import("../types").ProtocolValidationResponse>(
       "/protocol/validate",
@@ -107,16 +151,25 @@ export const protocolApi = {
         body: JSON.stringify(body),
       },
     ),
-  run: (body: {
-    gantry_file: string;
-    deck_file: string;
-    board_file: string;
-    protocol_file: string;
-  }) =>
-    request<{ status: string; steps_executed: number }>("/protocol/run", {
+  validateIncremental: (body: import("../types").IncrementalValidationRequest) =>
+    request<import("../types").IncrementalValidationResponse>(
+      "/protocol/validate/incremental",
+      {
+        method: "POST",
+        body: JSON.stringify(body),
+      },
+    ),
+  run: (body: import("../types").RunProtocolRequest) =>
+    request<import("../types").ProtocolRun>("/protocol/run", {
       method: "POST",
       body: JSON.stringify(body),
     }),
+  listRuns: () => request<import("../types").ProtocolRun[]>("/protocol/runs"),
+  cancelRun: (runId: string) =>
+    request<import("../types").ProtocolRun>(`/protocol/runs/${runId}/cancel`, {
+      method: "POST",
+    }),
+  runEvents: (runId: string) => new EventSource(`${BASE}/protocol/runs/${runId}/events`),
 };
 
 // Settings
@@ -133,6 +186,27 @@ export const settingsApi = {
     }),
 };
 
+// Config change events (SSE)
+export const eventsApi = {
+  configEvents: () => new EventSource(`${BASE}/events`),
+};
+
+// Workspace snapshot
+export const workspaceApi = {
+  /** `have` maps part names to ETags already held; those parts come back without data. */
+  get: (
+    files: Partial<Record<"gantry" | "deck" | "board" | "protocol", string>>,
+    have: Record<string, string> = {},
+  ) => {
+    const params = new URLSearchParams();
+    for (const [kind, filename] of Object.entries(files)) {
+      if (filename) params.append(kind, filename);
+    }
+    for (const [part, etag] of Object.entries(have)) params.append("have", `${part}:${etag}`);
+    return request<import("../types").WorkspaceResponse>(`/workspace?${params}`);
+  },
+};
+
 // Raw YAML
 export const rawApi = {
   get: (filename: string) =>
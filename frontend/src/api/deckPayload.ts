@@ -0,0 +1,46 @@
+import type { DeckResponse, LabwareConfig, WellPosition } from "../types";
+
+interface BinaryHeader {
+  filename: string;
+  well_ids: string[][];
+  labware: {
+    key: string;
+    config: LabwareConfig;
+    wells: { ids: number; offset: number; count: number } | null;
+  }[];
+}
+
+/**
+ * Decode the `format=binary` deck payload: "ZDK1", uint32 header length,
+ * header JSON, padding to 4 bytes, then per plate float32 x[], y[], z[].
+ */
+export function decodeBinaryDeck(buffer: ArrayBuffer): DeckResponse {
+  const view = new DataView(buffer);
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== "ZDK1") throw new Error("Not a binary deck payload");
+  const headerLength = view.getUint32(4, true);
+  const header: BinaryHeader = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)),
+  );
+  const dataStart = 8 + headerLength + ((4 - ((8 + headerLength) % 4)) % 4);
+
+  return {
+    filename: header.filename,
+    labware: header.labware.map(({ key, config, wells }) => {
+      if (!wells) return { key, config, wells: null };
+      const { offset, count } = wells;
+      const ids = header.well_ids[wells.ids];
+      const cols = new Float32Array(buffer, dataStart + offset, count * 3);
+      const positions: Record<string, WellPosition> = {};
+      for (let i = 0; i < count; i++) {
+        // float32 → 3 decimals, matching the JSON format.
+        positions[ids[i]] = {
+          x: Math.round(cols[i] * 1000) / 1000,
+          y: Math.round(cols[count + i] * 1000) / 1000,
+          z: Math.round(cols[2 * count + i] * 1000) / 1000,
+        };
+      }
+      return { key, config, wells: positions };
+    }),
+  };
+}
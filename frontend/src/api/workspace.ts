@@ -0,0 +1,123 @@
+import type { QueryClient, QueryKey } from "@tanstack/react-query";
+import { workspaceApi } from "./client";
+import type {
+  BoardCatalogue,
+  BoardResponse,
+  CommandInfo,
+  DeckResponse,
+  GantryResponse,
+  ProtocolResponse,
+  WorkspacePart,
+} from "../types";
+
+type Kind = "gantry" | "deck" | "board" | "protocol";
+export type Selection = Partial<Record<Kind, string>>;
+type ConfigListings = Record<Kind, string[]>;
+
+const KINDS: Kind[] = ["gantry", "deck", "board", "protocol"];
+const SELECTION_KEY = "zoo.selection";
+const HELD_KEY = "zoo.workspace";
+// How long primed data counts as fresh, so the components that mount right
+// after don't refetch it. Saves and config events still invalidate it.
+const PRIMED_FRESH_MS = 2_000;
+
+/** A part from an earlier snapshot; `file` is the document it was for, if any. */
+interface HeldPart {
+  etag: string;
+  data: unknown;
+  file?: string;
+}
+
+function readJson<T>(key: string, fallback: T): T {
+  try {
+    const text = localStorage.getItem(key);
+    return text ? (JSON.parse(text) as T) : fallback;
+  } catch {
+    return fallback;
+  }
+}
+
+function writeJson(key: string, value: unknown): void {
+  try {
+    localStorage.setItem(key, JSON.stringify(value));
+  } catch {
+    // Storage full or unavailable: the next start just fetches everything.
+  }
+}
+
+/** The gantry/deck/board/protocol files selected when the app was last open. */
+export function loadSelection(): Selection {
+  return readJson<Selection>(SELECTION_KEY, {});
+}
+
+export function saveSelection(files: Partial<Record<Kind, string | null>>): void {
+  const selection: Selection = {};
+  for (const kind of KINDS) if (files[kind]) selection[kind] = files[kind]!;
+  writeJson(SELECTION_KEY, selection);
+}
+
+/** Mark *key* fresh for a moment; afterwards it goes back to the client's defaults. */
+function prime(qc: QueryClient, key: QueryKey, data: unknown): void {
+  qc.setQueryData(key, data);
+  qc.setQueryDefaults(key, { staleTime: PRIMED_FRESH_MS });
+  setTimeout(() => qc.setQueryDefaults(key, {}), PRIMED_FRESH_MS);
+}
+
+/**
+ * Fill the query cache from one `/api/workspace` request, so the listing,
+ * catalogue and document queries the app mounts with don't each go to the
+ * server. The persisted selection is requested, and parts held from the
+ * last snapshot are sent as `have`, so unchanged parts come back as just
+ * their ETag. Failed parts are left for their own queries to fetch (and
+ * report); a selected file that no longer exists is dropped from the
+ * selection.
+ */
+export async function primeFromWorkspace(
+  qc: QueryClient,
+  files: Selection = loadSelection(),
+): Promise<void> {
+  const held = readJson<Record<string, HeldPart>>(HELD_KEY, {});
+  const have: Record<string, string> = {};
+  for (const [part, entry] of Object.entries(held)) {
+    if (entry.file === undefined || entry.file === files[part as Kind]) have[part] = entry.etag;
+  }
+
+  const { parts } = await workspaceApi.get(files, have);
+  const data: Record<string, unknown> = {};
+  for (const [name, part] of Object.entries(parts) as [string, WorkspacePart][]) {
+    if (part.unchanged && held[name]) {
+      data[name] = held[name].data;
+    } else if (part.data !== undefined && part.etag) {
+      data[name] = part.data;
+      held[name] = { etag: part.etag, data: part.data, file: files[name as Kind] };
+    } else {
+      delete held[name];
+    }
+  }
+  writeJson(HELD_KEY, held);
+
+  const configs = data.configs as ConfigListings | undefined;
+  if (configs) {
+    for (const [kind, names] of Object.entries(configs)) prime(qc, [kind, "configs"], names);
+  }
+  if (data.commands) prime(qc, ["protocol", "commands"], data.commands as CommandInfo[]);
+  if (data.board_catalogue) {
+    prime(qc, ["board", "catalogue"], data.board_catalogue as BoardCatalogue);
+  }
+  const documents: [Kind, unknown][] = [
+    ["gantry", data.gantry as GantryResponse | undefined],
+    ["deck", data.deck as DeckResponse | undefined],
+    ["board", data.board as BoardResponse | undefined],
+    ["protocol", data.protocol as ProtocolResponse | undefined],
+  ];
+  for (const [kind, doc] of documents) {
+    if (doc && files[kind]) prime(qc, [kind, files[kind]], doc);
+  }
+
+  const missing = KINDS.filter((kind) => files[kind] && parts[kind]?.status === 404);
+  if (missing.length) {
+    const selection = { ...files };
+    for (const kind of missing) delete selection[kind];
+    saveSelection(selection);
+  }
+}
@@ -15,7 +15,9 @@ interface Props {
   isValidating: boolean;
   onRefresh: () => void;
   onRun: () => void;
+  onCancelRun: () => void;
   isRunning: boolean;
+  runProgress: { completed: number; total: number } | null;
   runResult: { status: string; steps_executed: number } | null;
   runError: string | null;
 }
@@ -54,7 +56,9 @@ export default function ProtocolEditor({
   validationErrors,
   isValidating,
   onRun,
+  onCancelRun,
   isRunning,
+  runProgress,
   runResult,
   runError,
 }: Props) {
@@ -207,8 +211,17 @@ export default function ProtocolEditor({
               Save
             </button>
             <button onClick={onRun} disabled={isRunning || !hasSteps} style={runBtnStyle}>
-              {isRunning ? "Running..." : "Run Protocol"}
+              {isRunning
+                ? runProgress
+                  ? `Running ${runProgress.completed}/${runProgress.total}...`
+                  : "Running..."
+                : "Run Protocol"}
             </button>
+            {isRunning && (
+              <button onClick={onCancelRun} style={validateBtnStyle}>
+                Cancel
+              </button>
+            )}
           </div>
 
           {validationErrors !== null && validationErrors.length === 0 && (
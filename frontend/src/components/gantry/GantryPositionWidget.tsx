@@ -1,5 +1,6 @@
 import { useCallback, useEffect, useRef, useState } from "react";
 import { gantryApi } from "../../api/client";
+import { useJogChannel } from "../../hooks/useGantryPosition";
 import type { GantryPosition, WorkingVolume } from "../../types";
 
 interface Props {
@@ -8,7 +9,10 @@ interface Props {
   configSelected: boolean;
 }
 
+// One step per JOG_INTERVAL_MS while held, streamed in JOG_TICK_MS slices
+// so the server can keep GRBL's planner fed with short segments.
 const JOG_INTERVAL_MS = 150;
+const JOG_TICK_MS = 50;
 
 export default function GantryPositionWidget({ position, workingVolume, configSelected }: Props) {
   const [loading, setLoading] = useState(false);
@@ -25,23 +29,28 @@ export default function GantryPositionWidget({ position, workingVolume, configSe
   const isAlarm = status.toLowerCase().includes("alarm");
   const isMoving = status === "Run" || status === "Jog";
 
+  const { send: streamJog, stop: cancelJog } = useJogChannel(connected);
+
   const jog = useCallback((x: number, y: number, z: number) => {
     if (!connected) return;
+    if (streamJog(x, y, z)) return;
     gantryApi.jog(x, y, z).catch((e) => console.error("Jog failed:", e));
-  }, [connected]);
+  }, [connected, streamJog]);
 
   const startJog = useCallback((x: number, y: number, z: number) => {
     jog(x, y, z);
     if (jogTimer.current) clearInterval(jogTimer.current);
-    jogTimer.current = setInterval(() => jog(x, y, z), JOG_INTERVAL_MS);
+    const k = JOG_TICK_MS / JOG_INTERVAL_MS;
+    jogTimer.current = setInterval(() => jog(x * k, y * k, z * k), JOG_TICK_MS);
   }, [jog]);
 
   const stopJog = useCallback(() => {
     if (jogTimer.current) {
       clearInterval(jogTimer.current);
       jogTimer.current = null;
+      cancelJog();
     }
-  }, []);
+  }, [cancelJog]);
 
   // Clean up on unmount
   useEffect(() => () => stopJog(), [stopJog]);
@@ -145,6 +154,10 @@ export default function GantryPositionWidget({ position, workingVolume, configSe
     gantryApi.moveTo(x, y, z).catch((e) => alert(`Move failed: ${e}`));
   };
 
+  const handleStop = () => {
+    gantryApi.flushMoves().catch((e) => alert(`Stop failed: ${e}`));
+  };
+
   // 800 steps/mm → min 0.00125mm; clamp to 0.001mm floor
   const MIN_STEP = 0.001;
   const xyStep = Math.max(MIN_STEP, parseFloat(stepXY) || 0.5);
@@ -182,7 +195,9 @@ export default function GantryPositionWidget({ position, workingVolume, configSe
         }}>
           <span style={{ color: "#dc2626", fontWeight: 700, fontSize: 13 }}>ALARM</span>
           <span style={{ color: "#991b1b", fontSize: 11 }}>
-            {status} — Unlock to clear, then jog back to safety.
+            {position?.needs_homing
+              ? `${status} — position lost by a halt. Home, or unlock to accept the current position.`
+              : `${status} — Unlock to clear, then jog back to safety.`}
           </span>
           <button
             onClick={handleUnlock}
@@ -351,6 +366,14 @@ export default function GantryPositionWidget({ position, workingVolume, configSe
             >
               {isMoving ? "Moving..." : "Go"}
             </button>
+            {isMoving && (
+              <button
+                onClick={handleStop}
+                style={{ ...btnStyle, color: "#dc2626", border: "1px solid #dc2626", fontWeight: 600 }}
+              >
+                Stop
+              </button>
+            )}
           </div>
         </div>
       )}
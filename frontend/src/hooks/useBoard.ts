@@ -1,32 +1,36 @@
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { boardApi } from "../api/client";
-import type { BoardConfig, InstrumentSchemas } from "../types";
+import type { BoardCatalogue, BoardConfig, InstrumentSchemas } from "../types";
 
 export function useBoardConfigs() {
   return useQuery({ queryKey: ["board", "configs"], queryFn: boardApi.listConfigs });
 }
 
+// Types, pipette models and schemas share one catalogue request.
+const catalogueQuery = {
+  queryKey: ["board", "catalogue"],
+  queryFn: boardApi.getCatalogue,
+  staleTime: Infinity,
+} as const;
+
 export function useInstrumentTypes() {
   return useQuery({
-    queryKey: ["board", "instrument-types"],
-    queryFn: boardApi.listInstrumentTypes,
-    staleTime: Infinity,
+    ...catalogueQuery,
+    select: (c: BoardCatalogue) => c.instrument_types,
   });
 }
 
 export function usePipetteModels() {
   return useQuery({
-    queryKey: ["board", "pipette-models"],
-    queryFn: boardApi.listPipetteModels,
-    staleTime: Infinity,
+    ...catalogueQuery,
+    select: (c: BoardCatalogue) => c.pipette_models,
   });
 }
 
 export function useInstrumentSchemas() {
-  return useQuery<InstrumentSchemas>({
-    queryKey: ["board", "instrument-schemas"],
-    queryFn: boardApi.getInstrumentSchemas,
-    staleTime: Infinity,
+  return useQuery({
+    ...catalogueQuery,
+    select: (c: BoardCatalogue): InstrumentSchemas => c.instrument_schemas,
   });
 }
 
@@ -0,0 +1,40 @@
+import { useEffect } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { eventsApi } from "../api/client";
+import type { ConfigChangeEvent, ConfigKind } from "../types";
+
+const KINDS: ConfigKind[] = ["gantry", "deck", "board", "protocol"];
+
+/**
+ * Refetch exactly the queries a server-side config change affects, e.g.
+ * after an edit in PANDA_CORE or a git checkout. EventSource reconnects on
+ * its own; a `resync` event (or a reconnect) refetches everything.
+ */
+export function useConfigEvents() {
+  const qc = useQueryClient();
+  useEffect(() => {
+    const es = eventsApi.configEvents();
+    const refetchAll = () => {
+      for (const kind of KINDS) qc.invalidateQueries({ queryKey: [kind] });
+    };
+    let connected = false;
+    es.onopen = () => {
+      // Changes made while disconnected were missed.
+      if (connected) refetchAll();
+      connected = true;
+    };
+    es.addEventListener("config", (ev) => {
+      const event = JSON.parse((ev as MessageEvent).data) as ConfigChangeEvent;
+      if (event.type === "resync") {
+        refetchAll();
+        return;
+      }
+      // Unclassified files may belong to any kind.
+      for (const kind of event.kind ? [event.kind] : KINDS) {
+        if (event.type !== "modified") qc.invalidateQueries({ queryKey: [kind, "configs"] });
+        if (event.filename) qc.invalidateQueries({ queryKey: [kind, event.filename] });
+      }
+    });
+    return () => es.close();
+  }, [qc]);
+}
@@ -1,16 +1,103 @@
+import { useCallback, useEffect, useRef } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { gantryApi } from "../api/client";
-import type { GantryConfig } from "../types";
+import { gantryApi, wsUrl } from "../api/client";
+import type { GantryConfig, GantryPosition } from "../types";
 
+const RECONNECT_MIN_MS = 500;
+const RECONNECT_MAX_MS = 10_000;
+
+/**
+ * Live gantry position. The server pushes a full snapshot on connect and
+ * only the changed fields afterwards; we merge them into the query cache.
+ * A dropped socket (server restart, network blip) reconnects with backoff,
+ * and the snapshot sent on reconnect replaces whatever was cached.
+ */
 export function useGantryPosition(enabled = true) {
+  const qc = useQueryClient();
+
+  useEffect(() => {
+    if (!enabled) return;
+    let ws: WebSocket | null = null;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let delay = RECONNECT_MIN_MS;
+    let reconnecting = false;
+    let closed = false;
+
+    const connect = () => {
+      const socket = new WebSocket(wsUrl("/gantry/position/ws"));
+      // The first message on every connection is a full snapshot.
+      let snapshot = true;
+      socket.onopen = () => {
+        delay = RECONNECT_MIN_MS;
+        // Moves made while disconnected were missed.
+        if (reconnecting) qc.invalidateQueries({ queryKey: ["gantry", "position"] });
+      };
+      socket.onmessage = (ev) => {
+        const delta = JSON.parse(ev.data) as Partial<GantryPosition>;
+        const replace = snapshot;
+        snapshot = false;
+        qc.setQueryData<GantryPosition>(["gantry", "position"], (prev) =>
+          prev && !replace ? { ...prev, ...delta } : (delta as GantryPosition),
+        );
+      };
+      // onerror is always followed by onclose, which does the reconnecting.
+      socket.onclose = () => {
+        if (closed) return;
+        reconnecting = true;
+        timer = setTimeout(connect, delay);
+        delay = Math.min(delay * 2, RECONNECT_MAX_MS);
+      };
+      ws = socket;
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(timer);
+      ws?.close();
+    };
+  }, [enabled, qc]);
+
   return useQuery({
     queryKey: ["gantry", "position"],
     queryFn: gantryApi.getPosition,
-    refetchInterval: enabled ? 200 : false,
+    staleTime: Infinity,
     enabled,
   });
 }
 
+/**
+ * Streaming jog channel. `send` adds a relative delta (the server coalesces
+ * bursts into single $J= commands); `stop` cancels the jog on key release.
+ * Both return false when the socket isn't open so callers can fall back.
+ */
+export function useJogChannel(enabled = true) {
+  const socket = useRef<WebSocket | null>(null);
+
+  useEffect(() => {
+    if (!enabled) return;
+    const ws = new WebSocket(wsUrl("/gantry/jog/ws"));
+    // The server only replies to reject a malformed message.
+    ws.onmessage = (e) => console.error("Jog rejected:", JSON.parse(e.data).error);
+    socket.current = ws;
+    return () => {
+      ws.close();
+      socket.current = null;
+    };
+  }, [enabled]);
+
+  const post = useCallback((msg: object) => {
+    const ws = socket.current;
+    if (!ws || ws.readyState !== WebSocket.OPEN) return false;
+    ws.send(JSON.stringify(msg));
+    return true;
+  }, []);
+
+  const send = useCallback((x: number, y: number, z: number) => post({ x, y, z }), [post]);
+  const stop = useCallback(() => post({ stop: true }), [post]);
+  return { send, stop };
+}
+
 export function useGantryConfigs() {
   return useQuery({ queryKey: ["gantry", "configs"], queryFn: gantryApi.listConfigs });
 }
@@ -1,6 +1,14 @@
+import { useCallback, useEffect, useRef, useState } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { protocolApi } from "../api/client";
-import type { ProtocolConfig } from "../types";
+import type {
+  IncrementalValidationResponse,
+  ProtocolConfig,
+  ProtocolRun,
+  ProtocolStep,
+  RunProtocolRequest,
+  StepSplice,
+} from "../types";
 
 export function useProtocolCommands() {
   return useQuery({
@@ -36,8 +44,114 @@ export function useSaveProtocol(filename: string) {
   });
 }
 
+/** The one splice that turns `prev` into `next` (common prefix and suffix kept). */
+function diffSteps(prev: ProtocolStep[], next: ProtocolStep[]): StepSplice[] {
+  const same = (a: ProtocolStep, b: ProtocolStep) =>
+    a === b || JSON.stringify(a) === JSON.stringify(b);
+  let start = 0;
+  while (start < prev.length && start < next.length && same(prev[start], next[start])) start++;
+  let tail = 0;
+  while (
+    tail < prev.length - start &&
+    tail < next.length - start &&
+    same(prev[prev.length - 1 - tail], next[next.length - 1 - tail])
+  )
+    tail++;
+  if (start === prev.length && start === next.length) return [];
+  return [
+    {
+      start,
+      delete: prev.length - start - tail,
+      insert: next.slice(start, next.length - tail),
+    },
+  ];
+}
+
+/**
+ * Protocol validation that only sends what changed since the last result.
+ * Falls back to the whole protocol when the server no longer has the base
+ * version (409).
+ */
 export function useValidateProtocol() {
+  const base = useRef<{ version: string; steps: ProtocolStep[] } | null>(null);
   return useMutation({
-    mutationFn: (body: ProtocolConfig) => protocolApi.validate(body),
+    mutationFn: async (body: ProtocolConfig) => {
+      const steps = body.protocol;
+      let result: IncrementalValidationResponse | null = null;
+      if (base.current) {
+        try {
+          result = await protocolApi.validateIncremental({
+            base_version: base.current.version,
+            changes: diffSteps(base.current.steps, steps),
+          });
+        } catch (err: unknown) {
+          if (!(err instanceof Error && err.message.startsWith("409"))) throw err;
+        }
+      }
+      result ??= await protocolApi.validateIncremental({ protocol: steps });
+      base.current = { version: result.version, steps };
+      return result;
+    },
   });
 }
+
+const FINISHED_RUN_STATES = ["done", "failed", "cancelled"];
+
+/**
+ * Background protocol run. Follows the run's event stream and, on mount,
+ * re-attaches to a run that is still in progress (e.g. after a reload).
+ */
+export function useProtocolRun() {
+  const [run, setRun] = useState<ProtocolRun | null>(null);
+  const [error, setError] = useState<string | null>(null);
+  const source = useRef<EventSource | null>(null);
+
+  const follow = useCallback((runId: string) => {
+    source.current?.close();
+    const es = protocolApi.runEvents(runId);
+    source.current = es;
+    es.addEventListener("run", (ev) => {
+      const next = JSON.parse((ev as MessageEvent).data) as ProtocolRun;
+      setRun(next);
+      if (FINISHED_RUN_STATES.includes(next.status)) {
+        es.close();
+      }
+    });
+  }, []);
+
+  useEffect(() => {
+    protocolApi
+      .listRuns()
+      .then((runs) => {
+        const last = runs[runs.length - 1];
+        if (last && !FINISHED_RUN_STATES.includes(last.status)) {
+          setRun(last);
+          follow(last.id);
+        }
+      })
+      .catch(() => {});
+    return () => source.current?.close();
+  }, [follow]);
+
+  const start = useCallback(
+    async (body: RunProtocolRequest) => {
+      setError(null);
+      setRun(null);
+      try {
+        const started = await protocolApi.run(body);
+        setRun(started);
+        follow(started.id);
+      } catch (err: unknown) {
+        setError(err instanceof Error ? err.message : String(err));
+      }
+    },
+    [follow],
+  );
+
+  const cancel = useCallback(() => {
+    if (run) protocolApi.cancelRun(run.id).catch(() => {});
+  }, [run]);
+
+  const isRunning = !!run && !FINISHED_RUN_STATES.includes(run.status);
+  return { run, error, isRunning, start, cancel };
+}
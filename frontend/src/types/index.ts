@@ -58,6 +58,11 @@ export interface DeckResponse {
   labware: LabwareResponse[];
 }
 
+/** Labware a merge patch added or changed, and the keys it removed. */
+export interface DeckPatchResponse extends DeckResponse {
+  removed: string[];
+}
+
 export interface DeckConfig {
   labware: Record<string, LabwareConfig>;
 }
@@ -74,6 +79,11 @@ export interface BoardResponse {
   instruments: Record<string, InstrumentConfig>;
 }
 
+/** Instruments a merge patch added or changed, and the names it removed. */
+export interface BoardPatchResponse extends BoardResponse {
+  removed: string[];
+}
+
 export interface BoardConfig {
   instruments: Record<string, InstrumentConfig>;
 }
@@ -112,6 +122,20 @@ export interface GantryPosition {
   work_z: number | null;
   status: string;
   connected: boolean;
+  needs_homing: boolean;
+}
+
+export interface MoveJob {
+  id: string;
+  x: number;
+  y: number;
+  z: number;
+  status: "queued" | "running" | "done" | "failed" | "cancelled";
+  error: string | null;
+  position_lost: boolean;
+  submitted_at: number;
+  started_at: number | null;
+  finished_at: number | null;
 }
 
 // Board introspection (from PANDA_CORE)
@@ -139,6 +163,12 @@ export interface InstrumentFieldInfo {
 
 export type InstrumentSchemas = Record<string, InstrumentFieldInfo[]>;
 
+export interface BoardCatalogue {
+  instrument_types: InstrumentTypeInfo[];
+  pipette_models: PipetteModelInfo[];
+  instrument_schemas: InstrumentSchemas;
+}
+
 // Protocol
 
 export interface CommandArg {
@@ -168,7 +198,86 @@ export interface ProtocolResponse {
   steps: ProtocolStep[];
 }
 
+export interface StepOperation {
+  op: "insert" | "replace" | "delete";
+  index: number;
+  step?: ProtocolStep;
+}
+
+export interface ProtocolPatchResponse {
+  filename: string;
+  step_count: number;
+}
+
+export interface StepError {
+  index: number;
+  command: string;
+  field: string | null;
+  message: string;
+}
+
 export interface ProtocolValidationResponse {
   valid: boolean;
   errors: string[];
+  step_errors: StepError[];
+}
+
+export interface StepSplice {
+  start: number;
+  delete: number;
+  insert: ProtocolStep[];
+}
+
+export interface IncrementalValidationRequest {
+  protocol?: ProtocolStep[];
+  base_version?: string;
+  changes?: StepSplice[];
+}
+
+export interface IncrementalValidationResponse extends ProtocolValidationResponse {
+  version: string;
+  step_count: number;
+  revalidated: number;
+}
+
+export interface RunProtocolRequest {
+  gantry_file: string;
+  deck_file: string;
+  board_file: string;
+  protocol_file: string;
+  optimize?: boolean;
+}
+
+export interface ProtocolRun extends RunProtocolRequest {
+  id: string;
+  status: "queued" | "running" | "done" | "failed" | "cancelled";
+  total_steps: number;
+  steps_completed: number;
+  current_step: number | null;
+  current_command: string | null;
+  error: string | null;
+  submitted_at: number;
+  started_at: number | null;
+  finished_at: number | null;
+}
+
+export interface WorkspacePart<T = unknown> {
+  etag?: string;
+  data?: T;
+  unchanged?: boolean;
+  status?: number;
+  detail?: string;
+}
+
+export interface WorkspaceResponse {
+  parts: Record<string, WorkspacePart>;
+}
+
+export type ConfigKind = "gantry" | "deck" | "board" | "protocol";
+
+export interface ConfigChangeEvent {
+  type: "created" | "modified" | "deleted" | "resync";
+  kind: ConfigKind | null;
+  filename: string | null;
+  seq: number;
 }
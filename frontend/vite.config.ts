@@ -9,6 +9,7 @@ export default defineConfig({
       '/api': {
         target: 'http://127.0.0.1:8742',
         changeOrigin: true,
+        ws: true,
       },
     },
   },
@@ -0,0 +1,36 @@
+"""Test the board catalogue endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zoo.app import create_app
+
+
+@pytest.fixture()
+def client():
+    return TestClient(create_app())
+
+
+def test_catalogue_bundles_the_three_lists(client):
+    catalogue = client.get("/api/board/catalogue").json()
+    assert catalogue["instrument_types"] == client.get("/api/board/instrument-types").json()
+    assert catalogue["pipette_models"] == client.get("/api/board/pipette-models").json()
+    assert catalogue["instrument_schemas"] == client.get("/api/board/instrument-schemas").json()
+
+
+def test_catalogue_revalidates_with_etag(client):
+    etag = client.get("/api/board/catalogue").headers["etag"]
+    r = client.get("/api/board/catalogue", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+
+def test_catalogue_follows_a_rebound_registry(client, monkeypatch):
+    from board import loader
+
+    before = client.get("/api/board/catalogue")
+    key, cls = sorted(loader.INSTRUMENT_REGISTRY.items())[0]
+    # What importlib.reload does: the module attribute points to a new dict.
+    monkeypatch.setattr(loader, "INSTRUMENT_REGISTRY", {key: cls})
+    after = client.get("/api/board/catalogue")
+    assert after.headers["etag"] != before.headers["etag"]
+    assert [t["type"] for t in after.json()["instrument_types"]] == [key]
@@ -0,0 +1,53 @@
+"""Test board API endpoints."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zoo.app import create_app
+from zoo.config import get_settings
+from zoo.services.yaml_io import write_yaml
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        configs = Path(d) / "configs"
+        configs.mkdir()
+        monkeypatch.setattr(get_settings(), "panda_core_path", Path(d))
+        monkeypatch.setattr(get_settings(), "cache_dir", Path(d) / "cache")
+        client = TestClient(create_app())
+        # A mock instrument type with no required fields beyond the base ones.
+        schemas = client.get("/api/board/instrument-schemas").json()
+        kind = next(
+            t for t, fields in sorted(schemas.items())
+            if t.startswith("mock_") and not any(f["required"] for f in fields)
+        )
+        entry = {"type": kind, "offset_x": 0.0, "offset_y": 0.0}
+        write_yaml(configs / "board.yaml", {"instruments": {"a": entry, "b": entry}})
+        yield client
+
+
+def test_patch_removes_an_instrument(client):
+    r = client.patch("/api/board/board.yaml", json={"instruments": {"b": None}})
+    assert r.status_code == 200
+    assert r.json()["removed"] == ["b"]
+    assert r.json()["instruments"] == {}
+    assert list(client.get("/api/board/board.yaml").json()["instruments"]) == ["a"]
+
+
+def test_patch_returns_only_changed_instruments(client):
+    r = client.patch("/api/board/board.yaml", json={"instruments": {"a": {"offset_x": 5.0}}})
+    assert r.status_code == 200
+    assert list(r.json()["instruments"]) == ["a"]
+    assert r.json()["instruments"]["a"]["offset_x"] == 5.0
+
+
+def test_invalid_patch_writes_nothing(client):
+    etag = client.get("/api/board/board.yaml").headers["etag"]
+    r = client.patch("/api/board/board.yaml", json={"instruments": {"a": {"type": "no_such_type"}}})
+    assert r.status_code == 400
+    r = client.get("/api/board/board.yaml", headers={"If-None-Match": etag})
+    assert r.status_code == 304
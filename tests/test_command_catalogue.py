@@ -0,0 +1,87 @@
+"""Test compiled command validation."""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from zoo.services.command_catalogue import CommandCatalogue, format_errors, get_catalogue
+
+
+class MoveArgs(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    instrument: str
+    position: str
+
+
+class AspirateArgs(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    position: str
+    volume_ul: float
+    speed: Optional[float] = None
+
+
+@dataclass
+class _Command:
+    name: str
+    schema: type
+    handler: Any
+
+
+class _Registry:
+    def __init__(self) -> None:
+        def move():
+            """Move an instrument to a position."""
+
+        self._commands: Dict[str, _Command] = {
+            "move": _Command("move", MoveArgs, move),
+            "aspirate": _Command("aspirate", AspirateArgs, lambda: None),
+        }
+
+    @property
+    def command_names(self):
+        return list(self._commands)
+
+    def get(self, name):
+        return self._commands[name]
+
+
+def test_infos_and_catalogue_reuse():
+    registry = _Registry()
+    catalogue = get_catalogue(registry)
+    assert get_catalogue(registry) is catalogue
+    info = catalogue.infos["aspirate"]
+    assert [a.name for a in info.args] == ["position", "volume_ul", "speed"]
+    assert info.args[2].required is False
+    assert catalogue.infos["move"].description == "Move an instrument to a position."
+
+
+def test_batch_validation_reports_step_indexed_errors():
+    catalogue = CommandCatalogue(_Registry())
+    steps = [
+        ("move", {"instrument": "pipette", "position": "plate_1.A1"}),
+        ("fly_away", {}),
+        ("aspirate", {"position": "plate_1.A1"}),
+        ("move", {"instrument": "p", "position": "a", "turbo": True}),
+        ("aspirate", {"position": "plate_1.A1", "volume_ul": 100.0}),
+    ]
+    errors = catalogue.validate_steps(steps)
+    assert [(e.index, e.field) for e in errors] == [(1, None), (2, "volume_ul"), (3, "turbo")]
+    lines = format_errors(errors)
+    assert "Unknown command 'fly_away'" in lines[0]
+    assert lines[1].startswith("Step 2 (aspirate): volume_ul")
+    assert "turbo" in lines[2]
+
+
+def test_50k_steps_validate_quickly():
+    catalogue = CommandCatalogue(_Registry())
+    steps = [
+        ("aspirate", {"position": f"plate_1.A{i % 12 + 1}", "volume_ul": 10.0})
+        if i % 2
+        else ("move", {"instrument": "pipette", "position": "plate_1.A1"})
+        for i in range(50_000)
+    ]
+    t0 = time.perf_counter()
+    assert catalogue.validate_steps(steps) == []
+    assert time.perf_counter() - t0 < 0.5
@@ -0,0 +1,90 @@
+"""Test typed config change events."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import watchfiles
+
+from zoo.config import get_settings
+from zoo.services.config_events import ConfigEventHub
+
+
+def _collect(hub, changes, n):
+    async def scenario():
+        events = []
+
+        async def read():
+            async for event in hub.subscribe(heartbeat=5.0):
+                events.append(event)
+                if len(events) == n:
+                    break
+
+        reader = asyncio.create_task(read())
+        while hub.subscriber_count == 0:
+            await asyncio.sleep(0.01)
+        for change, path, action in changes:
+            if action is not None:
+                action()
+            await asyncio.to_thread(hub.on_change, change, path)
+        await asyncio.wait_for(reader, 2.0)
+        return events
+
+    return asyncio.run(scenario())
+
+
+def test_events_are_typed_with_kind_and_filename(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        configs = Path(d).resolve() / "configs"
+        (configs / "deck").mkdir(parents=True)
+        deck = configs / "deck" / "deck.yaml"
+        deck.write_text("labware: {}\n")
+        flat = configs / "board.yaml"
+        monkeypatch.setattr(get_settings(), "panda_core_path", Path(d).resolve())
+
+        hub = ConfigEventHub()
+        events = _collect(
+            hub,
+            [
+                # An atomic replace is reported by the watcher as "added".
+                (watchfiles.Change.added, deck, lambda: deck.write_text("labware: {a: {}}\n")),
+                (watchfiles.Change.added, flat, lambda: flat.write_text("instruments: {}\n")),
+                (watchfiles.Change.deleted, flat, flat.unlink),
+            ],
+            3,
+        )
+        assert [(e.type, e.kind, e.filename) for e in events] == [
+            ("modified", "deck", "deck.yaml"),
+            ("created", "board", "board.yaml"),
+            ("deleted", "board", "board.yaml"),
+        ]
+        assert [e.seq for e in events] == sorted(e.seq for e in events)
+
+
+def test_slow_subscribers_get_a_single_resync(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        configs = Path(d).resolve() / "configs" / "protocol"
+        configs.mkdir(parents=True)
+        path = configs / "p.yaml"
+        path.write_text("protocol: []\n")
+        monkeypatch.setattr(get_settings(), "panda_core_path", Path(d).resolve())
+
+        hub = ConfigEventHub(max_backlog=2)
+
+        async def scenario():
+            stream = hub.subscribe(heartbeat=5.0)
+            first = asyncio.ensure_future(stream.__anext__())
+            while hub.subscriber_count == 0:
+                await asyncio.sleep(0.01)
+            for _ in range(5):
+                hub.on_change(watchfiles.Change.modified, path)
+            await asyncio.sleep(0.05)
+            events = [await first]
+            hub.on_change(watchfiles.Change.modified, path)
+            events.append(await stream.__anext__())
+            await stream.aclose()
+            return events
+
+        events = asyncio.run(scenario())
+        assert [e.type for e in events] == ["resync", "modified"]
+        assert hub.subscriber_count == 0
@@ -0,0 +1,88 @@
+"""Test the persistent config classification index."""
+
+import tempfile
+from pathlib import Path
+
+from zoo.config import get_settings
+from zoo.services.config_index import ClassificationIndex, get_index
+from zoo.services.yaml_io import (
+    cache_stats,
+    clear_cache,
+    stop_watching,
+    watch_configs,
+    write_yaml,
+)
+
+
+def _make_configs(root: Path) -> Path:
+    configs = root / "configs"
+    configs.mkdir()
+    write_yaml(configs / "deck.yaml", {"labware": {}})
+    write_yaml(configs / "board.yaml", {"instruments": {}})
+    write_yaml(configs / "protocol.yaml", {"protocol": []})
+    (configs / "notes.yaml").write_text("other: 1\n")
+    return configs
+
+
+def test_index_lists_by_kind():
+    with tempfile.TemporaryDirectory() as d:
+        configs = _make_configs(Path(d))
+        index = ClassificationIndex(configs.resolve())
+        assert index.list("deck") == ["deck.yaml"]
+        assert index.list("board") == ["board.yaml"]
+        assert index.list("gantry") == []
+
+
+def test_index_picks_up_changes_without_watcher():
+    with tempfile.TemporaryDirectory() as d:
+        configs = _make_configs(Path(d))
+        index = ClassificationIndex(configs.resolve())
+        assert index.list("gantry") == []
+        write_yaml(configs / "gantry.yaml", {"working_volume": {}})
+        (configs / "deck.yaml").unlink()
+        assert index.list("gantry") == ["gantry.yaml"]
+        assert index.list("deck") == []
+
+
+def test_index_persists_between_instances():
+    with tempfile.TemporaryDirectory() as d:
+        configs = _make_configs(Path(d))
+        store = Path(d) / "cache" / "index.json"
+        ClassificationIndex(configs.resolve(), store).list("deck")
+        assert store.is_file()
+
+        # A fresh index loaded from the store must not re-parse anything.
+        clear_cache()
+        index = ClassificationIndex(configs.resolve(), store)
+        assert index.list("protocol") == ["protocol.yaml"]
+        assert cache_stats()["misses"] == 0
+
+
+def test_index_refresh_single_file():
+    with tempfile.TemporaryDirectory() as d:
+        configs = _make_configs(Path(d)).resolve()
+        index = ClassificationIndex(configs)
+        index.list("deck")
+        write_yaml(configs / "deck.yaml", {"working_volume": {}})
+        index.refresh(configs / "deck.yaml")
+        (configs / "board.yaml").unlink()
+        index.refresh(configs / "board.yaml")
+        assert index.list("gantry") == ["deck.yaml"]
+        assert index.list("board") == []
+
+
+def test_own_writes_are_listed_before_the_watcher_reports_them(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        configs = _make_configs(Path(d)).resolve()
+        monkeypatch.setattr(get_settings(), "cache_dir", Path(d) / "cache")
+        watch_configs(configs)
+        try:
+            index = get_index(configs)
+            assert index.list("gantry") == []
+            write_yaml(configs / "gantry.yaml", {"working_volume": {}})
+            # Same generation, so this is a pure lookup: no reconcile ran.
+            assert index.list("gantry") == ["gantry.yaml"]
+            write_yaml(configs / "gantry.yaml", {"instruments": {}})
+            assert index.list("board") == ["board.yaml", "gantry.yaml"]
+        finally:
+            stop_watching()
@@ -0,0 +1,68 @@
+"""Test atomic, coalesced config writes."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from zoo.services import yaml_io
+from zoo.services.config_writer import CoalescingWriter, atomic_write
+
+
+def test_atomic_write_keeps_mode_and_leaves_no_temp_files():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        path.write_text("old\n")
+        os.chmod(path, 0o640)
+        atomic_write(path, b"new\n")
+        assert path.read_text() == "new\n"
+        assert path.stat().st_mode & 0o777 == 0o640
+        assert os.listdir(d) == ["deck.yaml"]
+
+
+def test_bursts_are_coalesced_into_one_write():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "protocol.yaml"
+        path.write_text("v0\n")
+        written = []
+        writer = CoalescingWriter(delay=0.05, on_written=lambda p, w: written.append(w.data))
+        signatures = [writer.submit(path, f"v{i}\n".encode()) for i in range(1, 6)]
+        assert len(set(signatures)) == 5
+        assert path.read_text() == "v0\n"
+        assert writer.pending(path).data == b"v5\n"
+
+        deadline = time.monotonic() + 2.0
+        while writer.pending(path) is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path.read_text() == "v5\n"
+        assert written == [b"v5\n"]
+        stats = writer.stats()
+        assert (stats["submitted"], stats["coalesced"], stats["written"]) == (5, 4, 1)
+
+
+def test_pending_signatures_differ_across_restarts():
+    # A new writer (e.g. after a restart) restarts its sequence at 1.
+    first = CoalescingWriter(delay=60).submit(Path("/nonexistent/a.yaml"), b"v1\n")
+    second = CoalescingWriter(delay=60).submit(Path("/nonexistent/a.yaml"), b"v2\n")
+    assert first[:2] == second[:2]
+    assert first != second
+
+
+def test_pending_edits_are_visible_before_they_reach_disk():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "board.yaml"
+        yaml_io.write_yaml(path, {"instruments": {}})  # New file: written at once.
+        assert path.is_file()
+        disk_signature = yaml_io.file_signature(path.resolve())
+
+        yaml_io.write_yaml(path, {"instruments": {"pipette": {"type": "mock_pipette"}}})
+        assert yaml_io.file_signature(path.resolve()) != disk_signature
+        assert yaml_io.read_yaml(path)["instruments"]["pipette"]["type"] == "mock_pipette"
+        assert "mock_pipette" in yaml_io.read_text(path)
+        assert "mock_pipette" not in path.read_text()
+        assert yaml_io.classify_config_file(path) == "board"
+
+        yaml_io.flush([path])
+        assert yaml_io.file_signature(path.resolve())[0] > 0
+        assert "mock_pipette" in path.read_text()
+        assert yaml_io.read_yaml(path)["instruments"]["pipette"]["type"] == "mock_pipette"
@@ -0,0 +1,85 @@
+"""Test the columnar deck payload encodings."""
+
+import base64
+import json
+import struct
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from zoo.services import deck_payload
+
+
+@dataclass
+class _Grid:
+    ids: Tuple[str, ...]
+    coords: np.ndarray
+
+    @property
+    def columns(self) -> bytes:
+        return np.ascontiguousarray(np.round(self.coords, 3).T, dtype="<f4").tobytes()
+
+
+def _plate(rows, cols):
+    ids = tuple(f"R{r}C{c}" for r in range(rows) for c in range(cols))
+    coords = np.array([(c * 2.25 + 10, r * 2.25 + 20, -5.0) for r in range(rows) for c in range(cols)])
+    return _Grid(ids, coords)
+
+
+ITEMS = [
+    ("plate_1", {"type": "well_plate"}, _plate(2, 3)),
+    ("vial_1", {"type": "vial"}, None),
+    ("plate_2", {"type": "well_plate"}, _plate(1, 2)),
+]
+
+
+def test_negotiate():
+    assert deck_payload.negotiate("binary", None) == "binary"
+    assert deck_payload.negotiate(None, "application/octet-stream") == "binary"
+    assert deck_payload.negotiate(None, "application/vnd.zoo.columnar+json") == "columnar"
+    assert deck_payload.negotiate(None, "application/json, */*") == "json"
+    assert deck_payload.negotiate("json", "application/octet-stream") == "json"
+
+
+def test_columnar_round_trip():
+    data = json.loads(deck_payload.encode_columnar("deck.yaml", ITEMS))
+    plate = data["labware"][0]["wells"]
+    cols = np.frombuffer(base64.b64decode(plate["columns"]), dtype="<f4").reshape(3, -1)
+    assert data["well_ids"][plate["ids"]] == list(ITEMS[0][2].ids)
+    np.testing.assert_allclose(cols.T, ITEMS[0][2].coords, atol=1e-4)
+    assert data["labware"][1]["wells"] is None
+
+
+def test_binary_layout():
+    payload = deck_payload.encode_binary("deck.yaml", ITEMS)
+    assert payload[:4] == b"ZDK1"
+    (header_len,) = struct.unpack("<I", payload[4:8])
+    header = json.loads(payload[8 : 8 + header_len])
+    data_start = 8 + header_len + (-(8 + header_len) % 4)
+    assert data_start % 4 == 0
+    wells = header["labware"][2]["wells"]
+    cols = np.frombuffer(payload, dtype="<f4", count=wells["count"] * 3, offset=data_start + wells["offset"])
+    np.testing.assert_allclose(cols.reshape(3, -1).T, ITEMS[2][2].coords, atol=1e-4)
+
+
+def test_plates_of_one_shape_share_ids():
+    items = [(f"plate_{i}", {}, _plate(2, 3)) for i in range(3)]
+    data = json.loads(deck_payload.encode_columnar("deck.yaml", items))
+    assert len(data["well_ids"]) == 1
+    assert {item["wells"]["ids"] for item in data["labware"]} == {0}
+
+
+def test_binary_is_several_times_smaller_than_json():
+    grid = _plate(32, 48)
+    items = [(f"plate_{i}", {}, grid) for i in range(4)]
+    as_json = json.dumps(
+        {
+            "filename": "d",
+            "labware": [{"key": key, "config": {}, "wells": {
+                wid: {"x": round(x, 3), "y": round(y, 3), "z": round(z, 3)}
+                for wid, (x, y, z) in zip(grid.ids, grid.coords.tolist())
+            }} for key, _, _ in items],
+        }
+    )
+    assert len(deck_payload.encode_binary("d", items)) * 3 < len(as_json)
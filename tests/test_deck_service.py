@@ -0,0 +1,100 @@
+"""Test the parse-once deck service."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from zoo.services import deck_service
+from zoo.services.yaml_io import write_yaml
+
+PLATE = {
+    "type": "well_plate",
+    "name": "plate_96",
+    "model_name": "generic_96",
+    "rows": 8,
+    "columns": 12,
+    "length_mm": 127.76,
+    "width_mm": 85.48,
+    "height_mm": 14.22,
+    "calibration": {"a1": {"x": 10.0, "y": 20.0, "z": -5.0}, "a2": {"x": 19.0, "y": 20.0, "z": -5.0}},
+    "x_offset_mm": 9.0,
+    "y_offset_mm": 9.0,
+    "capacity_ul": 200.0,
+    "working_volume_ul": 150.0,
+}
+
+
+def test_versions_are_cached_until_the_file_changes():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        write_yaml(path, {"labware": {"plate_1": PLATE}})
+        first = deck_service.load(path)
+        assert deck_service.load(path) is first
+        assert first.render("deck.yaml", "json") is first.render("deck.yaml", "json")
+
+        moved = {**PLATE, "calibration": {**PLATE["calibration"], "a1": {"x": 11.0, "y": 20.0, "z": -5.0}}}
+        saved = deck_service.save(path, {"labware": {"plate_1": moved}})
+        assert saved is not first
+        assert deck_service.load(path) is saved
+        body = json.loads(saved.render("deck.yaml", "json"))
+        assert body["labware"][0]["wells"]["A1"] == {"x": 11.0, "y": 20.0, "z": -5.0}
+
+
+def test_patch_revalidates_and_returns_only_touched_labware():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        write_yaml(path, {"labware": {"plate_1": PLATE, "plate_2": PLATE}})
+        base = deck_service.load(path)
+
+        version, changed, removed = deck_service.patch(
+            path, {"labware": {"plate_1": {"calibration": {"a1": {"x": 12.0}}}, "plate_2": None}}
+        )
+        assert (changed, removed) == (["plate_1"], ["plate_2"])
+        assert deck_service.load(path) is version and version is not base
+        assert [key for key, _, _ in version.items] == ["plate_1"]
+        assert version.items[0][2].to_dict()["A1"] == {"x": 12.0, "y": 20.0, "z": -5.0}
+        assert version.raw["labware"]["plate_1"]["calibration"]["a2"] == PLATE["calibration"]["a2"]
+
+
+def test_deck_is_built_from_its_own_version():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        write_yaml(path, {"labware": {"plate_1": PLATE}})
+        first = deck_service.load(path)
+        moved = {**PLATE, "calibration": {**PLATE["calibration"], "a1": {"x": 11.0, "y": 20.0, "z": -5.0}}}
+        deck_service.save(path, {"labware": {"plate_1": moved}})
+        # The newer (possibly still pending) file must not leak into the older version.
+        assert first.deck.labware["plate_1"].wells["A1"].x == 10.0
+        assert deck_service.load(path).deck.labware["plate_1"].wells["A1"].x == 11.0
+        assert sorted(os.listdir(d)) == ["deck.yaml"]
+
+
+def test_loader_errors_reject_save_and_load():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        broken = {"labware": {"plate_1": {**PLATE, "rows": "eight"}}}
+        with pytest.raises(Exception):
+            deck_service.save(path, broken)
+        # The body is still written, as before; reading it fails the same way.
+        with pytest.raises(Exception):
+            deck_service.load(path)
+
+
+def test_versions_on_disk_load_without_writing(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        write_yaml(path, {"labware": {"plate_1": PLATE}})
+        seen = []
+        real = deck_service.load_deck_from_yaml
+        monkeypatch.setattr(
+            deck_service, "load_deck_from_yaml", lambda p: seen.append(Path(p)) or real(p)
+        )
+        os.chmod(d, 0o555)
+        try:
+            deck_service.load(path)
+        finally:
+            os.chmod(d, 0o755)
+        assert seen == [path.resolve()]
@@ -0,0 +1,59 @@
+"""Test conditional GETs on config endpoints."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from zoo.config import get_settings
+from zoo.routers import raw
+from zoo.services.http_cache import content_etag, matches
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        configs = Path(d) / "configs"
+        configs.mkdir()
+        (configs / "deck.yaml").write_text("labware: {}\n")
+        monkeypatch.setattr(get_settings(), "panda_core_path", Path(d))
+        app = FastAPI()
+        app.include_router(raw.router)
+        yield TestClient(app)
+
+
+def test_matches():
+    assert matches('"abc"', '"abc"')
+    assert matches('W/"abc", "def"', '"abc"')
+    assert matches("*", '"abc"')
+    assert not matches('"abd"', '"abc"')
+    assert not matches(None, '"abc"')
+
+
+def test_unchanged_file_is_not_modified(client):
+    r = client.get("/api/raw/deck.yaml")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+
+    r = client.get("/api/raw/deck.yaml", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+
+def test_write_changes_etag(client):
+    etag = client.get("/api/raw/deck.yaml").headers["etag"]
+    r = client.put("/api/raw/deck.yaml", json={"content": "labware:\n  plate_1: {}\n"})
+    assert r.headers["etag"] != etag
+    r = client.get("/api/raw/deck.yaml", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert "plate_1" in r.json()["content"]
+
+
+def test_etags_are_weak():
+    # One tag covers the identity and gzip encodings of a body.
+    assert content_etag(b"x").startswith('W/"')
+    assert matches(content_etag(b"x"), content_etag(b"x"))
+    assert matches(content_etag(b"x")[2:], content_etag(b"x"))
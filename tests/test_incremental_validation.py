@@ -0,0 +1,64 @@
+"""Test incremental protocol validation."""
+
+import pytest
+
+from tests.test_command_catalogue import _Registry
+from zoo.services.command_catalogue import CommandCatalogue
+from zoo.services.incremental_validation import (
+    IncrementalValidator,
+    Splice,
+    UnknownVersionError,
+)
+
+MOVE = ("move", {"instrument": "pipette", "position": "plate_1.A1"})
+BAD_ASPIRATE = ("aspirate", {"position": "plate_1.A1"})
+
+
+def _steps(n):
+    return [("aspirate", {"position": f"plate_1.A{i}", "volume_ul": 10.0}) for i in range(n)]
+
+
+def test_unchanged_steps_are_not_revalidated():
+    catalogue = CommandCatalogue(_Registry())
+    validator = IncrementalValidator()
+    steps = _steps(1000)
+    first = validator.validate(catalogue, steps)
+    assert first.revalidated == 1000 and first.step_errors() == []
+
+    steps[500] = BAD_ASPIRATE
+    second = validator.validate(catalogue, steps)
+    assert second.revalidated == 1
+    assert [(e.index, e.field) for e in second.step_errors()] == [(500, "volume_ul")]
+    assert second.version != first.version
+
+
+def test_changes_are_applied_to_a_stored_version():
+    catalogue = CommandCatalogue(_Registry())
+    validator = IncrementalValidator()
+    base = validator.validate(catalogue, _steps(1000))
+
+    # Insert a bad step at 10, then replace steps 998-999 (after the shift) with a move.
+    outcome = validator.apply(
+        catalogue,
+        base.version,
+        [Splice(10, 0, [BAD_ASPIRATE]), Splice(999, 2, [MOVE])],
+    )
+    assert outcome.revalidated == 2
+    assert len(outcome.results) == 1000
+    assert outcome.commands[10] == "aspirate" and outcome.commands[-1] == "move"
+    assert [e.index for e in outcome.step_errors()] == [10]
+
+    fixed = validator.apply(catalogue, outcome.version, [Splice(10, 1, [])])
+    assert fixed.revalidated == 0 and fixed.step_errors() == []
+
+    with pytest.raises(IndexError):
+        validator.apply(catalogue, base.version, [Splice(1000, 1, [])])
+    with pytest.raises(UnknownVersionError):
+        validator.apply(catalogue, "nope", [])
+
+
+def test_catalogue_change_drops_stored_results():
+    validator = IncrementalValidator()
+    base = validator.validate(CommandCatalogue(_Registry()), _steps(3))
+    with pytest.raises(UnknownVersionError):
+        validator.apply(CommandCatalogue(_Registry()), base.version, [])
@@ -0,0 +1,74 @@
+"""Test jog delta coalescing."""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from zoo.models.gantry import JogMessage
+from zoo.services.jog_stream import JogCoalescer
+
+
+def test_burst_is_coalesced_into_one_command():
+    sent = []
+
+    async def send_jog(x, y, z):
+        sent.append((x, y, z))
+
+    async def send_cancel():
+        pass
+
+    async def scenario():
+        coalescer = JogCoalescer(send_jog, send_cancel, window=0.02)
+        runner = asyncio.create_task(coalescer.run())
+        for _ in range(5):
+            coalescer.add(0.1, 0.0, -0.2)
+        await asyncio.sleep(0.06)
+        runner.cancel()
+
+    asyncio.run(scenario())
+    assert len(sent) == 1
+    x, y, z = sent[0]
+    assert abs(x - 0.5) < 1e-9 and y == 0.0 and abs(z + 1.0) < 1e-9
+
+
+def test_in_flight_limit_and_cancel():
+    sent = []
+    cancels = []
+    release = None
+
+    async def send_jog(x, y, z):
+        sent.append(x)
+        await release.wait()
+
+    async def send_cancel():
+        cancels.append(True)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        coalescer = JogCoalescer(send_jog, send_cancel, window=0.005, max_in_flight=1)
+        runner = asyncio.create_task(coalescer.run())
+        coalescer.add(1.0, 0, 0)
+        await asyncio.sleep(0.02)
+        # The first jog is still executing: these accumulate instead.
+        coalescer.add(1.0, 0, 0)
+        coalescer.add(1.0, 0, 0)
+        await asyncio.sleep(0.02)
+        assert sent == [1.0]
+        await coalescer.cancel()
+        release.set()
+        await asyncio.sleep(0.02)
+        runner.cancel()
+
+    asyncio.run(scenario())
+    assert sent == [1.0]
+    assert cancels == [True]
+
+
+def test_jog_messages_are_validated():
+    assert JogMessage.model_validate_json('{"x": 0.5}') == JogMessage(x=0.5)
+    assert JogMessage.model_validate_json('{"stop": true}').stop
+    for bad in ("[1, 2]", '"x"', "not json", '{"x": "fast"}', '{"x": Infinity}', '{"speed": 1}'):
+        with pytest.raises(ValidationError):
+            JogMessage.model_validate_json(bad)
@@ -0,0 +1,60 @@
+"""Test the single-flight LRU memo."""
+
+import threading
+import time
+
+import pytest
+
+from zoo.services.memo import SingleFlightLRU, canonical_key
+
+
+def test_canonical_key_ignores_key_order():
+    assert canonical_key({"a": 1, "b": {"c": 2, "d": 3}}) == canonical_key(
+        {"b": {"d": 3, "c": 2}, "a": 1}
+    )
+    assert canonical_key({"a": 1}) != canonical_key({"a": 2})
+
+
+def test_hits_and_eviction():
+    memo = SingleFlightLRU(max_entries=2)
+    calls = []
+    for key in ["a", "b", "a", "c", "b"]:
+        memo.get(key, lambda key=key: calls.append(key) or key.upper())
+    # "b" was evicted by "c" (least recently used after "a" was touched).
+    assert calls == ["a", "b", "c", "b"]
+    assert memo.stats()["hits"] == 1
+
+
+def test_concurrent_identical_requests_compute_once():
+    memo = SingleFlightLRU()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(memo.get("k", compute)))]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=lambda: results.append(memo.get("k", compute))) for _ in range(3)]
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == [42] * 4
+    assert len(calls) == 1
+    assert memo.stats()["deduplicated"] == 3
+
+
+def test_failures_are_not_cached():
+    memo = SingleFlightLRU()
+    with pytest.raises(ValueError):
+        memo.get("k", lambda: (_ for _ in ()).throw(ValueError("bad")))
+    assert memo.get("k", lambda: 1) == 1
@@ -0,0 +1,68 @@
+"""Test RFC 7396 merge patches."""
+
+from typing import Dict
+
+from pydantic import BaseModel, Field, model_validator
+
+from zoo.services.merge_patch import (
+    apply_merge_patch,
+    entries_validate_alone,
+    only_touches,
+    section_diff,
+)
+
+
+def test_rfc7396_examples():
+    cases = [
+        ({"a": "b"}, {"a": "c"}, {"a": "c"}),
+        ({"a": "b"}, {"b": "c"}, {"a": "b", "b": "c"}),
+        ({"a": "b"}, {"a": None}, {}),
+        ({"a": "b", "b": "c"}, {"a": None}, {"b": "c"}),
+        ({"a": ["b"]}, {"a": "c"}, {"a": "c"}),
+        ({"a": "c"}, {"a": ["b"]}, {"a": ["b"]}),
+        ({"a": {"b": "c"}}, {"a": {"b": "d", "c": None}}, {"a": {"b": "d"}}),
+        ({"a": [{"b": "c"}]}, {"a": [1]}, {"a": [1]}),
+        (["a", "b"], ["c", "d"], ["c", "d"]),
+        ({"a": "b"}, ["c"], ["c"]),
+        ({"a": "foo"}, None, None),
+        ({"e": None}, {"a": 1}, {"e": None, "a": 1}),
+        ([1, 2], {"a": "b", "c": None}, {"a": "b"}),
+        ({}, {"a": {"bb": {"ccc": None}}}, {"a": {"bb": {}}}),
+    ]
+    for target, patch, expected in cases:
+        assert apply_merge_patch(target, patch) == expected
+
+
+def test_untouched_entries_are_shared_and_not_reported():
+    before = {
+        "labware": {
+            "plate_1": {"type": "well_plate", "x_offset_mm": 9.0},
+            "plate_2": {"type": "well_plate", "x_offset_mm": 9.0},
+            "vial_1": {"type": "vial"},
+        }
+    }
+    patch = {"labware": {"plate_1": {"x_offset_mm": 9.5}, "vial_1": None, "tip_rack": {"type": "tips"}}}
+    after = apply_merge_patch(before, patch)
+    assert before["labware"]["plate_1"]["x_offset_mm"] == 9.0
+    assert after["labware"]["plate_2"] is before["labware"]["plate_2"]
+    assert section_diff(before, after, "labware") == (["plate_1", "tip_rack"], ["vial_1"])
+    assert only_touches(patch, "labware")
+    assert not only_touches({"labware": None}, "labware")
+    assert not only_touches({"labware": {}, "name": "x"}, "labware")
+
+
+def test_cross_entry_checks_need_full_validation():
+    class PerEntry(BaseModel):
+        instruments: Dict[str, dict] = {}
+
+    class UniqueNames(PerEntry):
+        @model_validator(mode="after")
+        def _unique(self):
+            return self
+
+    class NonEmpty(BaseModel):
+        instruments: Dict[str, dict] = Field(min_length=1)
+
+    assert entries_validate_alone(PerEntry, "instruments")
+    assert not entries_validate_alone(UniqueNames, "instruments")
+    assert not entries_validate_alone(NonEmpty, "instruments")
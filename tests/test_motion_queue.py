@@ -0,0 +1,75 @@
+"""Test the ordered gantry motion queue."""
+
+import threading
+import time
+
+import pytest
+
+from zoo.services.motion_queue import MotionQueue
+from zoo.services.serial_actor import QueueFullError, SerialActor
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def test_moves_run_in_order():
+    actor = SerialActor()
+    queue = MotionQueue(actor)
+    visited = []
+    jobs = [queue.submit(i, 0, 0, lambda i=i: visited.append(i)) for i in range(5)]
+    _wait_for(lambda: all(queue.get(j.id).status == "done" for j in jobs))
+    assert visited == [0, 1, 2, 3, 4]
+    actor.stop()
+
+
+def test_failed_move_reports_error_and_queue_continues():
+    actor = SerialActor()
+    queue = MotionQueue(actor)
+
+    def fail():
+        raise RuntimeError("limit switch")
+
+    bad = queue.submit(0, 0, 0, fail)
+    good = queue.submit(1, 1, 1, lambda: None)
+    _wait_for(lambda: queue.get(good.id).status == "done")
+    assert queue.get(bad.id).status == "failed"
+    assert "limit switch" in queue.get(bad.id).error
+    actor.stop()
+
+
+def test_bounded_depth_and_flush():
+    actor = SerialActor()
+    queue = MotionQueue(actor, max_depth=2)
+    release = threading.Event()
+    running = queue.submit(0, 0, 0, lambda: release.wait(5))
+    _wait_for(lambda: queue.get(running.id).status == "running")
+    queue.submit(1, 0, 0, lambda: None)
+    queue.submit(2, 0, 0, lambda: None)
+    with pytest.raises(QueueFullError):
+        queue.submit(3, 0, 0, lambda: None)
+
+    halted = []
+    cancelled = queue.flush(lambda: (halted.append(True), release.set()))
+    assert halted == [True]
+    assert len(cancelled) == 3
+    assert all(job.status == "cancelled" for job in queue.jobs())
+    assert [job.position_lost for job in queue.jobs()] == [True, False, False]
+    actor.stop()
+
+
+def test_cancel_pending_move():
+    actor = SerialActor()
+    queue = MotionQueue(actor)
+    release = threading.Event()
+    queue.submit(0, 0, 0, lambda: release.wait(5))
+    ran = []
+    pending = queue.submit(1, 0, 0, lambda: ran.append(1))
+    assert queue.cancel(pending.id, halt=lambda: None).status == "cancelled"
+    release.set()
+    actor.stop()
+    assert ran == []
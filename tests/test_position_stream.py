@@ -0,0 +1,59 @@
+"""Test the shared gantry position broadcaster."""
+
+import asyncio
+
+from zoo.models.gantry import GantryPosition
+from zoo.services.position_stream import PositionBroadcaster
+
+
+class _FakeController:
+    def __init__(self):
+        self.queries = 0
+        self.x = 0.0
+
+    def query(self) -> GantryPosition:
+        self.queries += 1
+        return GantryPosition(x=self.x, status="Idle", connected=True)
+
+
+async def _take(broadcaster, n):
+    received = []
+    async for position in broadcaster.subscribe():
+        received.append(position)
+        if len(received) == n:
+            break
+    return received
+
+
+def test_single_poller_for_many_subscribers():
+    controller = _FakeController()
+    broadcaster = PositionBroadcaster(controller.query, interval=0.01)
+
+    async def scenario():
+        readers = [asyncio.create_task(_take(broadcaster, 2)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        controller.x = 10.0
+        results = await asyncio.gather(*readers)
+        return results
+
+    results = asyncio.run(scenario())
+    for received in results:
+        assert [p.x for p in received] == [0.0, 10.0]
+    # One query per interval no matter how many subscribers are attached.
+    assert controller.queries < 20
+
+
+def test_poller_stops_without_subscribers():
+    controller = _FakeController()
+    broadcaster = PositionBroadcaster(controller.query, interval=0.01)
+
+    async def scenario():
+        await _take(broadcaster, 1)
+        await asyncio.sleep(0.01)
+        count = controller.queries
+        await asyncio.sleep(0.05)
+        return count
+
+    count = asyncio.run(scenario())
+    assert not broadcaster.running
+    assert controller.queries == count
@@ -0,0 +1,85 @@
+"""Test the windowed protocol step index."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+from zoo.services.protocol_index import StepIndex, step_index
+from zoo.services.yaml_io import write_yaml
+
+DOC = """# generated
+name: demo
+protocol:
+- move: {instrument: pipette, position: plate_1.A1}
+- aspirate:
+    position: plate_1.A1
+    volume_ul: 10.0   # trailing comment
+-   dispense:
+      position: "plate_1.B1"
+      volume_ul: 5
+- not a step
+- {a: 1, b: 2}
+- home:
+- [1, 2]
+- blowout: {nested: [1, {x: 2}]}
+after: 3
+"""
+
+
+def _expected(text):
+    return [s for s in yaml.safe_load(text)["protocol"] if isinstance(s, dict) and len(s) == 1]
+
+
+def test_windows_match_a_full_parse():
+    index = StepIndex(DOC)
+    expected = _expected(DOC)
+    assert index.steps is None
+    assert len(index) == len(expected) == 5
+    assert index.window(0, 100) == expected
+    assert index.window(2, 2) == expected[2:4]
+    assert index.window(5, 10) == []
+
+
+def test_aliases_fall_back_to_a_full_parse():
+    text = "base: &b {position: p}\nprotocol:\n- aspirate: *b\n- move: {x: 1}\n"
+    index = StepIndex(text)
+    assert index.steps is not None
+    assert index.window(0, 5) == _expected(text)
+
+
+def test_non_protocol_documents_are_rejected():
+    for text in ["labware: {}\n", "protocol: 3\n", "- a\n"]:
+        with pytest.raises(ValueError):
+            StepIndex(text)
+
+
+def test_index_is_cached_per_file_version():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "protocol.yaml"
+        steps = [{"aspirate": {"position": f"plate_1.A{i}", "volume_ul": 10.0}} for i in range(2000)]
+        write_yaml(path, {"protocol": steps})
+        index = step_index(path)
+        assert step_index(path) is index
+        assert index.window(1500, 3) == steps[1500:1503]
+
+        write_yaml(path, {"protocol": steps[:10]})
+        assert len(step_index(path)) == 10
+
+
+def test_duplicate_keys_are_handled_like_a_full_parse():
+    text = "protocol:\n- {aspirate: {volume_ul: 1}, aspirate: {volume_ul: 2}}\n- move: {x: 1}\n- {a: 1, a: 2, b: 3}\n"
+    index = StepIndex(text)
+    assert index.steps is None
+    assert len(index) == 2
+    assert index.window(0, 5) == _expected(text) == [{"aspirate": {"volume_ul": 2}}, {"move": {"x": 1}}]
+
+
+def test_repeated_protocol_key_uses_the_last_like_a_full_parse():
+    text = "protocol:\n- a: 1\nprotocol:\n- b: 2\n- c: 3\n"
+    index = StepIndex(text)
+    assert len(index) == 2
+    assert index.window(0, 5) == _expected(text) == [{"b": 2}, {"c": 3}]
+    with pytest.raises(ValueError):
+        StepIndex("protocol:\n- a: 1\nprotocol: 3\n")
@@ -0,0 +1,71 @@
+"""Test protocol plan compilation helpers."""
+
+import pytest
+
+from zoo.models.protocol import Position3D
+from zoo.services.protocol_plan import (
+    PlanCompileError,
+    build_steps,
+    config_digest,
+    resolve_position,
+)
+
+LABWARE = {
+    "plate_1": {"A1": Position3D(x=10.0, y=20.0, z=-5.0)},
+    "vial_1": Position3D(x=50.0, y=60.0, z=-2.0),
+}
+
+
+def test_resolve_well_position():
+    assert resolve_position("plate_1.A1", LABWARE) == Position3D(x=10.0, y=20.0, z=-5.0)
+
+
+def test_resolve_vial_position():
+    assert resolve_position("vial_1", LABWARE).x == 50.0
+
+
+@pytest.mark.parametrize("position", ["plate_9.A1", "plate_1.Z99", "plate_1", "vial_1.A1"])
+def test_resolve_invalid_position(position):
+    with pytest.raises(KeyError):
+        resolve_position(position, LABWARE)
+
+
+def test_build_steps_resolves_coordinates():
+    steps = build_steps(
+        [
+            {"move": {"instrument": "pipette", "position": "plate_1.A1"}},
+            {"aspirate": {"position": "vial_1", "volume_ul": 100.0}},
+        ],
+        LABWARE,
+        ["pipette"],
+    )
+    assert [s.command for s in steps] == ["move", "aspirate"]
+    assert steps[0].instrument == "pipette"
+    assert steps[0].coordinates == LABWARE["plate_1"]["A1"]
+    assert steps[1].coordinates == LABWARE["vial_1"]
+
+
+def test_build_steps_collects_all_errors():
+    with pytest.raises(PlanCompileError) as exc:
+        build_steps(
+            [
+                {"fly_away": {}},
+                {"move": {"instrument": "uvvis", "position": "plate_1.A1"}},
+                {"aspirate": {"position": "plate_1.B7", "volume_ul": 100.0}},
+            ],
+            LABWARE,
+            ["pipette"],
+        )
+    errors = exc.value.errors
+    assert len(errors) == 3
+    assert "Unknown command" in errors[0]
+    assert "uvvis" in errors[1]
+    assert "B7" in errors[2]
+
+
+def test_config_digest_covers_file_names(tmp_path):
+    a, b = tmp_path / "a.yaml", tmp_path / "b.yaml"
+    a.write_text("protocol: []\n")
+    b.write_text("protocol: []\n")
+    assert config_digest((a,)) == config_digest((a,))
+    assert config_digest((a,)) != config_digest((b,))
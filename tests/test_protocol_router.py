@@ -7,8 +7,8 @@ import pytest
 from fastapi.testclient import TestClient
 
 from zoo.app import create_app
-from zoo.config import ZooSettings
-from zoo.services.yaml_io import write_yaml
+from zoo.config import ZooSettings, get_settings
+from zoo.services.yaml_io import read_yaml, write_yaml
 
 
 @pytest.fixture()
@@ -150,3 +150,119 @@ def test_validate_protocol_unknown_args(client):
     data = r.json()
     assert data["valid"] is False
     assert "turbo" in data["errors"][0]
+
+
+def test_saved_file_is_listed_immediately(monkeypatch):
+    """A flat configs dir is listed from the index; a PUT must update it."""
+    with tempfile.TemporaryDirectory() as d:
+        configs = Path(d) / "configs"
+        configs.mkdir()
+        write_yaml(configs / "deck.yaml", {"labware": {}})
+        monkeypatch.setattr(get_settings(), "panda_core_path", Path(d))
+        monkeypatch.setattr(get_settings(), "cache_dir", Path(d) / "cache")
+        # Entering the client runs the lifespan, which starts the watcher.
+        with TestClient(create_app()) as client:
+            assert client.get("/api/protocol/configs").json() == []
+            body = {"protocol": [{"command": "home", "args": {}}]}
+            assert client.put("/api/protocol/new.yaml", json=body).status_code == 200
+            assert client.get("/api/protocol/configs").json() == ["new.yaml"]
+
+
+@pytest.fixture()
+def patch_client(monkeypatch):
+    """A client over a temp configs dir holding ``p.yaml`` with two steps."""
+    with tempfile.TemporaryDirectory() as d:
+        configs = Path(d) / "configs"
+        configs.mkdir()
+        write_yaml(
+            configs / "p.yaml",
+            {
+                "protocol": [
+                    {"move": {"instrument": "pipette", "position": "plate_1.A1"}},
+                    {"aspirate": {"position": "plate_1.A1", "volume_ul": 100.0}},
+                ]
+            },
+        )
+        monkeypatch.setattr(get_settings(), "panda_core_path", Path(d))
+        monkeypatch.setattr(get_settings(), "cache_dir", Path(d) / "cache")
+        yield TestClient(create_app())
+
+
+def _commands(client):
+    return [s["command"] for s in client.get("/api/protocol/p.yaml").json()["steps"]]
+
+
+def test_patch_inserts_replaces_and_deletes(patch_client):
+    ops = [
+        {"op": "insert", "index": 2, "step": {"command": "dispense", "args": {"position": "plate_1.A2", "volume_ul": 100.0}}},
+        {"op": "delete", "index": 0},
+    ]
+    r = patch_client.patch("/api/protocol/p.yaml", json={"ops": ops})
+    assert r.status_code == 200
+    assert r.json()["step_count"] == 2
+    assert _commands(patch_client) == ["aspirate", "dispense"]
+
+
+DISPENSE = {"position": "plate_1.A2", "volume_ul": 100.0}
+
+
+def test_patch_keeps_other_keys_and_malformed_entries(patch_client):
+    path = get_settings().configs_dir / "p.yaml"
+    write_yaml(
+        path,
+        {
+            "name": "demo",
+            "protocol": [{"move": {"x": 1}}, "not a step", {"home": None}, {"a": 1, "b": 2}],
+        },
+    )
+    ops = [
+        {"op": "replace", "index": 1, "step": {"command": "dispense", "args": DISPENSE}},
+        {"op": "insert", "index": 2, "step": {"command": "dispense", "args": DISPENSE}},
+    ]
+    r = patch_client.patch("/api/protocol/p.yaml", json={"ops": ops})
+    assert r.status_code == 200
+    assert r.json()["step_count"] == 3
+    assert read_yaml(path) == {
+        "name": "demo",
+        "protocol": [
+            {"move": {"x": 1}},
+            "not a step",
+            {"dispense": DISPENSE},
+            {"a": 1, "b": 2},
+            {"dispense": DISPENSE},
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "op",
+    [
+        {"op": "delete", "index": 2},
+        {"op": "replace", "index": -1, "step": {"command": "home", "args": {}}},
+        {"op": "insert", "index": 3, "step": {"command": "home", "args": {}}},
+    ],
+)
+def test_patch_rejects_out_of_range_index(patch_client, op):
+    r = patch_client.patch("/api/protocol/p.yaml", json={"ops": [op]})
+    assert r.status_code == 400
+    assert "out of range" in r.json()["detail"]
+    assert _commands(patch_client) == ["move", "aspirate"]
+
+
+def test_patch_insert_needs_a_step(patch_client):
+    r = patch_client.patch("/api/protocol/p.yaml", json={"ops": [{"op": "insert", "index": 0}]})
+    assert r.status_code == 400
+    assert "needs a step" in r.json()["detail"]
+
+
+def test_patch_with_an_invalid_step_writes_nothing(patch_client):
+    etag = patch_client.get("/api/protocol/p.yaml").headers["etag"]
+    ops = [
+        {"op": "delete", "index": 0},
+        {"op": "insert", "index": 0, "step": {"command": "aspirate", "args": {"position": "plate_1.A1"}}},
+    ]
+    r = patch_client.patch("/api/protocol/p.yaml", json={"ops": ops})
+    assert r.status_code == 400
+    assert "volume_ul" in r.json()["detail"]
+    r = patch_client.get("/api/protocol/p.yaml", headers={"If-None-Match": etag})
+    assert r.status_code == 304
@@ -0,0 +1,88 @@
+"""Test background protocol runs."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from zoo.models.protocol import ProtocolRun
+from zoo.services.protocol_runs import ProtocolRunManager, RunConflictError, new_run_id
+
+
+def _run() -> ProtocolRun:
+    return ProtocolRun(
+        id=new_run_id(),
+        gantry_file="g.yaml",
+        deck_file="d.yaml",
+        board_file="b.yaml",
+        protocol_file="p.yaml",
+        submitted_at=time.time(),
+    )
+
+
+def _wait_finished(manager, run_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while manager.get(run_id).status not in ("done", "failed", "cancelled"):
+        assert time.monotonic() < deadline, "run did not finish"
+        time.sleep(0.005)
+    return manager.get(run_id)
+
+
+def test_run_executes_steps_in_background():
+    manager = ProtocolRunManager()
+    executed = []
+    steps = [(f"cmd{i}", lambda i=i: executed.append(i)) for i in range(3)]
+    run = manager.submit(_run(), steps)
+    assert run.total_steps == 3
+    final = _wait_finished(manager, run.id)
+    assert final.status == "done"
+    assert final.steps_completed == 3
+    assert executed == [0, 1, 2]
+
+
+def test_failed_step_records_error():
+    manager = ProtocolRunManager()
+
+    def fail():
+        raise RuntimeError("tip not found")
+
+    run = manager.submit(_run(), [("pick_up_tip", fail), ("move", lambda: None)])
+    final = _wait_finished(manager, run.id)
+    assert final.status == "failed"
+    assert final.steps_completed == 0
+    assert "tip not found" in final.error
+
+
+def test_cancel_between_steps_and_conflict():
+    manager = ProtocolRunManager()
+    gate = threading.Event()
+    executed = []
+    steps = [("wait", gate.wait), ("move", lambda: executed.append("move"))]
+    run = manager.submit(_run(), steps)
+    with pytest.raises(RunConflictError):
+        manager.submit(_run(), [])
+    manager.cancel(run.id)
+    gate.set()
+    final = _wait_finished(manager, run.id)
+    assert final.status == "cancelled"
+    assert final.steps_completed == 1
+    assert executed == []
+
+
+def test_subscribe_streams_until_finished():
+    manager = ProtocolRunManager()
+    gate = threading.Event()
+    run = manager.submit(_run(), [("wait", gate.wait), ("move", lambda: None)])
+
+    async def collect():
+        seen = []
+        async for snapshot in manager.subscribe(run.id):
+            seen.append(snapshot)
+            if len(seen) == 1:
+                gate.set()
+        return seen
+
+    seen = asyncio.run(collect())
+    assert seen[-1].status == "done"
+    assert seen[-1].steps_completed == 2
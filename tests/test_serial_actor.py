@@ -0,0 +1,90 @@
+"""Test the prioritized serial command actor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from zoo.services.serial_actor import (
+    CommandTimeoutError,
+    Priority,
+    QueueFullError,
+    SerialActor,
+)
+
+
+def _block(actor):
+    """Occupy the worker until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    future = actor.submit(hold, priority=Priority.MOTION)
+    started.wait(5)
+    return release, future
+
+
+def test_higher_priority_runs_first():
+    actor = SerialActor()
+    release, _ = _block(actor)
+    order = []
+    futures = [
+        actor.submit(lambda: order.append("config"), priority=Priority.CONFIG),
+        actor.submit(lambda: order.append("move"), priority=Priority.MOTION),
+        actor.submit(lambda: order.append("jog"), priority=Priority.REALTIME),
+        actor.submit(lambda: order.append("status"), priority=Priority.REALTIME),
+    ]
+    release.set()
+    for f in futures:
+        f.result(timeout=5)
+    assert order == ["jog", "status", "move", "config"]
+    actor.stop()
+
+
+def test_queue_full_rejects():
+    actor = SerialActor(max_depth=2)
+    release, _ = _block(actor)
+    actor.submit(lambda: None, priority=Priority.MOTION)
+    actor.submit(lambda: None, priority=Priority.MOTION)
+    with pytest.raises(QueueFullError):
+        actor.submit(lambda: None, priority=Priority.REALTIME)
+    assert actor.stats()["rejected"] == 1
+    assert actor.stats()["depth"]["motion"] == 2
+    release.set()
+    actor.stop()
+
+
+def test_expired_job_does_not_run():
+    actor = SerialActor()
+    release, _ = _block(actor)
+    ran = []
+    future = actor.submit(lambda: ran.append(1), priority=Priority.REALTIME, timeout=0.01)
+    threading.Event().wait(0.05)
+    release.set()
+    with pytest.raises(CommandTimeoutError):
+        future.result(timeout=5)
+    assert ran == []
+    assert actor.stats()["expired"] == 1
+    actor.stop()
+
+
+def test_async_run_returns_result_and_errors():
+    actor = SerialActor()
+
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        value = await actor.run(lambda: 42, priority=Priority.REALTIME, timeout=1)
+        with pytest.raises(ValueError):
+            await actor.run(fail, priority=Priority.MOTION, timeout=1)
+        return value
+
+    assert asyncio.run(scenario()) == 42
+    stats = actor.stats()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    actor.stop()
@@ -0,0 +1,75 @@
+"""Test the protocol dry-run simulator."""
+
+import math
+import time
+
+import pytest
+
+from zoo.models.gantry import GantryConfig
+from zoo.models.protocol import PlanStep, Position3D, ProtocolPlan
+from zoo.services.simulator import DEFAULT_OVERHEAD_S, move_time, simulate
+
+GANTRY = GantryConfig.model_validate(
+    {
+        "cnc": {"feed_rate": 6000.0, "acceleration": 1000.0},
+        "working_volume": {
+            "x_min": 0, "x_max": 300, "y_min": 0, "y_max": 200, "z_min": -50, "z_max": 0,
+        },
+    }
+)
+
+
+def _plan(steps):
+    return ProtocolPlan(
+        digest="d", gantry_file="g.yaml", deck_file="d.yaml", board_file="b.yaml",
+        protocol_file="p.yaml", gantry=GANTRY, instruments=["pipette"], steps=steps,
+    )
+
+
+def _move(i, x, y, z=0.0):
+    return PlanStep(
+        index=i, command="move", args={}, position=f"p.{i}",
+        coordinates=Position3D(x=x, y=y, z=z),
+    )
+
+
+def test_move_time_trapezoid_and_triangle():
+    # 100 mm/s cruise, 1000 mm/s² accel: reaching cruise takes 10 mm.
+    assert move_time(100.0, 6000.0, 1000.0) == pytest.approx(1.0 + 0.1)
+    assert move_time(4.0, 6000.0, 1000.0) == pytest.approx(2 * math.sqrt(0.004))
+    assert move_time(0.0, 6000.0, 1000.0) == 0.0
+
+
+def test_simulate_accumulates_time_and_travel():
+    report = simulate(_plan([_move(0, 30, 40), _move(1, 30, 40), _move(2, 30, 0)]))
+    assert report.travel_mm == pytest.approx(90.0)
+    assert report.travel_xyz_mm == Position3D(x=30.0, y=80.0, z=0.0)
+    assert report.steps[1].travel_mm == 0.0
+    assert report.steps[1].duration_s == pytest.approx(DEFAULT_OVERHEAD_S)
+    assert report.steps[2].start_s == pytest.approx(
+        report.steps[0].duration_s + report.steps[1].duration_s, abs=1e-3
+    )
+    assert report.slowest[0].index in (0, 2)
+    assert report.violations == []
+
+
+def test_liquid_steps_take_longer_with_volume():
+    small = PlanStep(index=0, command="aspirate", args={"volume_ul": 10.0})
+    large = PlanStep(index=1, command="aspirate", args={"volume_ul": 200.0})
+    report = simulate(_plan([small, large]))
+    assert report.steps[1].duration_s > report.steps[0].duration_s
+
+
+def test_out_of_volume_target_is_reported():
+    report = simulate(_plan([_move(0, 400, 10)]))
+    assert len(report.violations) == 1
+    assert "outside the working volume" in report.violations[0]
+
+
+def test_simulate_10k_steps_is_fast():
+    steps = [_move(i, (i * 7) % 300, (i * 13) % 200) for i in range(10_000)]
+    plan = _plan(steps)
+    t0 = time.perf_counter()
+    report = simulate(plan)
+    assert time.perf_counter() - t0 < 1.0
+    assert len(report.steps) == 10_000
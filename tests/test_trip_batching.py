@@ -0,0 +1,106 @@
+"""Test the multi-dispense trip batching planner."""
+
+from zoo.models.gantry import GantryConfig
+from zoo.models.protocol import PlanStep, Position3D, ProtocolPlan
+from zoo.services.trip_batching import batch_trips, plan_trip_batches
+
+GANTRY = GantryConfig.model_validate(
+    {"working_volume": {"x_min": 0, "x_max": 300, "y_min": 0, "y_max": 300, "z_min": -50, "z_max": 0}}
+)
+COORDS = {
+    "res.A1": Position3D(x=0, y=0, z=0),
+    "plate.A1": Position3D(x=200, y=0, z=0),
+    "plate.A2": Position3D(x=209, y=0, z=0),
+    "plate.A3": Position3D(x=218, y=0, z=0),
+}
+
+
+def _raw_transfers(*pairs):
+    raw = []
+    for source, target, volume in pairs:
+        raw.append({"aspirate": {"position": source, "volume_ul": volume}})
+        raw.append({"dispense": {"position": target, "volume_ul": volume}})
+    return raw
+
+
+def _steps(raw):
+    steps = []
+    for i, entry in enumerate(raw):
+        command = next(iter(entry))
+        args = entry[command]
+        steps.append(
+            PlanStep(
+                index=i, command=command, args=args, position=args["position"],
+                coordinates=COORDS[args["position"]], instrument=args.get("instrument"),
+            )
+        )
+    return steps
+
+
+def test_same_source_transfers_are_merged():
+    raw = _raw_transfers(("res.A1", "plate.A1", 50.0), ("res.A1", "plate.A2", 50.0))
+    steps, batches = batch_trips(_steps(raw), 20.0, 200.0)
+    assert [s.command for s in steps] == ["aspirate", "dispense", "dispense"]
+    assert steps[0].args["volume_ul"] == 100.0
+    assert batches[0].dispense_steps == [1, 3]
+
+
+def test_max_volume_splits_batches():
+    raw = _raw_transfers(
+        ("res.A1", "plate.A1", 80.0), ("res.A1", "plate.A2", 80.0), ("res.A1", "plate.A3", 80.0)
+    )
+    steps, batches = batch_trips(_steps(raw), 20.0, 200.0)
+    assert [s.command for s in steps] == ["aspirate", "dispense", "dispense", "aspirate", "dispense"]
+    assert len(batches) == 1
+
+
+def test_out_of_range_or_mismatched_transfers_are_untouched():
+    raw = _raw_transfers(("res.A1", "plate.A1", 10.0), ("res.A1", "plate.A2", 10.0))
+    steps, batches = batch_trips(_steps(raw), 20.0, 200.0)
+    assert len(steps) == 4 and batches == []
+
+    raw = _raw_transfers(("res.A1", "plate.A1", 50.0))
+    raw.append({"aspirate": {"position": "res.A1", "volume_ul": 50.0, "speed": 2.0}})
+    raw.append({"dispense": {"position": "plate.A2", "volume_ul": 50.0}})
+    _, batches = batch_trips(_steps(raw), 20.0, 200.0)
+    assert batches == []
+
+
+def test_only_the_chosen_pipettes_transfers_are_merged():
+    raw = _raw_transfers(
+        ("res.A1", "plate.A1", 50.0),
+        ("res.A1", "plate.A2", 50.0),
+        ("res.A1", "plate.A3", 50.0),
+        ("res.A1", "plate.A1", 50.0),
+        ("res.A1", "plate.A2", 50.0),
+    )
+    owners = ["p200", "p200", "p1000", "p200", None]
+    for i, owner in enumerate(owners):
+        if owner is not None:
+            for step in raw[2 * i : 2 * i + 2]:
+                next(iter(step.values()))["instrument"] = owner
+
+    steps, batches = batch_trips(_steps(raw), 20.0, 200.0, "p200", sole=False)
+    # p1000's transfer is a barrier, and the unnamed one may not be p200's.
+    assert [b.dispense_steps for b in batches] == [[1, 3]]
+    assert [s.index for s in steps] == [0, 1, 3, 4, 5, 6, 7, 8, 9]
+
+    _, batches = batch_trips(_steps(raw), 20.0, 1000.0, "p1000", sole=False)
+    assert batches == []
+
+
+def test_report_counts_trips_and_time_saved():
+    raw = _raw_transfers(
+        ("res.A1", "plate.A1", 50.0), ("res.A1", "plate.A2", 50.0), ("res.A1", "plate.A3", 50.0)
+    )
+    plan = ProtocolPlan(
+        digest="d", gantry_file="g.yaml", deck_file="d.yaml", board_file="b.yaml",
+        protocol_file="p.yaml", gantry=GANTRY, instruments=["pipette"], steps=_steps(raw),
+    )
+    report = plan_trip_batches(plan, raw, pipette="pipette", min_volume=20.0, max_volume=200.0)
+    assert (report.trips_before, report.trips_after) == (3, 1)
+    assert report.time_saved_s > 0
+    assert report.protocol[0].args == {"position": "res.A1", "volume_ul": 150.0}
+    assert [s.command for s in report.protocol] == ["aspirate", "dispense", "dispense", "dispense"]
+    # The input protocol is not modified.
+    assert raw[0]["aspirate"]["volume_ul"] == 50.0
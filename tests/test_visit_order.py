@@ -0,0 +1,87 @@
+"""Test the travel-minimising visit order optimizer."""
+
+import time
+
+import numpy as np
+
+from zoo.models.gantry import GantryConfig
+from zoo.models.protocol import PlanStep, Position3D, ProtocolPlan
+from zoo.services.visit_order import optimize_visit_order, order_segment
+
+GANTRY = GantryConfig.model_validate(
+    {"working_volume": {"x_min": 0, "x_max": 500, "y_min": 0, "y_max": 500, "z_min": -50, "z_max": 0}}
+)
+
+
+def _plan(steps):
+    return ProtocolPlan(
+        digest="d", gantry_file="g.yaml", deck_file="d.yaml", board_file="b.yaml",
+        protocol_file="p.yaml", gantry=GANTRY, instruments=["uvvis"], steps=steps,
+    )
+
+
+def _step(i, command, x, y):
+    return PlanStep(
+        index=i, command=command, args={}, position=f"plate.{i}",
+        coordinates=Position3D(x=x, y=y, z=0.0),
+    )
+
+
+def test_zig_zag_is_straightened():
+    xs = [0, 90, 10, 80, 20, 70, 30, 60, 40, 50]
+    plan = _plan([_step(i, "scan", x, 0) for i, x in enumerate(xs)])
+    optimized, report = optimize_visit_order(plan)
+    assert [s.coordinates.x for s in optimized.steps] == sorted(xs)
+    assert report.travel_after_mm == 90.0
+    assert report.travel_before_mm > report.travel_after_mm
+    assert sorted(report.order) == list(range(len(xs)))
+
+
+def test_liquid_steps_are_barriers():
+    steps = [
+        _step(0, "scan", 50, 0),
+        _step(1, "scan", 10, 0),
+        _step(2, "aspirate", 100, 0),
+        _step(3, "scan", 90, 0),
+        _step(4, "scan", 0, 0),
+        PlanStep(index=5, command="wait", args={}),
+        _step(6, "scan", 20, 0),
+    ]
+    optimized, report = optimize_visit_order(_plan(steps))
+    order = [s.index for s in optimized.steps]
+    assert order[2] == 2 and order[5] == 5 and order[6] == 6
+    assert set(order[:2]) == {0, 1}
+    assert set(order[3:5]) == {3, 4}
+    assert report.segments == 2
+    assert report.travel_after_mm <= report.travel_before_mm
+
+
+def test_tip_pickup_between_aspirates_stays_in_place():
+    steps = [
+        _step(0, "aspirate", 50, 0),
+        _step(1, "pick_up_tip", 90, 0),
+        _step(2, "mix", 10, 0),
+        _step(3, "aspirate", 60, 0),
+        _step(4, "move", 0, 0),
+        _step(5, "scan", 70, 0),
+    ]
+    optimized, report = optimize_visit_order(_plan(steps))
+    assert [s.index for s in optimized.steps] == list(range(6))
+    assert report.segments == 0
+
+
+def test_never_worse_than_written_order():
+    points = np.array([[1.0, 0, 0], [2.0, 0, 0], [3.0, 0, 0]])
+    assert order_segment(np.zeros(3), points).tolist() == [0, 1, 2]
+
+
+def test_1536_well_plate_is_fast():
+    rng = np.random.default_rng(0)
+    wells = [(c * 2.25, r * 2.25) for r in range(32) for c in range(48)]
+    rng.shuffle(wells)
+    plan = _plan([_step(i, "scan", x, y) for i, (x, y) in enumerate(wells)])
+    t0 = time.perf_counter()
+    _, report = optimize_visit_order(plan)
+    elapsed = time.perf_counter() - t0
+    assert elapsed < 3.0
+    assert report.travel_after_mm < report.travel_before_mm / 5
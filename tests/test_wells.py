@@ -0,0 +1,53 @@
+"""Test batched well derivation against PANDA_CORE's per-well derivation."""
+
+import pytest
+from deck.loader import _derive_wells_from_calibration
+from deck.yaml_schema import WellPlateYamlEntry
+
+from zoo.services.wells import derive_well_grid
+
+
+def _entry(rows, columns, pitch, a1=(10.0, 20.0, -5.0)):
+    x, y, z = a1
+    return WellPlateYamlEntry.model_validate(
+        {
+            "type": "well_plate",
+            "name": f"plate_{rows * columns}",
+            "model_name": f"generic_{rows * columns}",
+            "rows": rows,
+            "columns": columns,
+            "length_mm": 127.76,
+            "width_mm": 85.48,
+            "height_mm": 14.22,
+            "calibration": {
+                "a1": {"x": x, "y": y, "z": z},
+                "a2": {"x": x + pitch, "y": y, "z": z},
+            },
+            "x_offset_mm": pitch,
+            "y_offset_mm": pitch,
+            "capacity_ul": 200.0,
+            "working_volume_ul": 150.0,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "rows, columns, pitch", [(8, 12, 9.0), (16, 24, 4.5), (32, 48, 2.25)]
+)
+def test_matches_panda_core_derivation(rows, columns, pitch):
+    entry = _entry(rows, columns, pitch)
+    expected = {
+        wid: {"x": round(c.x, 3), "y": round(c.y, 3), "z": round(c.z, 3)}
+        for wid, c in _derive_wells_from_calibration(entry).items()
+    }
+    # First call learns the layout; the second takes the batched path.
+    assert derive_well_grid(entry).to_dict() == expected
+    moved = _entry(rows, columns, pitch, a1=(12.5, 18.25, -4.0))
+    expected_moved = {
+        wid: {"x": round(c.x, 3), "y": round(c.y, 3), "z": round(c.z, 3)}
+        for wid, c in _derive_wells_from_calibration(moved).items()
+    }
+    grid = derive_well_grid(moved)
+    assert grid.to_dict() == expected_moved
+    assert list(grid.ids) == list(expected_moved)
+    assert grid.coords.shape == (rows * columns, 3)
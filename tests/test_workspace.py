@@ -0,0 +1,55 @@
+"""Test the workspace snapshot endpoint."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zoo.app import create_app
+from zoo.config import get_settings
+from zoo.routers import workspace
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        configs = Path(d) / "configs"
+        configs.mkdir()
+        (configs / "protocol.yaml").write_text("protocol:\n- home:\n")
+        monkeypatch.setattr(get_settings(), "panda_core_path", Path(d))
+        monkeypatch.setattr(get_settings(), "cache_dir", Path(d) / "cache")
+        yield TestClient(create_app())
+
+
+def test_snapshot_matches_the_individual_endpoints(client):
+    parts = client.get("/api/workspace", params={"protocol": "protocol.yaml"}).json()["parts"]
+    assert parts["configs"]["data"]["protocol"] == client.get("/api/protocol/configs").json()
+    assert parts["commands"]["data"] == client.get("/api/protocol/commands").json()
+    assert parts["board_catalogue"]["data"] == client.get("/api/board/catalogue").json()
+    r = client.get("/api/protocol/protocol.yaml")
+    assert parts["protocol"]["data"] == r.json()
+    assert parts["protocol"]["etag"] == r.headers["etag"]
+
+
+def test_known_parts_are_not_resent_and_missing_files_fail_alone(client):
+    first = client.get("/api/workspace", params={"protocol": "protocol.yaml"}).json()["parts"]
+    have = [f"{name}:{part['etag']}" for name, part in first.items()]
+    parts = client.get(
+        "/api/workspace", params={"protocol": "protocol.yaml", "deck": "missing.yaml", "have": have}
+    ).json()["parts"]
+    assert all(parts[name]["unchanged"] for name in first)
+    assert all(parts[name].get("data") is None for name in first)
+    assert parts["deck"]["status"] == 404
+
+
+def test_server_errors_are_500_and_invalid_configs_400(client, monkeypatch, caplog):
+    def broken():
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(workspace, "_commands_part", broken)
+    (get_settings().configs_dir / "bad.yaml").write_text("protocol: [\n")
+    parts = client.get("/api/workspace", params={"protocol": "bad.yaml"}).json()["parts"]
+    assert parts["commands"]["status"] == 500
+    assert "Workspace part failed" in caplog.text
+    assert parts["protocol"]["status"] == 400
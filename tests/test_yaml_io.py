@@ -3,7 +3,17 @@
 import tempfile
 from pathlib import Path
 
-from zoo.services.yaml_io import classify_config, read_yaml, write_yaml
+import yaml
+
+from zoo.services.yaml_io import (
+    cache_stats,
+    classify_config,
+    classify_config_file,
+    classify_yaml,
+    clear_cache,
+    read_yaml,
+    write_yaml,
+)
 
 
 def test_read_write_roundtrip():
@@ -36,6 +46,41 @@ def test_classify_unknown():
     assert classify_config({"other": {}}) is None
 
 
+def test_classify_yaml_matches_classify_config():
+    docs = [
+        "labware:\n  plate_1: {type: well_plate}\n",
+        "instruments: {}\n",
+        "serial_port: /dev/ttyUSB0\ncnc:\n  homing_strategy: standard\nworking_volume: {}\n",
+        "protocol:\n- move: {instrument: p, position: plate_1.A1}\n",
+        "other: {labware: 1}\n",
+        "- labware\n",
+        "just a scalar\n",
+        "",
+    ]
+    for doc in docs:
+        data = yaml.safe_load(doc)
+        expected = classify_config(data) if isinstance(data, dict) else None
+        assert classify_yaml(doc) == expected, doc
+
+
+def test_classify_yaml_skips_nested_and_complex_keys():
+    doc = "meta:\n  protocol: []\n? [a, b]\n: labware\nworking_volume: {}\n"
+    assert classify_yaml(doc) == "gantry"
+
+
+def test_classify_yaml_stops_before_syntax_error():
+    # Only the header is read, so trailing garbage is never reached.
+    assert classify_yaml("protocol:\n- move: {}\n- : : [\n") == "protocol"
+
+
+def test_classify_config_file():
+    with tempfile.NamedTemporaryFile(suffix=".yaml", delete=False, mode="w") as f:
+        f.write("protocol:\n" + "- home: null\n" * 1000)
+        path = Path(f.name)
+    assert classify_config_file(path) == "protocol"
+    path.unlink()
+
+
 def test_read_empty_yaml():
     with tempfile.NamedTemporaryFile(suffix=".yaml", delete=False, mode="w") as f:
         f.write("")
@@ -43,3 +88,44 @@ def test_read_empty_yaml():
     result = read_yaml(path)
     assert result == {}
     path.unlink()
+
+
+def test_read_yaml_cache_hit():
+    clear_cache()
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        path.write_text("labware: {}\n")
+        assert read_yaml(path) == {"labware": {}}
+        assert read_yaml(path) == {"labware": {}}
+    stats = cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_read_yaml_cache_returns_copies():
+    clear_cache()
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "deck.yaml"
+        path.write_text("labware: {}\n")
+        read_yaml(path)["labware"]["plate"] = {}
+        assert read_yaml(path) == {"labware": {}}
+
+
+def test_read_yaml_cache_sees_external_edit():
+    clear_cache()
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "gantry.yaml"
+        path.write_text("working_volume: {}\n")
+        read_yaml(path)
+        path.write_text("working_volume: {x_min: 0}\n")
+        assert read_yaml(path) == {"working_volume": {"x_min": 0}}
+
+
+def test_write_yaml_is_write_through():
+    clear_cache()
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "board.yaml"
+        write_yaml(path, {"instruments": {"p": {"type": "mock"}}})
+        assert read_yaml(path) == {"instruments": {"p": {"type": "mock"}}}
+    assert cache_stats()["hits"] == 1
+    assert cache_stats()["misses"] == 0
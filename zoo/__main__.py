@@ -1,5 +1,10 @@
-"""`python -m zoo` entry point."""
+"""`python -m zoo` entry point.
 
+``python -m zoo`` serves the app; ``python -m zoo simulate GANTRY DECK BOARD
+PROTOCOL`` prints a dry-run estimate for a protocol instead.
+"""
+
+import argparse
 import subprocess
 import sys
 import threading
@@ -27,7 +32,58 @@ def _build_frontend() -> None:
     )
 
 
+def _simulate(args: argparse.Namespace) -> None:
+    from zoo.config import get_settings
+    from zoo.services.protocol_plan import PlanCompileError, plan_cache
+    from zoo.services.simulator import simulate
+    from zoo.services.yaml_io import resolve_config_path
+
+    configs_dir = get_settings().configs_dir
+    files = (args.gantry, args.deck, args.board, args.protocol)
+    paths = tuple(
+        resolve_config_path(configs_dir, kind, filename)
+        for kind, filename in zip(("gantry", "deck", "board", "protocol"), files)
+    )
+    try:
+        report = simulate(plan_cache.get(files, paths), slowest=args.slowest)
+    except (OSError, PlanCompileError) as e:
+        sys.exit(f"Error: {e}")
+
+    if args.json:
+        print(report.model_dump_json(indent=2))
+        return
+    print(f"Steps:        {len(report.steps)}")
+    print(f"Total time:   {report.total_time_s:.1f} s")
+    print(f"Travel:       {report.travel_mm:.1f} mm "
+          f"(X {report.travel_xyz_mm.x:.1f}, Y {report.travel_xyz_mm.y:.1f}, "
+          f"Z {report.travel_xyz_mm.z:.1f})")
+    print("Slowest steps:")
+    for step in report.slowest:
+        print(f"  #{step.index:<5} {step.command:<12} {step.position or '':<16} "
+              f"{step.duration_s:.2f} s")
+    for violation in report.violations:
+        print(f"Warning: {violation}")
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m zoo")
+    sub = parser.add_subparsers(dest="command")
+    sim = sub.add_parser("simulate", help="Estimate a protocol's run time without a gantry")
+    sim.add_argument("gantry", help="Gantry config filename")
+    sim.add_argument("deck", help="Deck config filename")
+    sim.add_argument("board", help="Board config filename")
+    sim.add_argument("protocol", help="Protocol filename")
+    sim.add_argument("--slowest", type=int, default=5, help="Number of slowest steps to list")
+    sim.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    return parser.parse_args(argv)
+
+
 def main() -> None:
+    args = _parse_args(sys.argv[1:])
+    if args.command == "simulate":
+        _simulate(args)
+        return
+
     settings = ZooSettings()
 
     if not FRONTEND_DIST.is_dir():
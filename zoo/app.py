@@ -5,9 +5,12 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from zoo.routers import board, deck, gantry, protocol, raw, settings
+from zoo.config import get_settings
+from zoo.routers import board, deck, events, gantry, protocol, raw, settings, workspace
+from zoo.services import yaml_io
 
 FRONTEND_DIST = Path(__file__).parent.parent / "frontend" / "dist"
 logger = logging.getLogger(__name__)
@@ -15,7 +18,14 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    yaml_io.watch_configs(get_settings().configs_dir)
     yield
+    yaml_io.stop_watching()
+    # Shutdown: put any coalesced config edits on disk before exiting.
+    try:
+        yaml_io.flush()
+    except OSError as e:
+        logger.error("Could not write pending config changes: %s", e)
     # Shutdown: disconnect the gantry so the serial port is released cleanly
     if gantry._gantry is not None:
         logger.info("Shutting down — disconnecting gantry")
@@ -24,16 +34,21 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning("Error disconnecting gantry on shutdown: %s", e)
         gantry._gantry = None
+    gantry._actor.stop()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title="Zoo — PANDA_CORE Visualizer", lifespan=lifespan)
+    # Deck bodies with large plates compress several-fold; small ones aren't worth it.
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
     app.include_router(deck.router)
     app.include_router(board.router)
     app.include_router(gantry.router)
     app.include_router(protocol.router)
     app.include_router(raw.router)
     app.include_router(settings.router)
+    app.include_router(workspace.router)
+    app.include_router(events.router)
 
     if FRONTEND_DIST.is_dir():
         app.mount("/", StaticFiles(directory=FRONTEND_DIST, html=True), name="frontend")
@@ -8,6 +8,16 @@ class ZooSettings(BaseSettings):
     host: str = "127.0.0.1"
     port: int = 8742
     open_browser: bool = True
+    # Seconds between gantry status queries while position streams are open.
+    position_poll_interval: float = 0.1
+    # Maximum commands waiting for the gantry's serial port.
+    serial_queue_depth: int = 32
+    # Maximum moves waiting in the gantry motion queue.
+    motion_queue_depth: int = 16
+    # Jog deltas streamed within this many seconds become one $J= command.
+    jog_coalesce_window: float = 0.03
+    # Where derived data (e.g. the config classification index) is persisted.
+    cache_dir: Path = Path.home() / ".cache" / "zoo"
 
     class Config:
         env_prefix = "ZOO_"
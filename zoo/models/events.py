@@ -0,0 +1,19 @@
+"""Pydantic models for server-pushed events."""
+
+from __future__ import annotations
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+class ConfigChangeEvent(BaseModel):
+    """A YAML config under ``configs_dir`` changed on disk.
+
+    ``resync`` means events may have been missed (the watched directory
+    changed, or the client fell behind); refetch everything.
+    """
+    type: Literal["created", "modified", "deleted", "resync"]
+    kind: Optional[Literal["gantry", "deck", "board", "protocol"]] = None
+    filename: Optional[str] = None
+    seq: int
@@ -44,3 +44,29 @@ class GantryPosition(BaseModel):
     work_z: Optional[float] = None
     status: str = "Unknown"
     connected: bool = False
+    # A halt soft-reset GRBL mid-move: position is lost until homed or unlocked.
+    needs_homing: bool = False
+
+
+class JogMessage(BaseModel):
+    """One message on the jog WebSocket: a relative delta, or a stop."""
+    model_config = ConfigDict(extra="forbid", allow_inf_nan=False)
+    x: float = 0.0
+    y: float = 0.0
+    z: float = 0.0
+    stop: bool = False
+
+
+class MoveJob(BaseModel):
+    """One queued absolute move and its lifecycle."""
+    id: str
+    x: float
+    y: float
+    z: float
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    error: Optional[str] = None
+    # Cancelled mid-move by a halt; GRBL lost position (ALARM 3).
+    position_lost: bool = False
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
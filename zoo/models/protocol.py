@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 
+from zoo.models.gantry import GantryConfig
+
 
 class CommandArg(BaseModel):
     """Description of a single argument for a protocol command."""
@@ -33,13 +35,177 @@ class ProtocolConfig(BaseModel):
     protocol: List[ProtocolStepConfig]
 
 
+class ProtocolStepWindow(BaseModel):
+    """Steps ``offset`` .. ``offset + len(steps)`` of a protocol of ``total`` steps."""
+    filename: str
+    offset: int
+    total: int
+    steps: List[ProtocolStepConfig]
+
+
+class ProtocolStepCount(BaseModel):
+    filename: str
+    count: int
+
+
+class StepOperation(BaseModel):
+    """Insert before, replace or delete the step at ``index``."""
+    op: Literal["insert", "replace", "delete"]
+    index: int
+    step: Optional[ProtocolStepConfig] = None
+
+
+class ProtocolPatch(BaseModel):
+    """Step operations, applied in order to the saved protocol."""
+    ops: List[StepOperation]
+
+
+class ProtocolPatchResponse(BaseModel):
+    filename: str
+    step_count: int
+
+
 class ProtocolResponse(BaseModel):
     """Parsed protocol file returned by the API."""
     filename: str
     steps: List[ProtocolStepConfig]
 
 
+class StepError(BaseModel):
+    """One validation problem, located by step index and argument."""
+    index: int
+    command: str
+    field: Optional[str] = None
+    message: str
+
+
 class ProtocolValidationResponse(BaseModel):
     """Result of protocol validation."""
     valid: bool
     errors: List[str] = []
+    step_errors: List[StepError] = []
+
+
+class StepSplice(BaseModel):
+    """Replace ``delete`` steps at ``start`` with ``insert``."""
+    start: int
+    delete: int = 0
+    insert: List[ProtocolStepConfig] = []
+
+
+class IncrementalValidationRequest(BaseModel):
+    """Either a whole protocol, or changes to a previously validated version."""
+    protocol: Optional[List[ProtocolStepConfig]] = None
+    base_version: Optional[str] = None
+    changes: List[StepSplice] = []
+
+
+class IncrementalValidationResponse(ProtocolValidationResponse):
+    """Validation result plus the version id to send changes against."""
+    version: str
+    step_count: int
+    revalidated: int
+
+
+class ProtocolRun(BaseModel):
+    """State of a background protocol run."""
+    id: str
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    gantry_file: str
+    deck_file: str
+    board_file: str
+    protocol_file: str
+    total_steps: int = 0
+    steps_completed: int = 0
+    current_step: Optional[int] = None
+    current_command: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class Position3D(BaseModel):
+    """Absolute deck coordinates in mm."""
+    x: float
+    y: float
+    z: float
+
+
+class PlanStep(BaseModel):
+    """One step of a compiled plan: validated args and resolved target."""
+    index: int
+    command: str
+    args: Dict[str, Any]
+    position: Optional[str] = None
+    coordinates: Optional[Position3D] = None
+    instrument: Optional[str] = None
+
+
+class ProtocolPlan(BaseModel):
+    """Resolved execution plan for a gantry/deck/board/protocol combination."""
+    digest: str
+    gantry_file: str
+    deck_file: str
+    board_file: str
+    protocol_file: str
+    gantry: GantryConfig
+    instruments: List[str]
+    steps: List[PlanStep]
+
+
+class SimulatedStep(BaseModel):
+    """Estimated timing and travel of one plan step."""
+    index: int
+    command: str
+    position: Optional[str] = None
+    start_s: float
+    duration_s: float
+    travel_mm: float
+
+
+class SimulationReport(BaseModel):
+    """Dry-run estimate for a compiled plan."""
+    digest: str
+    total_time_s: float
+    travel_mm: float
+    travel_xyz_mm: Position3D
+    steps: List[SimulatedStep]
+    slowest: List[SimulatedStep]
+    violations: List[str]
+
+
+class VisitOrderReport(BaseModel):
+    """Travel before and after reordering a plan's independent steps."""
+    digest: str
+    travel_before_mm: float
+    travel_after_mm: float
+    segments: int
+    order: List[int]  # original step indices in their new order
+
+
+class OptimizedPlan(BaseModel):
+    plan: ProtocolPlan
+    report: VisitOrderReport
+
+
+class TripBatch(BaseModel):
+    """One aspiration serving several consecutive dispenses."""
+    source: str
+    aspirate_volume_ul: float
+    dispense_steps: List[int]  # original step indices
+
+
+class TripBatchingReport(BaseModel):
+    """Proposed (or applied) multi-dispense plan for a protocol."""
+    pipette: str
+    min_volume: float
+    max_volume: float
+    trips_before: int
+    trips_after: int
+    time_before_s: float
+    time_after_s: float
+    time_saved_s: float
+    batches: List[TripBatch]
+    protocol: List[ProtocolStepConfig]
+    applied: bool = False
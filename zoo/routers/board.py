@@ -1,16 +1,24 @@
 """Board config API endpoints — thin layer over PANDA_CORE board schema."""
 
 import inspect
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from board.loader import INSTRUMENT_REGISTRY
+from board import loader as board_loader
 from board.yaml_schema import BoardYamlSchema
-from fastapi import APIRouter, HTTPException
-from instruments.base_instrument import BaseInstrument
-from instruments.pipette.models import PIPETTE_MODELS
+from fastapi import APIRouter, Header, HTTPException, Response
+from instruments import base_instrument
+from instruments.pipette import models as pipette_specs
 from pydantic import BaseModel
 
 from zoo.config import get_settings
+from zoo.services.http_cache import content_etag, file_etag, matches, not_modified, set_etag
+from zoo.services.merge_patch import (
+    apply_merge_patch,
+    entries_validate_alone,
+    only_touches,
+    section_diff,
+)
 from zoo.services.yaml_io import list_configs, read_yaml, resolve_config_path, write_yaml
 
 router = APIRouter(prefix="/api/board", tags=["board"])
@@ -18,11 +26,6 @@ router = APIRouter(prefix="/api/board", tags=["board"])
 # Primitive types that can be represented in YAML / JSON form fields.
 _PRIMITIVE_TYPES = {str, int, float, bool}
 
-# Base-class params rendered separately by the UI (offsets, depth, etc.).
-_BASE_PARAMS = {
-    p for p in inspect.signature(BaseInstrument.__init__).parameters if p != "self"
-}
-
 
 # ── Response models (API shape only) ──────────────────────────────────
 
@@ -32,6 +35,13 @@ class BoardResponse(BaseModel):
     instruments: Dict[str, Dict[str, Any]]
 
 
+class BoardPatchResponse(BaseModel):
+    """Only the instruments a patch added or changed, plus the names it removed."""
+    filename: str
+    instruments: Dict[str, Dict[str, Any]]
+    removed: List[str]
+
+
 class PipetteModelInfo(BaseModel):
     name: str
     family: str
@@ -53,6 +63,12 @@ class InstrumentFieldInfo(BaseModel):
     choices: Optional[List[str]] = None
 
 
+class BoardCatalogue(BaseModel):
+    instrument_types: List[InstrumentTypeInfo]
+    pipette_models: List[PipetteModelInfo]
+    instrument_schemas: Dict[str, List[InstrumentFieldInfo]]
+
+
 # ── Helpers ────────────────────────────────────────────────────────────
 
 
@@ -79,13 +95,20 @@ def _is_primitive(annotation: Any) -> bool:
     return False
 
 
-def _build_instrument_fields(type_key: str) -> List[InstrumentFieldInfo]:
+def _base_params() -> Set[str]:
+    """Base-class params rendered separately by the UI (offsets, depth, etc.)."""
+    init = base_instrument.BaseInstrument.__init__
+    return {p for p in inspect.signature(init).parameters if p != "self"}
+
+
+def _build_instrument_fields(
+    cls: type, pipette_choices: List[str], base_params: Set[str]
+) -> List[InstrumentFieldInfo]:
     """Introspect an instrument class's __init__ to build field metadata."""
-    cls = INSTRUMENT_REGISTRY[type_key]
     sig = inspect.signature(cls.__init__)
     fields: List[InstrumentFieldInfo] = []
     for param_name, param in sig.parameters.items():
-        if param_name == "self" or param_name in _BASE_PARAMS:
+        if param_name == "self" or param_name in base_params:
             continue
         annotation = param.annotation if param.annotation != inspect.Parameter.empty else str
         if not _is_primitive(annotation):
@@ -94,7 +117,7 @@ def _build_instrument_fields(type_key: str) -> List[InstrumentFieldInfo]:
         default = None if required else param.default
         choices = None
         if param_name == "pipette_model":
-            choices = sorted(PIPETTE_MODELS.keys())
+            choices = pipette_choices
         fields.append(
             InstrumentFieldInfo(
                 name=param_name,
@@ -107,38 +130,96 @@ def _build_instrument_fields(type_key: str) -> List[InstrumentFieldInfo]:
     return fields
 
 
+class _Catalogue:
+    """Everything the board editor needs about PANDA_CORE, introspected once."""
+
+    def __init__(self) -> None:
+        # Looked up through the modules, so a reloaded PANDA_CORE is seen.
+        registry = board_loader.INSTRUMENT_REGISTRY
+        models = pipette_specs.PIPETTE_MODELS
+        pipette_choices = sorted(models.keys())
+        base_params = _base_params()
+        self.model = BoardCatalogue(
+            instrument_types=[
+                InstrumentTypeInfo(type=key, is_mock=key.startswith("mock_"))
+                for key in sorted(registry.keys())
+            ],
+            pipette_models=[
+                PipetteModelInfo(
+                    name=cfg.name,
+                    family=cfg.family.value,
+                    channels=cfg.channels,
+                    max_volume=cfg.max_volume,
+                    min_volume=cfg.min_volume,
+                )
+                for cfg in models.values()
+            ],
+            instrument_schemas={
+                type_key: _build_instrument_fields(
+                    registry[type_key], pipette_choices, base_params
+                )
+                for type_key in sorted(registry.keys())
+            },
+        )
+        self.body = self.model.model_dump_json().encode()
+        self.etag = content_etag(self.body)
+
+
+def _registry_state() -> Tuple[Any, ...]:
+    """Changes when PANDA_CORE is reloaded (new class objects) or moved.
+
+    Read through the modules at call time: ``importlib.reload`` rebinds
+    their attributes to new objects.
+    """
+    return (
+        str(get_settings().panda_core_path),
+        id(base_instrument.BaseInstrument),
+        tuple((key, id(cls)) for key, cls in board_loader.INSTRUMENT_REGISTRY.items()),
+        tuple((key, id(cfg)) for key, cfg in pipette_specs.PIPETTE_MODELS.items()),
+    )
+
+
+_catalogue: Optional[Tuple[Tuple[Any, ...], _Catalogue]] = None
+_catalogue_lock = threading.Lock()
+
+
+def _get_catalogue() -> _Catalogue:
+    global _catalogue
+    state = _registry_state()
+    with _catalogue_lock:
+        if _catalogue is None or _catalogue[0] != state:
+            _catalogue = (state, _Catalogue())
+        return _catalogue[1]
+
+
 # ── Routes ─────────────────────────────────────────────────────────────
 
 
+@router.get("/catalogue", response_model=BoardCatalogue)
+def get_catalogue(if_none_match: Optional[str] = Header(None)) -> Response:
+    """Instrument types, pipette models and instrument schemas in one response."""
+    catalogue = _get_catalogue()
+    if matches(if_none_match, catalogue.etag):
+        return not_modified(catalogue.etag)
+    response = Response(catalogue.body, media_type="application/json")
+    set_etag(response, catalogue.etag)
+    return response
+
+
 @router.get("/instrument-types")
 def list_instrument_types() -> List[InstrumentTypeInfo]:
-    return [
-        InstrumentTypeInfo(type=key, is_mock=key.startswith("mock_"))
-        for key in sorted(INSTRUMENT_REGISTRY.keys())
-    ]
+    return _get_catalogue().model.instrument_types
 
 
 @router.get("/pipette-models")
 def list_pipette_models() -> List[PipetteModelInfo]:
-    return [
-        PipetteModelInfo(
-            name=cfg.name,
-            family=cfg.family.value,
-            channels=cfg.channels,
-            max_volume=cfg.max_volume,
-            min_volume=cfg.min_volume,
-        )
-        for cfg in PIPETTE_MODELS.values()
-    ]
+    return _get_catalogue().model.pipette_models
 
 
 @router.get("/instrument-schemas")
 def get_instrument_schemas() -> Dict[str, List[InstrumentFieldInfo]]:
     """Return per-type field schemas introspected from PANDA_CORE instrument classes."""
-    return {
-        type_key: _build_instrument_fields(type_key)
-        for type_key in sorted(INSTRUMENT_REGISTRY.keys())
-    }
+    return _get_catalogue().model.instrument_schemas
 
 
 @router.get("/configs")
@@ -146,12 +227,8 @@ def list_board_configs() -> list[str]:
     return list_configs(get_settings().configs_dir, "board")
 
 
-@router.get("/{filename}")
-def get_board(filename: str) -> BoardResponse:
+def _board_response(filename: str) -> BoardResponse:
     path = resolve_config_path(get_settings().configs_dir, "board", filename)
-    if not path.is_file():
-        raise HTTPException(404, f"Config not found: {filename}")
-
     raw = read_yaml(path)
     # Validate through PANDA_CORE's schema.
     try:
@@ -166,8 +243,59 @@ def get_board(filename: str) -> BoardResponse:
     return BoardResponse(filename=filename, instruments=instruments)
 
 
+@router.get("/{filename}")
+def get_board(
+    filename: str, response: Response, if_none_match: Optional[str] = Header(None)
+) -> BoardResponse:
+    path = resolve_config_path(get_settings().configs_dir, "board", filename)
+    if not path.is_file():
+        raise HTTPException(404, f"Config not found: {filename}")
+    etag = file_etag(path)
+    if matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return _board_response(filename)
+
+
 @router.put("/{filename}")
-def put_board(filename: str, body: dict) -> BoardResponse:
+def put_board(filename: str, body: dict, response: Response) -> BoardResponse:
     path = resolve_config_path(get_settings().configs_dir, "board", filename)
     write_yaml(path, body)
-    return get_board(filename)
+    set_etag(response, file_etag(path))
+    return _board_response(filename)
+
+
+@router.patch("/{filename}")
+def patch_board(filename: str, body: dict, response: Response) -> BoardPatchResponse:
+    """Apply an RFC 7396 merge patch; only touched instruments are re-validated.
+
+    The whole board is validated instead when the patch touches more than
+    ``instruments``, or when PANDA_CORE's schema has checks spanning
+    several instruments (see ``entries_validate_alone``).
+    """
+    path = resolve_config_path(get_settings().configs_dir, "board", filename)
+    if not path.is_file():
+        raise HTTPException(404, f"Config not found: {filename}")
+    raw = read_yaml(path)
+    patched = apply_merge_patch(raw, body)
+    changed, removed = section_diff(raw, patched, "instruments")
+    instruments = patched.get("instruments") or {}
+    try:
+        if not (
+            only_touches(body, "instruments")
+            and entries_validate_alone(BoardYamlSchema, "instruments")
+        ):
+            BoardYamlSchema.model_validate(patched)
+        elif changed:
+            BoardYamlSchema.model_validate(
+                {"instruments": {name: instruments[name] for name in changed}}
+            )
+    except Exception as e:
+        raise HTTPException(400, str(e))
+    write_yaml(path, patched)
+    set_etag(response, file_etag(path))
+    return BoardPatchResponse(
+        filename=filename,
+        instruments={name: instruments[name] for name in changed},
+        removed=removed,
+    )
@@ -1,16 +1,18 @@
-"""Deck config API endpoints — thin layer over PANDA_CORE deck loader."""
+"""Deck config API endpoints — thin layer over PANDA_CORE deck schema and loader."""
 
+import json
+from pathlib import Path
 from typing import Any, Dict, Optional
 
-from deck import load_deck_from_yaml
-from deck.labware.well_plate import WellPlate
-from deck.loader import _derive_wells_from_calibration
-from deck.yaml_schema import WellPlateYamlEntry
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 from zoo.config import get_settings
-from zoo.services.yaml_io import list_configs, read_yaml, resolve_config_path, write_yaml
+from zoo.services import deck_payload, deck_service
+from zoo.services.http_cache import file_etag, matches, not_modified, set_etag
+from zoo.services.wells import well_grid_for_config
+from zoo.services.yaml_io import list_configs, resolve_config_path
 
 router = APIRouter(prefix="/api/deck", tags=["deck"])
 
@@ -35,6 +37,13 @@ class DeckResponse(BaseModel):
     labware: list[LabwareResponse]
 
 
+class DeckPatchResponse(BaseModel):
+    """Only the labware a patch added or changed, plus the keys it removed."""
+    filename: str
+    labware: list[LabwareResponse]
+    removed: list[str]
+
+
 # ── Routes ─────────────────────────────────────────────────────────────
 
 
@@ -43,50 +52,106 @@ def list_deck_configs() -> list[str]:
     return list_configs(get_settings().configs_dir, "deck")
 
 
-@router.get("/{filename}")
-def get_deck(filename: str) -> DeckResponse:
-    path = resolve_config_path(get_settings().configs_dir, "deck", filename)
+def _deck_path(filename: str) -> Path:
+    return resolve_config_path(get_settings().configs_dir, "deck", filename)
+
+
+_MEDIA_TYPES = {
+    deck_payload.JSON: "application/json",
+    deck_payload.COLUMNAR: deck_payload.COLUMNAR_MEDIA_TYPE,
+    deck_payload.BINARY: deck_payload.BINARY_MEDIA_TYPE,
+}
+
+
+def _render(filename: str, version: deck_service.DeckVersion, fmt: str, etag: str) -> Response:
+    # Pre-serialised bytes: validating one WellPosition per well would cost
+    # more than deriving the wells.
+    response = Response(version.render(filename, fmt), media_type=_MEDIA_TYPES[fmt])
+    set_etag(response, etag)
+    # The body depends on Accept; gzip adds Accept-Encoding when it compresses.
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+@router.get("/{filename}", response_model=DeckResponse)
+def get_deck(
+    filename: str,
+    format: Optional[str] = Query(None, pattern="^(json|columnar|binary)$"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """Deck labware with derived wells.
+
+    ``format=columnar`` (or ``Accept: application/vnd.zoo.columnar+json``)
+    and ``format=binary`` (or ``Accept: application/octet-stream``) return
+    well coordinates as packed float32 columns; see ``deck_payload``.
+    """
+    path = _deck_path(filename)
     if not path.is_file():
         raise HTTPException(404, f"Config not found: {filename}")
-
-    # Use PANDA_CORE's loader for validation + well derivation.
+    fmt = deck_payload.negotiate(format, accept)
+    etag = file_etag(path, fmt)
+    if matches(if_none_match, etag):
+        response = not_modified(etag)
+        response.headers["Vary"] = "Accept"
+        return response
     try:
-        deck = load_deck_from_yaml(path)
+        version = deck_service.load(path)
     except Exception as e:
         raise HTTPException(400, str(e))
+    return _render(filename, version, fmt, etag)
 
-    raw = read_yaml(path)
-    items: list[LabwareResponse] = []
-    for key, labware in deck.labware.items():
-        config = raw.get("labware", {}).get(key, {})
-        wells = None
-        if isinstance(labware, WellPlate):
-            wells = {
-                wid: WellPosition(x=c.x, y=c.y, z=c.z)
-                for wid, c in labware.wells.items()
-            }
-        items.append(LabwareResponse(key=key, config=config, wells=wells))
 
-    return DeckResponse(filename=filename, labware=items)
+@router.post("/preview-wells", response_model=Dict[str, WellPosition])
+def preview_wells(body: dict) -> Response:
+    """Compute well positions from a well plate config using PANDA_CORE's
+    calibration logic, without requiring the config to be saved first.
+
+    Results are cached by the config's content, and identical concurrent
+    previews share one computation.
+    """
+    try:
+        return Response(well_grid_for_config(body).json, media_type="application/json")
+    except Exception as e:
+        raise HTTPException(400, str(e))
 
 
-@router.post("/preview-wells")
-def preview_wells(body: dict) -> Dict[str, WellPosition]:
-    """Compute well positions from a well plate config using PANDA_CORE's
-    calibration logic, without requiring the config to be saved first."""
+@router.put("/{filename}", response_model=DeckResponse)
+def put_deck(filename: str, body: dict) -> Response:
+    path = _deck_path(filename)
     try:
-        entry = WellPlateYamlEntry.model_validate(body)
-        wells = _derive_wells_from_calibration(entry)
-        return {
-            wid: WellPosition(x=round(c.x, 3), y=round(c.y, 3), z=round(c.z, 3))
-            for wid, c in wells.items()
-        }
+        version = deck_service.save(path, body)
     except Exception as e:
         raise HTTPException(400, str(e))
+    return _render(filename, version, deck_payload.JSON, file_etag(path, deck_payload.JSON))
 
 
-@router.put("/{filename}")
-def put_deck(filename: str, body: dict) -> DeckResponse:
-    path = resolve_config_path(get_settings().configs_dir, "deck", filename)
-    write_yaml(path, body)
-    return get_deck(filename)
+@router.patch("/{filename}", response_model=DeckPatchResponse)
+def patch_deck(filename: str, body: dict) -> Response:
+    """Apply an RFC 7396 merge patch, e.g. ``{"labware": {"plate_1": {"x_offset_mm": 9.5}}}``.
+
+    The whole deck is re-validated by PANDA_CORE's loader; only the touched
+    labware is returned, with freshly derived wells. ``null`` removes a key.
+    """
+    path = _deck_path(filename)
+    if not path.is_file():
+        raise HTTPException(404, f"Config not found: {filename}")
+    try:
+        version, changed, removed = deck_service.patch(path, body)
+    except Exception as e:
+        raise HTTPException(400, str(e))
+    fresh = set(changed)
+    labware = [
+        {"key": key, "config": config, "wells": grid.to_dict() if grid else None}
+        for key, config, grid in version.items
+        if key in fresh
+    ]
+    response = Response(
+        json.dumps(
+            {"filename": filename, "labware": labware, "removed": removed},
+            separators=(",", ":"),
+        ),
+        media_type="application/json",
+    )
+    set_etag(response, file_etag(path, deck_payload.JSON))
+    return response
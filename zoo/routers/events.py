@@ -0,0 +1,29 @@
+"""Server-sent config change events."""
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from zoo.services.config_events import hub
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+@router.get("")
+async def config_events() -> StreamingResponse:
+    """One ``config`` event per created, modified or deleted YAML config.
+
+    Each carries the config ``kind`` and ``filename``. A ``resync`` event
+    means the client should refetch everything. Comment lines keep idle
+    connections open through proxies.
+    """
+
+    async def stream():
+        async for event in hub.subscribe():
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: config\nid: {event.seq}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
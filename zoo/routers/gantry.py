@@ -1,26 +1,53 @@
 """Gantry config + position API endpoints."""
 
+import asyncio
 import logging
-import threading
 import time
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+import serial
+from fastapi import APIRouter, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
 from gantry import Gantry
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from zoo.config import get_settings
-from zoo.models.gantry import GantryConfig, GantryPosition, GantryResponse
+from zoo.models.gantry import GantryConfig, GantryPosition, GantryResponse, JogMessage, MoveJob
+from zoo.services.http_cache import file_etag, matches, not_modified, set_etag
+from zoo.services.jog_stream import JogCoalescer
+from zoo.services.motion_queue import MotionQueue
+from zoo.services.position_stream import PositionBroadcaster
+from zoo.services.serial_actor import CommandTimeoutError, Priority, QueueFullError, SerialActor
 from zoo.services.yaml_io import list_configs, read_yaml, resolve_config_path, write_yaml
 
 router = APIRouter(prefix="/api/gantry", tags=["gantry"])
 
 # Single Gantry instance shared across requests.
 _gantry: Optional[Gantry] = None
-# Serialize all serial port access so position polls and jogs don't collide.
-_serial_lock = threading.Lock()
-# Last known good position — returned when the lock is busy.
+# Owns the serial port: every command goes through its priority queue.
+_actor = SerialActor(max_depth=get_settings().serial_queue_depth)
+# Last known good position — returned while a long command holds the port.
 _last_position: Optional[GantryPosition] = None
+# Set by a halt (soft reset mid-move, ALARM 3); cleared by homing or unlocking.
+_needs_homing = False
+
+# Per-command timeouts (seconds), covering both queueing and execution.
+_STATUS_TIMEOUT = 1.0
+_JOG_TIMEOUT = 2.0
+_MOTION_TIMEOUT = 300.0
+_CONFIG_TIMEOUT = 30.0
+
+# GRBL real-time command bytes.
+_FEED_HOLD = b"!"
+_SOFT_RESET = b"\x18"
+_JOG_CANCEL = b"\x85"
+# Time for a feed hold to decelerate before the reset discards the planner.
+_HOLD_SETTLE_S = 0.5
+
+
+def _require_connected() -> Gantry:
+    if _gantry is None:
+        raise HTTPException(400, "Gantry not connected")
+    return _gantry
 
 
 @router.get("/configs")
@@ -28,31 +55,40 @@ def list_gantry_configs() -> list[str]:
     return list_configs(get_settings().configs_dir, "gantry")
 
 
-@router.get("/position")
-def get_position() -> GantryPosition:
+@router.get("/queue")
+def get_queue_stats() -> dict:
+    """Queue depth per priority and command counters of the serial actor."""
+    return _actor.stats()
+
+
+def _query_position() -> GantryPosition:
+    """Query the controller for its current position (one serial round trip)."""
+    position = _read_position()
+    if _needs_homing and position.connected:
+        return position.model_copy(update={"needs_homing": True})
+    return position
+
+
+def _read_position() -> GantryPosition:
     global _last_position
-    if _gantry is None:
+    gantry = _gantry
+    if gantry is None:
         return GantryPosition(connected=False, status="Not connected")
-    acquired = _serial_lock.acquire(blocking=False)
-    if not acquired:
-        # Lock is busy (move or jog in progress). Read cached status from the
-        # driver — it updates last_status during wait_for_completion, so the
-        # status word stays fresh even while the lock is held.
-        status = _gantry._extract_status()
+    if _actor.busy:
+        # A move or jog is running. Read cached status from the driver — it
+        # updates last_status during wait_for_completion, so the status word
+        # stays fresh even while the port is occupied.
+        status = gantry._extract_status()
         if _last_position is not None:
-            return GantryPosition(
-                x=_last_position.x,
-                y=_last_position.y,
-                z=_last_position.z,
-                work_x=_last_position.work_x,
-                work_y=_last_position.work_y,
-                work_z=_last_position.work_z,
-                status=status,
-                connected=True,
-            )
+            return _last_position.model_copy(update={"status": status})
         return GantryPosition(connected=True, status=status)
     try:
-        info = _gantry.get_position_info()
+        info = _actor.call(
+            gantry.get_position_info,
+            priority=Priority.REALTIME,
+            timeout=_STATUS_TIMEOUT,
+            name="status",
+        )
         coords = info["coords"]
         wpos = info["work_pos"]
         _last_position = GantryPosition(
@@ -70,21 +106,61 @@ def get_position() -> GantryPosition:
         if _last_position is not None:
             return _last_position
         return GantryPosition(connected=True, status="Query failed")
+
+
+# The only status poller; WebSocket clients and /position share its samples.
+_broadcaster = PositionBroadcaster(
+    _query_position, interval=get_settings().position_poll_interval
+)
+
+
+@router.get("/position")
+def get_position() -> GantryPosition:
+    if _broadcaster.running and _broadcaster.latest is not None:
+        return _broadcaster.latest
+    return _query_position()
+
+
+async def _send_positions(ws: WebSocket) -> None:
+    sent: Dict[str, Any] = {}
+    async for position in _broadcaster.subscribe():
+        current = position.model_dump()
+        delta = {k: v for k, v in current.items() if sent.get(k, object()) != v}
+        if delta:
+            await ws.send_json(delta)
+            sent = current
+
+
+@router.websocket("/position/ws")
+async def position_stream(ws: WebSocket) -> None:
+    """Push position updates: a full snapshot first, then changed fields only."""
+    await ws.accept()
+    sender = asyncio.create_task(_send_positions(ws))
+    try:
+        # Clients don't send anything; receiving just detects the disconnect.
+        while True:
+            await ws.receive_text()
+    except WebSocketDisconnect:
+        pass
     finally:
-        _serial_lock.release()
+        sender.cancel()
 
 
 @router.post("/home")
-def home() -> GantryPosition:
+async def home() -> GantryPosition:
     """Home the gantry using XY hard limits strategy."""
-    if _gantry is None:
-        raise HTTPException(400, "Gantry not connected")
-    with _serial_lock:
-        try:
-            _gantry.home_xy()
-        except Exception as e:
-            raise HTTPException(500, f"Homing failed: {e}")
-    return get_position()
+    global _needs_homing
+    gantry = _require_connected()
+    try:
+        await _actor.run(
+            gantry.home_xy, priority=Priority.MOTION, timeout=_MOTION_TIMEOUT, name="home"
+        )
+    except QueueFullError as e:
+        raise HTTPException(503, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"Homing failed: {e}")
+    _needs_homing = False
+    return await asyncio.to_thread(_query_position)
 
 
 class JogRequest(BaseModel):
@@ -94,18 +170,78 @@ class JogRequest(BaseModel):
 
 
 @router.post("/jog")
-def jog(req: JogRequest) -> dict:
+async def jog(req: JogRequest) -> dict:
     """Jog the gantry by a relative offset using GRBL's $J= command."""
-    if _gantry is None:
-        raise HTTPException(400, "Gantry not connected")
+    gantry = _require_connected()
     if req.x == 0 and req.y == 0 and req.z == 0:
         return {"status": "ok"}
-    with _serial_lock:
+    try:
+        await _actor.run(
+            lambda: gantry.jog(x=req.x, y=req.y, z=req.z),
+            priority=Priority.REALTIME,
+            timeout=_JOG_TIMEOUT,
+            name="jog",
+        )
+    except QueueFullError as e:
+        raise HTTPException(503, str(e))
+    except Exception as e:
+        logging.warning("Jog error (non-fatal): %s", e)
+    return {"status": "ok"}
+
+
+@router.websocket("/jog/ws")
+async def jog_stream(ws: WebSocket) -> None:
+    """Continuous jogging: the client streams ``{"x", "y", "z"}`` deltas while a
+    key is held and ``{"stop": true}`` on release."""
+    await ws.accept()
+    gantry = _gantry
+    if gantry is None:
+        await ws.close(code=1011, reason="Gantry not connected")
+        return
+
+    async def send_jog(x: float, y: float, z: float) -> None:
+        await _actor.run(
+            lambda: gantry.jog(x=x, y=y, z=z),
+            priority=Priority.REALTIME,
+            timeout=_JOG_TIMEOUT,
+            name="jog",
+        )
+
+    async def send_cancel() -> None:
+        # Through the actor, so it lands after a jog that is mid-write.
+        await _actor.run(
+            lambda: _send_realtime(_JOG_CANCEL),
+            priority=Priority.REALTIME,
+            timeout=_JOG_TIMEOUT,
+            name="jog_cancel",
+        )
+
+    coalescer = JogCoalescer(
+        send_jog, send_cancel, window=get_settings().jog_coalesce_window
+    )
+    flusher = asyncio.create_task(coalescer.run())
+    try:
+        while True:
+            try:
+                msg = JogMessage.model_validate_json(await ws.receive_text())
+            except ValidationError as e:
+                error = e.errors()[0]
+                where = ".".join(str(p) for p in error["loc"]) or "message"
+                await ws.send_json({"error": f"Invalid jog message ({where}): {error['msg']}"})
+                continue
+            if msg.stop:
+                await coalescer.cancel()
+            else:
+                coalescer.add(msg.x, msg.y, msg.z)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        flusher.cancel()
+        # Whatever ended the channel, never leave the head jogging.
         try:
-            _gantry.jog(x=req.x, y=req.y, z=req.z)
+            await coalescer.cancel()
         except Exception as e:
-            logging.warning("Jog error (non-fatal): %s", e)
-    return {"status": "ok"}
+            logging.warning("Jog cancel on close failed: %s", e)
 
 
 class MoveToRequest(BaseModel):
@@ -114,88 +250,188 @@ class MoveToRequest(BaseModel):
     z: float
 
 
-_move_error: Optional[str] = None
+def _serial_port(gantry: Gantry) -> serial.SerialBase:
+    """Find the pyserial port owned by the PANDA_CORE driver.
 
+    The driver has no public API for real-time bytes, so look for the port
+    object on it (or one level down, on a wrapped controller).
+    """
+    for owner in (gantry, *vars(gantry).values()):
+        for value in getattr(owner, "__dict__", {}).values():
+            if isinstance(value, serial.SerialBase):
+                return value
+    raise RuntimeError("Gantry driver does not expose its serial port")
 
-def _move_worker(x: float, y: float, z: float) -> None:
-    """Run move_to in a background thread so position polls can interleave."""
-    global _move_error
-    _move_error = None
+
+def _send_realtime(command: bytes) -> None:
+    """Write a GRBL real-time command straight to the port.
+
+    GRBL acts on real-time bytes as soon as they arrive, so they bypass the
+    actor queue, which may be blocked on the very move being stopped.
+    """
+    _serial_port(_require_connected()).write(command)
+
+
+def _halt() -> None:
+    """Feed hold, then soft reset: stops motion and clears GRBL's planner.
+
+    A reset during motion puts GRBL in ALARM 3 (position lost), so the
+    gantry is flagged as needing homing. Moves are refused until ``/home``
+    or ``/unlock`` clears the flag; unlocking accepts the unverified
+    position. The move that was running keeps the serial port until the
+    driver's ``move_to`` returns (at most ``_MOTION_TIMEOUT``), so homing
+    and unlocking queue behind it.
+    """
+    global _needs_homing
+    _send_realtime(_FEED_HOLD)
+    time.sleep(_HOLD_SETTLE_S)
+    _send_realtime(_SOFT_RESET)
+    _needs_homing = True
+
+
+_motion = MotionQueue(
+    _actor, max_depth=get_settings().motion_queue_depth, timeout=_MOTION_TIMEOUT
+)
+
+
+@router.post("/move-to")
+def move_to(req: MoveToRequest) -> MoveJob:
+    """Queue a move to absolute coordinates; returns the job to poll for status."""
+    gantry = _require_connected()
+    if _needs_homing:
+        raise HTTPException(409, "Gantry position was lost by a halt; home or unlock first")
+    try:
+        return _motion.submit(
+            req.x, req.y, req.z, lambda: gantry.move_to(x=req.x, y=req.y, z=req.z)
+        )
+    except QueueFullError as e:
+        raise HTTPException(503, str(e))
+
+
+@router.get("/moves")
+def list_moves() -> List[MoveJob]:
+    """Recent and pending moves, oldest first."""
+    return _motion.jobs()
+
+
+@router.get("/moves/{job_id}")
+def get_move(job_id: str) -> MoveJob:
+    job = _motion.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown move '{job_id}'")
+    return job
+
+
+@router.delete("/moves/{job_id}")
+def cancel_move(job_id: str) -> MoveJob:
+    """Cancel a move. Cancelling the running move halts the gantry and flushes the queue."""
     try:
-        with _serial_lock:
-            _gantry.move_to(x=x, y=y, z=z)
+        job = _motion.cancel(job_id, _halt)
     except Exception as e:
-        _move_error = str(e)
-        logging.error("Move failed: %s", e)
+        raise HTTPException(500, f"Halt failed: {e}")
+    if job is None:
+        raise HTTPException(404, f"Unknown move '{job_id}'")
+    return job
 
 
-@router.post("/move-to")
-def move_to(req: MoveToRequest) -> dict:
-    """Move the gantry to absolute coordinates using safe_move."""
-    if _gantry is None:
-        raise HTTPException(400, "Gantry not connected")
-    thread = threading.Thread(target=_move_worker, args=(req.x, req.y, req.z), daemon=True)
-    thread.start()
-    return {"status": "ok"}
+@router.post("/moves/flush")
+def flush_moves() -> List[MoveJob]:
+    """Cancel all pending moves and halt (feed hold + reset) the running one."""
+    try:
+        return _motion.flush(_halt)
+    except Exception as e:
+        raise HTTPException(500, f"Halt failed: {e}")
 
 
 @router.post("/unlock")
-def unlock() -> GantryPosition:
+async def unlock() -> GantryPosition:
     """Send GRBL $X unlock command to clear alarm state."""
-    if _gantry is None:
-        raise HTTPException(400, "Gantry not connected")
-    with _serial_lock:
-        try:
-            _gantry.unlock()
-        except Exception as e:
-            raise HTTPException(500, f"Unlock failed: {e}")
-    return get_position()
+    global _needs_homing
+    gantry = _require_connected()
+    try:
+        await _actor.run(
+            gantry.unlock, priority=Priority.CONFIG, timeout=_CONFIG_TIMEOUT, name="unlock"
+        )
+    except QueueFullError as e:
+        raise HTTPException(503, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"Unlock failed: {e}")
+    _needs_homing = False
+    return await asyncio.to_thread(_query_position)
 
 
 @router.post("/connect")
 def connect() -> GantryPosition:
-    global _gantry
+    global _gantry, _needs_homing
     try:
         gantry_configs = list_configs(get_settings().configs_dir, "gantry")
         config = {}
         if gantry_configs:
             config = read_yaml(resolve_config_path(get_settings().configs_dir, "gantry", gantry_configs[0]))
-        _gantry = Gantry(config=config)
-        _gantry.connect()
-        # Seed WCO cache — GRBL sends WCO in one of the first few status reports
+        gantry = Gantry(config=config)
+        gantry.connect()
+        # Seed WCO cache — GRBL sends WCO in one of the first few status reports.
+        # The instance isn't shared yet, so it can be queried directly.
         for _ in range(10):
-            info = _gantry.get_position_info()
+            info = gantry.get_position_info()
             if info["work_pos"] is not None:
                 break
             time.sleep(0.1)
     except Exception as e:
         _gantry = None
         raise HTTPException(500, f"Failed to connect: {e}")
-    return get_position()
+    _gantry = gantry
+    _needs_homing = False
+    return _query_position()
 
 
 @router.post("/disconnect")
-def disconnect() -> GantryPosition:
+async def disconnect() -> GantryPosition:
     global _gantry
-    if _gantry:
-        with _serial_lock:
-            _gantry.disconnect()
+    gantry = _gantry
+    if gantry:
+        try:
+            await _actor.run(
+                gantry.disconnect, priority=Priority.CONFIG, timeout=_CONFIG_TIMEOUT,
+                name="disconnect",
+            )
+        except QueueFullError as e:
+            raise HTTPException(503, str(e))
+        except CommandTimeoutError as e:
+            # The port is still held (e.g. by a long move); keep the handle
+            # so the client can retry once it is free.
+            raise HTTPException(504, str(e))
+        except Exception as e:
+            # The driver failed mid-disconnect; the port is unusable either way.
+            logging.warning("Error disconnecting gantry: %s", e)
     _gantry = None
     return GantryPosition(connected=False, status="Disconnected")
 
 
-@router.get("/{filename}")
-def get_gantry(filename: str) -> GantryResponse:
+def _gantry_response(filename: str) -> GantryResponse:
     path = resolve_config_path(get_settings().configs_dir, "gantry", filename)
-    if not path.is_file():
-        raise HTTPException(404, f"Config not found: {filename}")
     data = read_yaml(path)
     config = GantryConfig.model_validate(data)
     return GantryResponse(filename=filename, config=config)
 
 
+@router.get("/{filename}")
+def get_gantry(
+    filename: str, response: Response, if_none_match: Optional[str] = Header(None)
+) -> GantryResponse:
+    path = resolve_config_path(get_settings().configs_dir, "gantry", filename)
+    if not path.is_file():
+        raise HTTPException(404, f"Config not found: {filename}")
+    etag = file_etag(path)
+    if matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return _gantry_response(filename)
+
+
 @router.put("/{filename}")
-def put_gantry(filename: str, body: dict) -> GantryResponse:
+def put_gantry(filename: str, body: dict, response: Response) -> GantryResponse:
     path = resolve_config_path(get_settings().configs_dir, "gantry", filename)
     write_yaml(path, body)
-    return get_gantry(filename)
+    set_etag(response, file_etag(path))
+    return _gantry_response(filename)
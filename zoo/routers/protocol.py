@@ -7,12 +7,17 @@ so any new @protocol_command in PANDA_CORE is automatically available.
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
-
-from fastapi import APIRouter, HTTPException
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from instruments.pipette import models as pipette_specs
 from pydantic import BaseModel
 from protocol_engine.registry import CommandRegistry
-from protocol_engine.setup import run_protocol
+from protocol_engine.setup import setup_protocol
 from validation.errors import SetupValidationError
 
 # Side-effect import: triggers @protocol_command registration.
@@ -20,50 +25,82 @@ import protocol_engine.commands  # noqa: F401
 
 from zoo.config import get_settings
 from zoo.models.protocol import (
-    CommandArg,
     CommandInfo,
+    IncrementalValidationRequest,
+    IncrementalValidationResponse,
+    OptimizedPlan,
     ProtocolConfig,
+    ProtocolPatch,
+    ProtocolPatchResponse,
+    ProtocolPlan,
     ProtocolResponse,
+    ProtocolRun,
     ProtocolStepConfig,
+    ProtocolStepCount,
+    ProtocolStepWindow,
     ProtocolValidationResponse,
+    SimulationReport,
+    StepError,
+    TripBatchingReport,
+)
+from zoo.services.command_catalogue import CommandCatalogue, format_errors, get_catalogue
+from zoo.services.http_cache import file_etag, matches, not_modified, set_etag
+from zoo.services.incremental_validation import (
+    Splice,
+    UnknownVersionError,
+    incremental_validator,
+)
+from zoo.services.protocol_index import StepIndex, step_index
+from zoo.services.protocol_plan import CompiledPlan, PlanCompileError, plan_cache
+from zoo.services.protocol_runs import (
+    PreparedStep,
+    ProtocolRunManager,
+    RunConflictError,
+    new_run_id,
+)
+from zoo.services.serial_actor import Priority
+from zoo.services.simulator import simulate
+from zoo.services.trip_batching import plan_trip_batches
+from zoo.services.visit_order import optimize_visit_order
+from zoo.services.yaml_io import (
+    flush,
+    list_configs,
+    read_yaml,
+    resolve_config_path,
+    write_yaml,
 )
-from zoo.services.yaml_io import list_configs, read_yaml, resolve_config_path, write_yaml
 
 router = APIRouter(prefix="/api/protocol", tags=["protocol"])
 
+# At most one run at a time — there is only one gantry.
+_runs = ProtocolRunManager()
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 
-def _type_name(annotation: Any) -> str:
-    """Convert a Python type annotation to a simple string for the frontend."""
-    name = getattr(annotation, "__name__", None)
-    if name:
-        return name
-    return str(annotation)
-
-
-def _build_command_info(name: str) -> CommandInfo:
-    """Build a CommandInfo from a registered PANDA_CORE command."""
-    registry = CommandRegistry.instance()
-    cmd = registry.get(name)
-    args = []
-    for field_name, field_info in cmd.schema.model_fields.items():
-        args.append(
-            CommandArg(
-                name=field_name,
-                type=_type_name(field_info.annotation),
-                required=field_info.is_required(),
-                default=None if field_info.is_required() else field_info.default,
-            )
-        )
-    return CommandInfo(
-        name=cmd.name,
-        description=(cmd.handler.__doc__ or "").strip(),
-        args=args,
-    )
+def _protocol_document(filename: str, path: Path) -> Dict[str, Any]:
+    """The file's document; 400 unless it has a ``protocol`` list."""
+    data = read_yaml(path)
+    if "protocol" not in data or not isinstance(data["protocol"], list):
+        raise HTTPException(400, f"File '{filename}' is not a valid protocol YAML")
+    return data
+
+
+def _is_step(entry: Any) -> bool:
+    return isinstance(entry, dict) and len(entry) == 1
+
+
+def _raw_steps(filename: str, path: Path) -> List[Dict[str, Any]]:
+    """The file's ``{command: args}`` steps, skipping malformed entries."""
+    return [s for s in _protocol_document(filename, path)["protocol"] if _is_step(s)]
+
+
+def _commands() -> CommandCatalogue:
+    """Validators and command infos, compiled once per registry state."""
+    return get_catalogue(CommandRegistry.instance())
 
 
 # ---------------------------------------------------------------------------
@@ -71,20 +108,24 @@ def _build_command_info(name: str) -> CommandInfo:
 # ---------------------------------------------------------------------------
 
 
-@router.get("/commands")
-def get_commands() -> List[CommandInfo]:
+@router.get("/commands", response_model=List[CommandInfo])
+def get_commands(if_none_match: Optional[str] = Header(None)) -> Response:
     """Return all registered protocol commands with their argument schemas."""
-    registry = CommandRegistry.instance()
-    return [_build_command_info(name) for name in registry.command_names]
+    catalogue = _commands()
+    if matches(if_none_match, catalogue.etag):
+        return not_modified(catalogue.etag)
+    response = Response(catalogue.body, media_type="application/json")
+    set_etag(response, catalogue.etag)
+    return response
 
 
 @router.get("/commands/{name}")
 def get_command(name: str) -> CommandInfo:
     """Return schema for a single protocol command."""
-    registry = CommandRegistry.instance()
-    if name not in registry.command_names:
+    info = _commands().infos.get(name)
+    if info is None:
         raise HTTPException(404, f"Unknown command '{name}'")
-    return _build_command_info(name)
+    return info
 
 
 @router.get("/configs")
@@ -92,19 +133,29 @@ def list_protocol_configs() -> List[str]:
     return list_configs(get_settings().configs_dir, "protocol")
 
 
+@router.get("/runs")
+def list_runs() -> List[ProtocolRun]:
+    """Recent protocol runs, oldest first (the last one may still be running)."""
+    return _runs.runs()
+
+
 @router.get("/{filename}")
-def get_protocol(filename: str) -> ProtocolResponse:
+def get_protocol(
+    filename: str, response: Response, if_none_match: Optional[str] = Header(None)
+) -> ProtocolResponse:
     path = resolve_config_path(get_settings().configs_dir, "protocol", filename)
     if not path.is_file():
         raise HTTPException(404, f"Protocol file not found: {filename}")
-    data = read_yaml(path)
-    if "protocol" not in data or not isinstance(data["protocol"], list):
-        raise HTTPException(400, f"File '{filename}' is not a valid protocol YAML")
+    etag = file_etag(path)
+    if matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return _protocol_response(filename, path)
 
+
+def _protocol_response(filename: str, path: Path) -> ProtocolResponse:
     steps = []
-    for raw_step in data["protocol"]:
-        if not isinstance(raw_step, dict) or len(raw_step) != 1:
-            continue
+    for raw_step in _raw_steps(filename, path):
         cmd_name = next(iter(raw_step))
         args = raw_step[cmd_name] or {}
         steps.append(ProtocolStepConfig(command=cmd_name, args=args))
@@ -112,6 +163,49 @@ def get_protocol(filename: str) -> ProtocolResponse:
     return ProtocolResponse(filename=filename, steps=steps)
 
 
+def _protocol_path(filename: str) -> Path:
+    path = resolve_config_path(get_settings().configs_dir, "protocol", filename)
+    if not path.is_file():
+        raise HTTPException(404, f"Protocol file not found: {filename}")
+    return path
+
+
+def _step_index(filename: str, path: Path) -> StepIndex:
+    try:
+        return step_index(path)
+    except (ValueError, yaml.YAMLError):
+        raise HTTPException(400, f"File '{filename}' is not a valid protocol YAML")
+
+
+@router.get("/{filename}/steps")
+def get_protocol_steps(
+    filename: str,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=5000),
+    if_none_match: Optional[str] = Header(None),
+) -> ProtocolStepWindow:
+    """A window of steps, parsed from a per-version offset index of the file."""
+    path = _protocol_path(filename)
+    etag = file_etag(path, f"steps:{offset}:{limit}")
+    if matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    index = _step_index(filename, path)
+    steps = [
+        ProtocolStepConfig(command=command, args=args or {})
+        for raw_step in index.window(offset, limit)
+        for command, args in raw_step.items()
+    ]
+    return ProtocolStepWindow(filename=filename, offset=offset, total=len(index), steps=steps)
+
+
+@router.get("/{filename}/steps/count")
+def count_protocol_steps(filename: str) -> ProtocolStepCount:
+    path = _protocol_path(filename)
+    return ProtocolStepCount(filename=filename, count=len(_step_index(filename, path)))
+
+
 @router.put("/{filename}")
 def save_protocol(filename: str, body: ProtocolConfig) -> dict:
     path = resolve_config_path(get_settings().configs_dir, "protocol", filename)
@@ -123,26 +217,101 @@ def save_protocol(filename: str, body: ProtocolConfig) -> dict:
     return {"status": "ok", "filename": filename}
 
 
+@router.patch("/{filename}")
+def patch_protocol(filename: str, body: ProtocolPatch, response: Response) -> ProtocolPatchResponse:
+    """Insert, replace or delete individual steps.
+
+    Step indices count well-formed steps, as ``GET`` lists them. The ops
+    are applied to the document in place, so malformed entries and other
+    top-level keys are written back untouched.
+
+    Only the inserted and replacing steps are validated; the patch is
+    rejected (and nothing written) if any of them is invalid. PANDA_CORE
+    validates each step against its command's schema alone, with no check
+    spanning steps, so this is the check ``/validate`` would run.
+    """
+    path = resolve_config_path(get_settings().configs_dir, "protocol", filename)
+    if not path.is_file():
+        raise HTTPException(404, f"Protocol file not found: {filename}")
+    data = _protocol_document(filename, path)
+    entries = data["protocol"]
+    commands = _commands()
+    step_errors: List[StepError] = []
+    for op in body.ops:
+        # Position in ``entries`` of each well-formed step.
+        positions = [i for i, entry in enumerate(entries) if _is_step(entry)]
+        upper = len(positions) if op.op == "insert" else len(positions) - 1
+        if not 0 <= op.index <= upper:
+            raise HTTPException(400, f"Step index {op.index} out of range for '{op.op}'")
+        at = positions[op.index] if op.index < len(positions) else len(entries)
+        if op.op == "delete":
+            del entries[at]
+            continue
+        if op.step is None:
+            raise HTTPException(400, f"'{op.op}' at step {op.index} needs a step")
+        for field, message in commands.check(op.step.command, op.step.args):
+            step_errors.append(
+                StepError(index=op.index, command=op.step.command, field=field, message=message)
+            )
+        entry = {op.step.command: op.step.args if op.step.args else None}
+        if op.op == "insert":
+            entries.insert(at, entry)
+        else:
+            entries[at] = entry
+    if step_errors:
+        raise HTTPException(400, "; ".join(format_errors(step_errors)))
+    write_yaml(path, data)
+    set_etag(response, file_etag(path))
+    return ProtocolPatchResponse(
+        filename=filename, step_count=sum(1 for entry in entries if _is_step(entry))
+    )
+
+
 @router.post("/validate")
 def validate_protocol(body: ProtocolConfig) -> ProtocolValidationResponse:
     """Validate a protocol against PANDA_CORE's command schemas."""
-    registry = CommandRegistry.instance()
-    errors: List[str] = []
-    for i, step in enumerate(body.protocol):
-        if step.command not in registry.command_names:
-            errors.append(
-                f"Step {i}: Unknown command '{step.command}'. "
-                f"Available: {', '.join(registry.command_names)}"
-            )
-            continue
+    step_errors = _commands().validate_steps([(step.command, step.args) for step in body.protocol])
+    return ProtocolValidationResponse(
+        valid=not step_errors, errors=format_errors(step_errors), step_errors=step_errors
+    )
 
-        cmd = registry.get(step.command)
-        try:
-            cmd.schema.model_validate(step.args)
-        except Exception as e:
-            errors.append(f"Step {i} ({step.command}): {e}")
 
-    return ProtocolValidationResponse(valid=len(errors) == 0, errors=errors)
+@router.post("/validate/incremental")
+def validate_protocol_incremental(
+    body: IncrementalValidationRequest,
+) -> IncrementalValidationResponse:
+    """Validate only what changed since ``base_version``, or a whole protocol.
+
+    Returns 409 when ``base_version`` is unknown; the client should then
+    resend the whole protocol.
+    """
+    if (body.protocol is None) == (body.base_version is None):
+        raise HTTPException(400, "Send either 'protocol' or 'base_version' with 'changes'")
+    commands = _commands()
+    if body.protocol is not None:
+        outcome = incremental_validator.validate(
+            commands, [(step.command, step.args) for step in body.protocol]
+        )
+    else:
+        splices = [
+            Splice(change.start, change.delete, [(s.command, s.args) for s in change.insert])
+            for change in body.changes
+        ]
+        try:
+            outcome = incremental_validator.apply(commands, body.base_version, splices)
+        except UnknownVersionError:
+            raise HTTPException(409, f"Unknown protocol version: {body.base_version}")
+        except IndexError as e:
+            raise HTTPException(400, str(e))
+    step_errors = outcome.step_errors()
+    return IncrementalValidationResponse(
+        valid=not step_errors,
+        errors=format_errors(step_errors),
+        step_errors=step_errors,
+        version=outcome.version,
+        step_count=len(outcome.results),
+        revalidated=outcome.revalidated,
+    )
 
 
 class RunProtocolRequest(BaseModel):
@@ -150,31 +319,213 @@ class RunProtocolRequest(BaseModel):
     deck_file: str
     board_file: str
     protocol_file: str
+    # Reorder independent steps to minimise travel before running/simulating.
+    optimize: bool = False
 
 
-@router.post("/run")
-def run_protocol_endpoint(body: RunProtocolRequest) -> dict:
-    """Run a protocol with all four configs and the connected gantry."""
-    from zoo.routers.gantry import _gantry
+def _compile(body: RunProtocolRequest) -> CompiledPlan:
+    settings = get_settings()
+    files = (body.gantry_file, body.deck_file, body.board_file, body.protocol_file)
+    paths = tuple(
+        resolve_config_path(settings.configs_dir, kind, filename)
+        for kind, filename in zip(("gantry", "deck", "board", "protocol"), files)
+    )
+    for filename, path in zip(files, paths):
+        if not path.is_file():
+            raise HTTPException(404, f"Config not found: {filename}")
+    try:
+        return plan_cache.get(files, paths)
+    except PlanCompileError as exc:
+        raise HTTPException(400, str(exc))
+
+
+def _optimized(compiled: CompiledPlan) -> OptimizedPlan:
+    plan, report = compiled.derive("visit_order", optimize_visit_order)
+    return OptimizedPlan(plan=plan, report=report)
+
+
+def _plan_for(body: RunProtocolRequest, compiled: CompiledPlan) -> ProtocolPlan:
+    return _optimized(compiled).plan if body.optimize else compiled.plan
 
+
+def _prepare_steps(body: RunProtocolRequest, gantry: Any) -> List[PreparedStep]:
+    """Load and validate the four configs; return one callable per step.
+
+    PANDA_CORE only builds a protocol together with its run context, from
+    the files (``setup_protocol``), so every run pays for the full load and
+    validation; the plan cache cannot skip it. The cached plan is used only
+    with ``optimize``, to choose the step order.
+
+    Each step is executed through the gantry's serial actor so jogs and
+    status queries keep their priority while the run is in progress.
+    """
+    from zoo.routers.gantry import _actor
+
+    # Compiled first, so a plan error is reported before PANDA_CORE is set up.
+    plan = _optimized(_compile(body)).plan if body.optimize else None
     settings = get_settings()
-    gantry_path = resolve_config_path(settings.configs_dir, "gantry", body.gantry_file)
-    deck_path = resolve_config_path(settings.configs_dir, "deck", body.deck_file)
-    board_path = resolve_config_path(settings.configs_dir, "board", body.board_file)
-    protocol_path = resolve_config_path(settings.configs_dir, "protocol", body.protocol_file)
+    paths = [
+        resolve_config_path(settings.configs_dir, kind, filename)
+        for kind, filename in (
+            ("gantry", body.gantry_file),
+            ("deck", body.deck_file),
+            ("board", body.board_file),
+            ("protocol", body.protocol_file),
+        )
+    ]
+    protocol_path = paths[3]
+    # PANDA_CORE reads these paths itself, so pending edits must be on disk.
+    flush(paths)
+    # Fresh every run: the context holds tip, volume and instrument state.
+    protocol, context = setup_protocol(*(str(path) for path in paths), gantry=gantry)
+    if plan is not None:
+        order = [(step.index, step.command) for step in plan.steps]
+    else:
+        names = [next(iter(raw)) for raw in read_yaml(protocol_path).get("protocol", [])]
+        order = list(enumerate(names))
+
+    def bind(step: Any, name: str) -> PreparedStep:
+        return name, lambda: _actor.call(
+            lambda: step.execute(context), priority=Priority.MOTION, name=name
+        )
+
+    return [bind(protocol.steps[index], name) for index, name in order]
+
+
+@router.post("/compile")
+def compile_protocol(body: RunProtocolRequest) -> ProtocolPlan:
+    """Resolve the four configs into an execution plan without running it.
+
+    Plans are cached by file content, so the following ``/optimize``,
+    ``/simulate`` and ``/batch-trips`` calls with the same files reuse it.
+    """
+    compiled = _compile(body)
+    return _plan_for(body, compiled)
+
+
+@router.post("/optimize")
+def optimize_protocol(body: RunProtocolRequest) -> OptimizedPlan:
+    """Reorder independent steps to minimise XYZ travel; report before/after.
+
+    The reordered plan is what ``/run`` executes with ``optimize: true``.
+    """
+    return _optimized(_compile(body))
+
+
+@router.post("/simulate")
+def simulate_protocol(body: RunProtocolRequest) -> SimulationReport:
+    """Dry-run the protocol: estimated per-step and total time, travel and
+    working-volume violations. Nothing is sent to the gantry."""
+    return simulate(_plan_for(body, _compile(body)))
+
+
+class BatchTripsRequest(RunProtocolRequest):
+    # Board instrument to plan for; required when the board has several pipettes.
+    pipette: Optional[str] = None
+    # Write the batched protocol back to ``protocol_file`` instead of only proposing it.
+    apply: bool = False
+
+
+def _pipette_limits(board_file: str, pipette: Optional[str]) -> tuple[str, float, float, bool]:
+    """The chosen pipette, its volume range, and whether it is the board's only one."""
+    path = resolve_config_path(get_settings().configs_dir, "board", board_file)
+    pipettes = {
+        name: entry["pipette_model"]
+        for name, entry in read_yaml(path).get("instruments", {}).items()
+        if isinstance(entry, dict) and entry.get("pipette_model")
+    }
+    if pipette is None:
+        if len(pipettes) != 1:
+            raise HTTPException(
+                400, f"Board has {len(pipettes)} pipettes; choose one with 'pipette'"
+            )
+        pipette = next(iter(pipettes))
+    if pipette not in pipettes:
+        raise HTTPException(400, f"Unknown pipette '{pipette}'")
+    model = pipette_specs.PIPETTE_MODELS.get(pipettes[pipette])
+    if model is None:
+        raise HTTPException(400, f"Unknown pipette model '{pipettes[pipette]}'")
+    return pipette, model.min_volume, model.max_volume, len(pipettes) == 1
+
+
+@router.post("/batch-trips")
+def batch_trips(body: BatchTripsRequest) -> TripBatchingReport:
+    """Merge consecutive same-source transfers into multi-dispense trips.
+
+    Returns the proposed protocol with trip counts and estimated time saved;
+    with ``apply`` the protocol file is rewritten.
+    """
+    compiled = _compile(body)
+    pipette, min_volume, max_volume, sole = _pipette_limits(body.board_file, body.pipette)
+    path = resolve_config_path(get_settings().configs_dir, "protocol", body.protocol_file)
+    report = plan_trip_batches(
+        _plan_for(body, compiled),
+        read_yaml(path)["protocol"],
+        pipette=pipette,
+        min_volume=min_volume,
+        max_volume=max_volume,
+        sole=sole,
+    )
+    if body.apply and report.batches:
+        save_protocol(body.protocol_file, ProtocolConfig(protocol=report.protocol))
+        report.applied = True
+    return report
+
+
+@router.post("/run")
+def run_protocol_endpoint(body: RunProtocolRequest) -> ProtocolRun:
+    """Start a protocol run in the background and return it immediately.
+
+    Progress streams from ``/runs/{id}/events``; ``/runs/{id}/cancel``
+    stops the run before its next step.
+    """
+    from zoo.routers.gantry import _gantry
 
     if _gantry is None or not _gantry.is_healthy():
         raise HTTPException(400, "Gantry is not connected")
 
     try:
-        results = run_protocol(
-            str(gantry_path), str(deck_path), str(board_path), str(protocol_path),
-            gantry=_gantry,
-        )
+        steps = _prepare_steps(body, _gantry)
+    except HTTPException:
+        raise
     except SetupValidationError as exc:
         raise HTTPException(400, str(exc))
     except Exception as exc:
-        logging.exception("Protocol execution failed")
-        raise HTTPException(500, f"Execution failed: {exc}")
+        logging.exception("Protocol setup failed")
+        raise HTTPException(500, f"Setup failed: {exc}")
+
+    run = ProtocolRun(id=new_run_id(), submitted_at=time.time(), **body.model_dump())
+    try:
+        return _runs.submit(run, steps)
+    except RunConflictError as exc:
+        raise HTTPException(409, str(exc))
+
+
+@router.get("/runs/{run_id}")
+def get_run(run_id: str) -> ProtocolRun:
+    run = _runs.get(run_id)
+    if run is None:
+        raise HTTPException(404, f"Unknown run '{run_id}'")
+    return run
+
+
+@router.post("/runs/{run_id}/cancel")
+def cancel_run(run_id: str) -> ProtocolRun:
+    """Stop the run cleanly after the step currently executing."""
+    run = _runs.cancel(run_id)
+    if run is None:
+        raise HTTPException(404, f"Unknown run '{run_id}'")
+    return run
+
+
+@router.get("/runs/{run_id}/events")
+async def run_events(run_id: str) -> StreamingResponse:
+    """Server-sent events: one ``run`` event per state change until the run ends."""
+    if _runs.get(run_id) is None:
+        raise HTTPException(404, f"Unknown run '{run_id}'")
+
+    async def stream():
+        async for snapshot in _runs.subscribe(run_id):
+            yield f"event: run\ndata: {snapshot.model_dump_json()}\n\n"
 
-    return {"status": "ok", "steps_executed": len(results)}
+    return StreamingResponse(stream(), media_type="text/event-stream")
@@ -1,27 +1,48 @@
 """Raw YAML read/write endpoints for direct editing."""
 
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response
 from pydantic import BaseModel
 
 from zoo.config import get_settings
+from zoo.services.http_cache import file_etag, matches, not_modified, set_etag
+from zoo.services.yaml_io import classify_yaml, read_text, write_text
 
 router = APIRouter(prefix="/api/raw", tags=["raw"])
 
 
 class RawYaml(BaseModel):
     content: str
+    # Config kind detected from the top-level keys (ignored on input).
+    kind: Optional[str] = None
+
+
+def _classify(content: str) -> Optional[str]:
+    try:
+        return classify_yaml(content)
+    except Exception:
+        return None
 
 
 @router.get("/{filename}")
-def get_raw(filename: str) -> RawYaml:
+def get_raw(
+    filename: str, response: Response, if_none_match: Optional[str] = Header(None)
+) -> RawYaml:
     path = get_settings().configs_dir / filename
     if not path.is_file():
         raise HTTPException(404, f"Config not found: {filename}")
-    return RawYaml(content=path.read_text())
+    etag = file_etag(path)
+    if matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    content = read_text(path)
+    return RawYaml(content=content, kind=_classify(content))
 
 
 @router.put("/{filename}")
-def put_raw(filename: str, body: RawYaml) -> RawYaml:
+def put_raw(filename: str, body: RawYaml, response: Response) -> RawYaml:
     path = get_settings().configs_dir / filename
-    path.write_text(body.content)
-    return RawYaml(content=path.read_text())
+    write_text(path, body.content)
+    set_etag(response, file_etag(path))
+    return RawYaml(content=body.content, kind=_classify(body.content))
@@ -7,6 +7,12 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from zoo.config import get_settings
+from zoo.services import deck_service, protocol_index, yaml_io
+from zoo.services.config_events import hub as config_events
+from zoo.services.config_index import index_stats
+from zoo.services.incremental_validation import incremental_validator
+from zoo.services.protocol_plan import plan_cache
+from zoo.services.wells import grid_cache_stats
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
@@ -32,9 +38,26 @@ def update_settings(body: UpdatePathRequest) -> SettingsResponse:
     if not path.is_dir():
         raise HTTPException(400, f"Directory does not exist: {body.panda_core_path}")
     get_settings().panda_core_path = path
+    yaml_io.watch_configs(get_settings().configs_dir)
+    config_events.resync()
     return SettingsResponse(panda_core_path=str(path.resolve()))
 
 
+@router.get("/cache")
+def get_cache_stats() -> dict:
+    """Hit/miss counters for the server-side config caches."""
+    return {
+        "yaml": yaml_io.cache_stats(),
+        "writes": yaml_io.write_stats(),
+        "index": index_stats(),
+        "wells": grid_cache_stats(),
+        "decks": deck_service.cache_stats(),
+        "plans": plan_cache.stats(),
+        "protocol_steps": protocol_index.cache_stats(),
+        "validation": incremental_validator.stats(),
+    }
+
+
 @router.post("/browse")
 def browse_directory() -> SettingsResponse:
     """Open a native directory picker and return the selected path."""
@@ -0,0 +1,176 @@
+"""Workspace snapshot: everything the app needs to open, in one request.
+
+Config listings, the selected gantry/deck/board/protocol documents and the
+static catalogues are each a *part* with its own ETag. Parts are
+assembled concurrently in worker threads. A client lists the ETags it
+already holds in ``have`` (``part:etag``) and gets back just those ETags
+for unchanged parts. Each part's body is pre-serialised JSON (the same
+bytes as the per-kind endpoints), so the snapshot is spliced together
+without re-encoding.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import BaseModel
+from validation.errors import SetupValidationError
+
+from zoo.config import get_settings
+from zoo.routers import board, gantry, protocol
+from zoo.services import deck_payload, deck_service
+from zoo.services.http_cache import content_etag, file_etag
+from zoo.services.yaml_io import list_configs, resolve_config_path
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/workspace", tags=["workspace"])
+
+_KINDS = ("gantry", "deck", "board", "protocol")
+
+
+class WorkspacePart(BaseModel):
+    etag: Optional[str] = None
+    # Omitted when the client already holds ``etag``.
+    data: Any = None
+    unchanged: bool = False
+    # Set instead of ``data`` when this part failed (e.g. 404 for a missing file).
+    status: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class WorkspaceResponse(BaseModel):
+    parts: Dict[str, WorkspacePart]
+
+
+# A part: its ETag (cheap) and a body builder (only run if the ETag is new).
+_Part = Tuple[str, Callable[[], bytes]]
+
+
+def _configs_part() -> _Part:
+    configs_dir = get_settings().configs_dir
+    body = json.dumps(
+        {kind: list_configs(configs_dir, kind) for kind in _KINDS}, separators=(",", ":")
+    ).encode()
+    return content_etag(body), lambda: body
+
+
+def _file_part(kind: str, filename: str, build: Callable[[Path], bytes], variant: str = "") -> _Part:
+    path = resolve_config_path(get_settings().configs_dir, kind, filename)
+    if not path.is_file():
+        raise HTTPException(404, f"Config not found: {filename}")
+    return file_etag(path, variant), lambda: build(path)
+
+
+def _gantry_part(filename: str) -> _Part:
+    return _file_part(
+        "gantry", filename, lambda path: gantry._gantry_response(filename).model_dump_json().encode()
+    )
+
+
+def _deck_part(filename: str) -> _Part:
+    return _file_part(
+        "deck",
+        filename,
+        lambda path: deck_service.load(path).render(filename, deck_payload.JSON),
+        deck_payload.JSON,
+    )
+
+
+def _board_part(filename: str) -> _Part:
+    return _file_part(
+        "board", filename, lambda path: board._board_response(filename).model_dump_json().encode()
+    )
+
+
+def _protocol_part(filename: str) -> _Part:
+    return _file_part(
+        "protocol",
+        filename,
+        lambda path: protocol._protocol_response(filename, path).model_dump_json().encode(),
+    )
+
+
+def _commands_part() -> _Part:
+    commands = protocol._commands()
+    return commands.etag, lambda: commands.body
+
+
+def _board_catalogue_part() -> _Part:
+    catalogue = board._get_catalogue()
+    return catalogue.etag, lambda: catalogue.body
+
+
+def _assemble(part: Callable[[], _Part], known: Optional[str]) -> bytes:
+    """One part's JSON object; never raises.
+
+    Invalid configs are reported as 400, like the per-kind endpoints do;
+    anything else is a server bug, logged and reported as 500.
+    """
+    try:
+        etag, build = part()
+        if etag == known:
+            return json.dumps({"etag": etag, "unchanged": True}).encode()
+        body = build()
+    except HTTPException as e:
+        return json.dumps({"status": e.status_code, "detail": e.detail}).encode()
+    except (ValueError, yaml.YAMLError, SetupValidationError) as e:
+        # Invalid config contents (pydantic's ValidationError is a ValueError).
+        return json.dumps({"status": 400, "detail": str(e)}).encode()
+    except Exception as e:
+        logger.exception("Workspace part failed")
+        return json.dumps({"status": 500, "detail": f"Internal error: {e}"}).encode()
+    return b'{"etag":' + json.dumps(etag).encode() + b',"data":' + body + b"}"
+
+
+def _parse_have(have: List[str]) -> Dict[str, str]:
+    known: Dict[str, str] = {}
+    for item in have:
+        name, sep, etag = item.partition(":")
+        if sep:
+            known[name] = etag
+    return known
+
+
+@router.get("", response_model=WorkspaceResponse)
+async def get_workspace(
+    gantry_file: Optional[str] = Query(None, alias="gantry"),
+    deck_file: Optional[str] = Query(None, alias="deck"),
+    board_file: Optional[str] = Query(None, alias="board"),
+    protocol_file: Optional[str] = Query(None, alias="protocol"),
+    have: List[str] = Query([]),
+) -> Response:
+    """Listings, catalogues and the selected documents, one part per key.
+
+    Parts: ``configs`` (filenames per kind), ``commands``,
+    ``board_catalogue``, and ``gantry``/``deck``/``board``/``protocol``
+    for the files named in the query.
+    """
+    parts: Dict[str, Callable[[], _Part]] = {
+        "configs": _configs_part,
+        "commands": _commands_part,
+        "board_catalogue": _board_catalogue_part,
+    }
+    for name, filename, builder in (
+        ("gantry", gantry_file, _gantry_part),
+        ("deck", deck_file, _deck_part),
+        ("board", board_file, _board_part),
+        ("protocol", protocol_file, _protocol_part),
+    ):
+        if filename:
+            parts[name] = lambda builder=builder, filename=filename: builder(filename)
+
+    known = _parse_have(have)
+    bodies = await asyncio.gather(
+        *(asyncio.to_thread(_assemble, part, known.get(name)) for name, part in parts.items())
+    )
+    body = b",".join(
+        json.dumps(name).encode() + b":" + part for name, part in zip(parts, bodies)
+    )
+    return Response(b'{"parts":{' + body + b"}}", media_type="application/json")
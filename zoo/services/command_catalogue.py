@@ -0,0 +1,121 @@
+"""Protocol commands compiled once from PANDA_CORE's command registry.
+
+The catalogue maps each command name to its schema and to the bound
+validator of a reusable ``TypeAdapter``. It also keeps the ``CommandInfo``
+list pre-serialised for ``/commands``. It is rebuilt only when the
+registry's commands or schemas change.
+
+Validation is one pass over the steps: a dict lookup and one pydantic-core
+call per step. Validating whole ``list[schema]`` batches was measured to be
+slower. The batch keeps every validated model alive until the end, and
+the garbage collector then walks them repeatedly.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from zoo.models.protocol import CommandArg, CommandInfo, StepError
+from zoo.services.http_cache import content_etag
+
+
+def _type_name(annotation: Any) -> str:
+    """Convert a Python type annotation to a simple string for the frontend."""
+    name = getattr(annotation, "__name__", None)
+    if name:
+        return name
+    return str(annotation)
+
+
+def _command_info(cmd: Any) -> CommandInfo:
+    args = []
+    for field_name, field_info in cmd.schema.model_fields.items():
+        args.append(
+            CommandArg(
+                name=field_name,
+                type=_type_name(field_info.annotation),
+                required=field_info.is_required(),
+                default=None if field_info.is_required() else field_info.default,
+            )
+        )
+    return CommandInfo(
+        name=cmd.name,
+        description=(cmd.handler.__doc__ or "").strip(),
+        args=args,
+    )
+
+
+class CommandCatalogue:
+    def __init__(self, registry: Any) -> None:
+        commands = {name: registry.get(name) for name in registry.command_names}
+        self.schemas: Dict[str, type[BaseModel]] = {n: c.schema for n, c in commands.items()}
+        self._validators = {
+            n: TypeAdapter(s).validate_python for n, s in self.schemas.items()
+        }
+        self.infos: Dict[str, CommandInfo] = {n: _command_info(c) for n, c in commands.items()}
+        self.body = TypeAdapter(List[CommandInfo]).dump_json(list(self.infos.values()))
+        self.etag = content_etag(self.body)
+
+    def __contains__(self, command: str) -> bool:
+        return command in self.schemas
+
+    def validate(self, command: str, args: Dict[str, Any]) -> BaseModel:
+        """Validate one step's args; raises KeyError or ValidationError."""
+        return self._validators[command](args)
+
+    def check(self, command: str, args: Dict[str, Any]) -> Tuple[Tuple[Optional[str], str], ...]:
+        """``(field, message)`` problems with one step; empty when it is valid."""
+        validate = self._validators.get(command)
+        if validate is None:
+            return ((None, f"Unknown command '{command}'"),)
+        try:
+            validate(args)
+        except ValidationError as e:
+            return tuple(
+                (".".join(str(part) for part in err["loc"]) or None, err["msg"])
+                for err in e.errors(include_url=False)
+            )
+        return ()
+
+    def validate_steps(
+        self, steps: Sequence[Tuple[str, Dict[str, Any]]]
+    ) -> List[StepError]:
+        """Validate ``(command, args)`` steps; return errors ordered by step."""
+        errors: List[StepError] = []
+        check = self.check
+        for i, (command, args) in enumerate(steps):
+            for field, message in check(command, args):
+                errors.append(StepError(index=i, command=command, field=field, message=message))
+        return errors
+
+
+def format_errors(step_errors: List[StepError]) -> List[str]:
+    """One ``Step i (command): field: message; ...`` string per failing step."""
+    lines: List[str] = []
+    by_step: Dict[int, List[StepError]] = {}
+    for err in step_errors:
+        by_step.setdefault(err.index, []).append(err)
+    for index, errs in by_step.items():
+        if errs[0].field is None and len(errs) == 1:
+            lines.append(f"Step {index}: {errs[0].message}")
+            continue
+        details = "; ".join(f"{e.field}: {e.message}" if e.field else e.message for e in errs)
+        lines.append(f"Step {index} ({errs[0].command}): {details}")
+    return lines
+
+
+_catalogue: Optional[Tuple[Tuple[Any, ...], CommandCatalogue]] = None
+_lock = threading.Lock()
+
+
+def get_catalogue(registry: Any) -> CommandCatalogue:
+    """Catalogue for *registry*, rebuilt only when its commands change."""
+    global _catalogue
+    state = tuple((name, id(registry.get(name).schema)) for name in registry.command_names)
+    with _lock:
+        if _catalogue is None or _catalogue[0] != state:
+            _catalogue = (state, CommandCatalogue(registry))
+        return _catalogue[1]
@@ -0,0 +1,154 @@
+"""Config change events fanned out to connected clients.
+
+The ``yaml_io`` watcher already evicts the parsed-config cache on every
+change. By the time the listeners run, the classification index has also
+been refreshed, and every other cache is keyed by the file's signature.
+This module turns the same notifications into typed events, which the
+frontend uses to refetch only the queries that changed.
+
+An atomic save shows up as a rename onto the target, which the watcher
+reports as "added". The hub therefore keeps the set of config files it
+knows about, so that a rename onto an existing file is reported as
+``modified``. The set is only maintained while someone is subscribed.
+A subscriber that falls behind gets a single ``resync`` instead of a
+backlog.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Optional, Set, Tuple
+
+import watchfiles
+
+from zoo.config import get_settings
+from zoo.models.events import ConfigChangeEvent
+from zoo.services import yaml_io
+from zoo.services.config_index import get_index
+
+logger = logging.getLogger(__name__)
+
+_KINDS = {"gantry", "deck", "board", "protocol"}
+
+_Subscriber = Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[ConfigChangeEvent]"]
+
+
+def _offer(queue: "asyncio.Queue[ConfigChangeEvent]", event: ConfigChangeEvent) -> None:
+    if queue.full():
+        # Too far behind to catch up event by event: start over.
+        while not queue.empty():
+            queue.get_nowait()
+        event = ConfigChangeEvent(type="resync", seq=event.seq)
+    queue.put_nowait(event)
+
+
+class ConfigEventHub:
+    def __init__(self, max_backlog: int = 256) -> None:
+        self.max_backlog = max_backlog
+        self._subscribers: Set[_Subscriber] = set()
+        self._known: Optional[Set[Path]] = None
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _configs_dir(self) -> Path:
+        return get_settings().configs_dir.resolve()
+
+    def _scan(self) -> Set[Path]:
+        directory = self._configs_dir()
+        if not directory.is_dir():
+            return set()
+        return {p for p in directory.rglob("*.yaml") if not p.name.startswith(".")}
+
+    def _describe(self, path: Path) -> Optional[Tuple[Optional[str], str]]:
+        """``(kind, filename)`` for a config path, or None if it isn't one."""
+        directory = self._configs_dir()
+        try:
+            parts = path.relative_to(directory).parts
+        except ValueError:
+            return None
+        if len(parts) == 2 and parts[0] in _KINDS:
+            return parts[0], parts[1]
+        if len(parts) == 1:
+            # Flat layout: the index knows the kind (refresh is idempotent,
+            # whichever listener runs first).
+            index = get_index(directory)
+            index.refresh(path)
+            return index.kind_of(path.name), path.name
+        return None
+
+    def _publish(self, event_type: str, kind: Optional[str] = None, filename: Optional[str] = None) -> None:
+        with self._lock:
+            self._seq += 1
+            event = ConfigChangeEvent(type=event_type, kind=kind, filename=filename, seq=self._seq)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                pass  # subscriber's loop has shut down
+
+    def on_change(self, change: watchfiles.Change, path: Path) -> None:
+        """``yaml_io`` change listener (runs on the watcher thread)."""
+        if path.name.startswith("."):
+            return
+        with self._lock:
+            if not self._subscribers:
+                return
+            known = self._known
+        described = self._describe(path)
+        if described is None:
+            return
+        if change == watchfiles.Change.deleted:
+            event_type = "deleted"
+        elif known is not None and path in known:
+            event_type = "modified"
+        else:
+            event_type = "created"
+        with self._lock:
+            if self._known is not None:
+                if event_type == "deleted":
+                    self._known.discard(path)
+                else:
+                    self._known.add(path)
+        self._publish(event_type, *described)
+
+    def resync(self) -> None:
+        """Tell every client to refetch, e.g. after the configs dir moved."""
+        known = self._scan()
+        with self._lock:
+            if self._subscribers:
+                self._known = known
+        self._publish("resync")
+
+    async def subscribe(self, heartbeat: float = 15.0) -> AsyncIterator[Optional[ConfigChangeEvent]]:
+        """Yield events as they happen; ``None`` every *heartbeat* idle seconds."""
+        queue: asyncio.Queue[ConfigChangeEvent] = asyncio.Queue(maxsize=self.max_backlog)
+        entry = (asyncio.get_running_loop(), queue)
+        known = await asyncio.to_thread(self._scan)
+        with self._lock:
+            if not self._subscribers:
+                self._known = known
+            self._subscribers.add(entry)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.discard(entry)
+                if not self._subscribers:
+                    self._known = None
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+hub = ConfigEventHub()
+yaml_io.add_change_listener(hub.on_change)
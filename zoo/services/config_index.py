@@ -0,0 +1,201 @@
+"""Persistent kind-per-file index for flat configs directories.
+
+When a PANDA_CORE checkout has no ``configs/<kind>/`` subdirectories,
+``list_configs`` has to classify every YAML by content. This index records
+the kind of each file next to its stat signature, so only new or changed
+files are ever parsed. It is saved under ``ZooSettings.cache_dir`` to
+survive restarts, and kept current by the config watcher and by
+``yaml_io``'s own writes; while the watcher covers the directory, listing
+a kind is a pure lookup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import watchfiles
+
+from zoo.config import get_settings
+from zoo.services import yaml_io
+
+logger = logging.getLogger(__name__)
+
+_STORE_VERSION = 1
+
+# filename -> (signature, kind)
+_Entry = Tuple[yaml_io.FileSignature, Optional[str]]
+
+
+def _classify_file(path: Path) -> Optional[str]:
+    try:
+        return yaml_io.classify_config_file(path)
+    except Exception:
+        return None
+
+
+class ClassificationIndex:
+    """Kind of every ``*.yaml`` directly inside *directory*."""
+
+    def __init__(self, directory: Path, store: Optional[Path] = None) -> None:
+        self.directory = directory
+        self.store = store
+        self._entries: Dict[str, _Entry] = {}
+        # Kinds of recently deleted files, so a deletion can still be described.
+        self._removed: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        # Watcher generation the last reconcile ran under (-1: never).
+        self._generation = -1
+        self._dirty = False
+        self._load()
+
+    # ── Persistence ────────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        if self.store is None or not self.store.is_file():
+            return
+        try:
+            raw = json.loads(self.store.read_text())
+            if raw.get("version") != _STORE_VERSION or raw.get("directory") != str(self.directory):
+                return
+            self._entries = {
+                name: ((mtime, size, ino), kind)
+                for name, (mtime, size, ino, kind) in raw["entries"].items()
+            }
+        except Exception as e:
+            logger.warning("Ignoring unreadable config index %s: %s", self.store, e)
+            self._entries = {}
+
+    def _save_locked(self) -> None:
+        if self.store is None or not self._dirty:
+            return
+        payload = {
+            "version": _STORE_VERSION,
+            "directory": str(self.directory),
+            "entries": {name: [*sig, kind] for name, (sig, kind) in self._entries.items()},
+        }
+        try:
+            self.store.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.store.with_suffix(".tmp")
+            tmp.write_text(json.dumps(payload))
+            os.replace(tmp, self.store)
+            self._dirty = False
+        except OSError as e:
+            logger.warning("Could not persist config index %s: %s", self.store, e)
+
+    # ── Maintenance ────────────────────────────────────────────────────
+
+    def reconcile(self) -> None:
+        """Bring the index in line with the directory, classifying only changes."""
+        _, generation = yaml_io.watch_state()
+        with self._lock:
+            seen = set()
+            if self.directory.is_dir():
+                for p in self.directory.glob("*.yaml"):
+                    try:
+                        sig = yaml_io.file_signature(p)
+                    except OSError:
+                        continue
+                    seen.add(p.name)
+                    entry = self._entries.get(p.name)
+                    if entry is None or entry[0] != sig:
+                        self._entries[p.name] = (sig, _classify_file(p))
+                        self._dirty = True
+            for name in set(self._entries) - seen:
+                del self._entries[name]
+                self._dirty = True
+            self._generation = generation
+            self._save_locked()
+
+    def refresh(self, path: Path) -> None:
+        """Re-classify (or drop) a single file after a change notification."""
+        if path.parent != self.directory or path.suffix != ".yaml":
+            return
+        try:
+            sig = yaml_io.file_signature(path)
+        except OSError:
+            sig = None
+        with self._lock:
+            if sig is None:
+                removed = self._entries.pop(path.name, None)
+                if removed is not None:
+                    self._removed[path.name] = removed[1]
+                    if len(self._removed) > 64:
+                        del self._removed[next(iter(self._removed))]
+                    self._dirty = True
+                return
+            self._removed.pop(path.name, None)
+            entry = self._entries.get(path.name)
+            if entry is None or entry[0] != sig:
+                self._entries[path.name] = (sig, _classify_file(path))
+                self._dirty = True
+
+    def kind_of(self, name: str) -> Optional[str]:
+        """Kind of file *name*, or of a file by that name deleted recently."""
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry[1] if entry is not None else self._removed.get(name)
+
+    def list(self, kind: str) -> List[str]:
+        """Sorted filenames classified as *kind*."""
+        # Without a watcher on this directory, fall back to a stat-only
+        # reconcile so external edits are still picked up. A restarted
+        # watcher may have missed events, so reconcile once under it too.
+        watched, generation = yaml_io.watch_state()
+        if watched != self.directory or generation != self._generation:
+            self.reconcile()
+        with self._lock:
+            self._save_locked()
+            return sorted(name for name, (_, k) in self._entries.items() if k == kind)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_indexes: Dict[Path, ClassificationIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _store_path(directory: Path) -> Path:
+    digest = hashlib.sha1(str(directory).encode()).hexdigest()[:16]
+    return get_settings().cache_dir / f"config-index-{digest}.json"
+
+
+def get_index(configs_dir: Path) -> ClassificationIndex:
+    """Return the shared index for *configs_dir*, creating it on first use."""
+    directory = configs_dir.resolve()
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = ClassificationIndex(directory, _store_path(directory))
+            _indexes[directory] = index
+        return index
+
+
+def index_stats() -> Dict[str, int]:
+    with _indexes_lock:
+        return {"directories": len(_indexes), "entries": sum(len(i) for i in _indexes.values())}
+
+
+def refresh_path(path: Path) -> None:
+    """Re-classify the (resolved) *path* in its directory's index, if there is one.
+
+    ``yaml_io`` calls this after its own writes, so a saved file is listed
+    at once instead of after the watcher's debounce.
+    """
+    with _indexes_lock:
+        index = _indexes.get(path.parent)
+    if index is not None:
+        index.refresh(path)
+
+
+def _on_config_change(change: watchfiles.Change, path: Path) -> None:
+    refresh_path(path)
+
+
+yaml_io.add_change_listener(_on_config_change)
@@ -0,0 +1,194 @@
+"""Atomic, coalesced writes of config files.
+
+Every write goes to a temporary file in the target's directory. The
+temporary file is fsynced and then ``os.replace``d over the target, and
+the directory is fsynced as well. A crash, or a reader arriving
+mid-write, therefore sees either the old file or the new one, never a
+truncated mix.
+
+``CoalescingWriter`` takes those writes off the request path. ``submit``
+only records the new bytes and returns. A background thread writes a
+file once it has been quiet for ``delay`` seconds, or at the latest
+``max_delay`` seconds after its first unflushed change. An autosave burst
+therefore hits the disk once, with its last version. Until then,
+``pending`` hands readers the committed in-memory version. ``flush``
+writes out pending files immediately, for callers that hand paths to code
+that reads the disk itself.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Same shape as yaml_io.FileSignature: (st_mtime_ns, st_size, st_ino).
+Signature = Tuple[int, int, int]
+
+DEFAULT_DELAY_S = 0.3
+DEFAULT_MAX_DELAY_S = 2.0
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Durably replace *path* with *data*: temp file, fsync, rename, fsync dir."""
+    tmp = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except OSError:
+        mode = 0o666  # Filtered by the umask, like a plain open(path, "w").
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where directories cannot be opened.
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+@dataclass
+class PendingWrite:
+    """A committed version of a file that is not on disk yet."""
+
+    data: bytes
+    # Stands in for the file's stat signature until the write lands:
+    # ``(-seq, size, nonce)``. A negative "mtime" never collides with a real
+    # one, and the writer's random nonce keeps signatures (and the ETags
+    # derived from them) from repeating after a restart resets ``seq``.
+    signature: Signature
+    first: float
+    last: float
+
+
+class CoalescingWriter:
+    def __init__(
+        self,
+        delay: float = DEFAULT_DELAY_S,
+        max_delay: float = DEFAULT_MAX_DELAY_S,
+        on_written: Optional[Callable[[Path, PendingWrite], None]] = None,
+    ) -> None:
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_written = on_written
+        self._pending: Dict[Path, PendingWrite] = {}
+        self._cond = threading.Condition()
+        # Serialises disk writes so a flush and the background thread never
+        # write the same file concurrently.
+        self._io_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+        self._nonce = secrets.randbits(63)
+        self._counters = {"submitted": 0, "coalesced": 0, "written": 0, "failed": 0}
+
+    def submit(self, path: Path, data: bytes) -> Signature:
+        """Commit *data* as the new version of *path* (a resolved path)."""
+        now = time.monotonic()
+        with self._cond:
+            self._seq += 1
+            previous = self._pending.get(path)
+            self._counters["submitted"] += 1
+            if previous is not None:
+                self._counters["coalesced"] += 1
+            pending = PendingWrite(
+                data=data,
+                signature=(-self._seq, len(data), self._nonce),
+                first=previous.first if previous is not None else now,
+                last=now,
+            )
+            self._pending[path] = pending
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="zoo-config-writer", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+            return pending.signature
+
+    def pending(self, path: Path) -> Optional[PendingWrite]:
+        with self._cond:
+            return self._pending.get(path)
+
+    def flush(self, paths: Optional[Iterable[Path]] = None) -> None:
+        """Write out pending versions of *paths* (all files when None) now.
+
+        Raises ``OSError`` if a file cannot be written; it stays pending.
+        """
+        with self._cond:
+            targets = list(self._pending) if paths is None else [p for p in paths if p in self._pending]
+        for path in targets:
+            self._write_out(path, raise_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"pending": len(self._pending), **self._counters}
+
+    def _due(self, pending: PendingWrite) -> float:
+        return min(pending.last + self.delay, pending.first + self.max_delay)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._pending:
+                        # Idle: let the thread exit; submit() starts a new one.
+                        self._thread = None
+                        return
+                    now = time.monotonic()
+                    due = [p for p, w in self._pending.items() if self._due(w) <= now]
+                    if due:
+                        break
+                    self._cond.wait(min(self._due(w) for w in self._pending.values()) - now)
+            for path in due:
+                self._write_out(path)
+
+    def _write_out(self, path: Path, raise_errors: bool = False) -> None:
+        with self._io_lock:
+            with self._cond:
+                pending = self._pending.get(path)
+            if pending is None:
+                return  # Already written by someone else.
+            try:
+                atomic_write(path, pending.data)
+            except OSError as e:
+                gone = not path.parent.is_dir()
+                with self._cond:
+                    self._counters["failed"] += 1
+                    if self._pending.get(path) is pending:
+                        if gone:
+                            del self._pending[path]
+                        else:
+                            # Retry after another quiet period rather than spinning.
+                            pending.first = pending.last = time.monotonic()
+                if raise_errors:
+                    raise
+                if gone:
+                    logger.warning("Dropping write of %s: its directory is gone", path)
+                else:
+                    logger.warning("Could not write %s, will retry: %s", path, e)
+                return
+            with self._cond:
+                self._counters["written"] += 1
+                # A newer version submitted meanwhile stays pending.
+                if self._pending.get(path) is pending:
+                    del self._pending[path]
+            if self.on_written is not None:
+                self.on_written(path, pending)
@@ -0,0 +1,101 @@
+"""Columnar encodings of deck responses.
+
+The default deck JSON repeats ``{"x": .., "y": .., "z": ..}`` for every
+well, which for several 1536-well plates is megabytes of keys. The
+columnar formats send each plate's well ids once, in order, followed by
+its rounded coordinates as packed little-endian float32 columns: all x,
+then all y, then all z.
+
+``columnar`` is JSON with the columns base64-encoded under ``"columns"``.
+``binary`` is ``application/octet-stream`` laid out as::
+
+    b"ZDK1" | uint32 header length | header JSON | zero padding to 4 bytes | data
+
+Well-id lists are sent once per distinct plate shape, under ``well_ids``.
+A plate's ``wells.ids`` is an index into that list. The binary header has
+the same shape as the columnar JSON, except that each plate's ``wells``
+carries ``offset`` (bytes into the data section) and ``count`` instead of
+``columns``.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import struct
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+JSON = "json"
+COLUMNAR = "columnar"
+BINARY = "binary"
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.zoo.columnar+json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+_MAGIC = b"ZDK1"
+
+
+class Grid(Protocol):
+    ids: Sequence[str]
+    columns: bytes
+
+
+# (labware key, raw config, well grid or None for non-plates)
+DeckItem = Tuple[str, Dict[str, Any], Optional[Grid]]
+
+
+def negotiate(requested: Optional[str], accept: Optional[str]) -> str:
+    """Pick a deck format from the ``format`` query parameter or ``Accept``."""
+    if requested in (JSON, COLUMNAR, BINARY):
+        return requested
+    accept = accept or ""
+    if BINARY_MEDIA_TYPE in accept:
+        return BINARY
+    if COLUMNAR_MEDIA_TYPE in accept:
+        return COLUMNAR
+    return JSON
+
+
+def _id_sets(items: List[DeckItem]) -> Tuple[List[List[str]], Dict[Tuple[str, ...], int]]:
+    """Distinct well-id lists; plates of the same shape share one."""
+    sets: List[List[str]] = []
+    index: Dict[Tuple[str, ...], int] = {}
+    for _, _, grid in items:
+        if grid is not None:
+            ids = tuple(grid.ids)
+            if ids not in index:
+                index[ids] = len(sets)
+                sets.append(list(ids))
+    return sets, index
+
+
+def encode_columnar(filename: str, items: List[DeckItem]) -> bytes:
+    well_ids, index = _id_sets(items)
+    labware = []
+    for key, config, grid in items:
+        wells = None
+        if grid is not None:
+            wells = {
+                "ids": index[tuple(grid.ids)],
+                "columns": base64.b64encode(grid.columns).decode("ascii"),
+            }
+        labware.append({"key": key, "config": config, "wells": wells})
+    body = {"filename": filename, "well_ids": well_ids, "labware": labware}
+    return json.dumps(body, separators=(",", ":")).encode()
+
+
+def encode_binary(filename: str, items: List[DeckItem]) -> bytes:
+    well_ids, index = _id_sets(items)
+    labware = []
+    chunks: List[bytes] = []
+    offset = 0
+    for key, config, grid in items:
+        wells = None
+        if grid is not None:
+            wells = {"ids": index[tuple(grid.ids)], "offset": offset, "count": len(grid.ids)}
+            chunks.append(grid.columns)
+            offset += len(grid.columns)
+        labware.append({"key": key, "config": config, "wells": wells})
+    body = {"filename": filename, "well_ids": well_ids, "labware": labware}
+    header = json.dumps(body, separators=(",", ":")).encode()
+    padding = b"\0" * (-(len(_MAGIC) + 4 + len(header)) % 4)
+    return b"".join([_MAGIC, struct.pack("<I", len(header)), header, padding, *chunks])
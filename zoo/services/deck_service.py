@@ -0,0 +1,177 @@
+"""Deck pipeline with per-version caching.
+
+Each deck file version is read through ``read_yaml`` and validated by
+PANDA_CORE's deck loader, so GET, PUT and PATCH reject exactly what the
+loader rejects. The loader only reads files, so a version is parsed
+twice: once by ``read_yaml`` and once by the loader. When the version is
+the one on disk, the loader reads the file itself. A version that exists
+only in memory (a PUT or PATCH body, or a write still pending) is dumped
+to a private copy in the system temp directory for the loader. The
+loader's labware types decide which items are plates, and the plates'
+well grids come from the shared grid cache. The result, including the
+PANDA_CORE ``Deck``, is cached under the file's ``(path, signature)``,
+together with each rendered response format, so later requests for the
+same version parse nothing.
+
+Saving a deck writes the body and then warms the cache for the new file
+version from the in-memory body. Neither the response to the PUT nor the
+next GET reads the file back. Patching a deck still runs the loader on
+the whole document, but derives wells only for the labware the patch
+touched. Every other item's grid is carried over from the previous
+version.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from deck import load_deck_from_yaml
+from deck.labware.well_plate import WellPlate
+
+from zoo.services import deck_payload
+from zoo.services.deck_payload import DeckItem
+from zoo.services.memo import SingleFlightLRU
+from zoo.services.merge_patch import apply_merge_patch, only_touches, section_diff
+from zoo.services.wells import well_grid_for_config
+from zoo.services.yaml_io import (
+    FileSignature,
+    disk_signature,
+    file_signature,
+    read_yaml,
+    write_yaml,
+)
+
+# Signature of a version that is not in any file yet; never matches the disk.
+_UNWRITTEN: FileSignature = (-1, -1, -1)
+
+
+def _load_deck(path: Path, raw: Dict[str, Any], signature: FileSignature) -> Any:
+    """Run PANDA_CORE's loader on *raw*, the version *signature* of *path*.
+
+    When that version is what is on disk, the loader reads *path* itself.
+    Otherwise (a PUT or PATCH body, or a write still pending) the file may
+    hold another version, so the loader reads a private copy of *raw* in
+    the system temp directory, never in the configs directory, which may
+    be read-only.
+    """
+    if disk_signature(path) == signature:
+        deck = load_deck_from_yaml(path)
+        # The file may have been replaced while the loader read it.
+        if disk_signature(path) == signature:
+            return deck
+    with tempfile.TemporaryDirectory(prefix="zoo-deck-") as tmp:
+        copy = Path(tmp) / path.name
+        copy.write_text(yaml.safe_dump(raw, sort_keys=False, allow_unicode=True))
+        return load_deck_from_yaml(copy)
+
+
+class DeckVersion:
+    """One parsed, validated version of a deck file."""
+
+    def __init__(
+        self,
+        path: Path,
+        raw: Dict[str, Any],
+        signature: FileSignature,
+        reuse: Optional[Dict[str, DeckItem]] = None,
+    ) -> None:
+        """Validate *raw*, version *signature* of *path*, with PANDA_CORE's
+        loader (raises on any loader error).
+
+        Items in *reuse* are known to be unchanged and keep their grids.
+        """
+        self.path = path
+        self.raw = raw
+        self.deck: Any = _load_deck(path, raw, signature)
+        configs = raw.get("labware") or {}
+        reuse = reuse or {}
+        self.items: List[DeckItem] = []
+        for key, labware in self.deck.labware.items():
+            item = reuse.get(key)
+            if item is None:
+                config = configs.get(key, {})
+                grid = well_grid_for_config(config) if isinstance(labware, WellPlate) else None
+                item = (key, config, grid)
+            self.items.append(item)
+        self._rendered: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def render(self, filename: str, fmt: str) -> bytes:
+        """Response body in *fmt* (see ``deck_payload``), serialised once."""
+        key = f"{filename}:{fmt}"
+        with self._lock:
+            body = self._rendered.get(key)
+        if body is not None:
+            return body
+        if fmt == deck_payload.COLUMNAR:
+            body = deck_payload.encode_columnar(filename, self.items)
+        elif fmt == deck_payload.BINARY:
+            body = deck_payload.encode_binary(filename, self.items)
+        else:
+            labware = [
+                {"key": key, "config": config, "wells": grid.to_dict() if grid else None}
+                for key, config, grid in self.items
+            ]
+            body = json.dumps(
+                {"filename": filename, "labware": labware}, separators=(",", ":")
+            ).encode()
+        with self._lock:
+            return self._rendered.setdefault(key, body)
+
+
+_versions: SingleFlightLRU[DeckVersion] = SingleFlightLRU(max_entries=16)
+
+
+def load(path: Path) -> DeckVersion:
+    """The current version of the deck at *path*, parsed at most once."""
+    key = path.resolve()
+    signature = file_signature(key)
+    return _versions.get((key, signature), lambda: DeckVersion(key, read_yaml(key), signature))
+
+
+def save(path: Path, body: Dict[str, Any]) -> DeckVersion:
+    """Write *body* and cache it as the file's new version.
+
+    As before, the file is written even if *body* then fails validation.
+    """
+    write_yaml(path, body)
+    key = path.resolve()
+    signature = file_signature(key)
+    version = DeckVersion(key, body, signature)
+    _versions.put((key, signature), version)
+    return version
+
+
+def patch(path: Path, merge_patch: Dict[str, Any]) -> Tuple[DeckVersion, List[str], List[str]]:
+    """Apply an RFC 7396 *merge_patch*, validate, write and cache the result.
+
+    Returns the new version and the labware keys it changed and removed.
+    Nothing is written if validation fails.
+    """
+    base = load(path)
+    raw = apply_merge_patch(base.raw, merge_patch)
+    changed, removed = section_diff(base.raw, raw, "labware")
+    reuse = None
+    if only_touches(merge_patch, "labware"):
+        fresh = set(changed)
+        reuse = {item[0]: item for item in base.items if item[0] not in fresh}
+    # Validated from memory first: nothing is written if the loader rejects it.
+    version = DeckVersion(base.path, raw, _UNWRITTEN, reuse)
+    write_yaml(path, raw)
+    key = path.resolve()
+    _versions.put((key, file_signature(key)), version)
+    return version, changed, removed
+
+
+def deck_for(path: Path) -> Any:
+    """Cached PANDA_CORE ``Deck`` for the current version of *path*."""
+    return load(path).deck
+
+
+def cache_stats() -> Dict[str, int]:
+    return _versions.stats()
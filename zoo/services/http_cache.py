@@ -0,0 +1,61 @@
+"""ETag helpers for conditional GETs of config files.
+
+A config endpoint's body is a pure function of one file's contents, plus a
+representation variant such as the deck payload format. The ETag is
+therefore derived from the file's stat signature, which is the same
+version key the parse caches use, and the variant. A matching
+``If-None-Match`` is answered with 304 before the file is read, parsed or
+serialised.
+
+The ETags are weak. The app's gzip middleware compresses large bodies
+after the ETag is set, so one tag covers both the identity and the gzip
+encoding of a body, which a strong ETag must not.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from fastapi import Response
+
+from zoo.services.yaml_io import file_signature
+
+
+def file_etag(path: Path, variant: str = "") -> str:
+    """Weak ETag for the current version of *path* in representation *variant*."""
+    signature = file_signature(path.resolve())
+    digest = hashlib.blake2b(repr((signature, variant)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag for an in-memory body."""
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` comparison (weak, per RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return _opaque(etag) in (_opaque(tag) for tag in candidates)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Always revalidate; a 304 is nearly free.
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
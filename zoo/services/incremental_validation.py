@@ -0,0 +1,162 @@
+"""Incremental protocol validation for interactive editing.
+
+Each step of a protocol is validated against its own command schema. No
+step depends on another, so one step's result is a pure function of its
+``(command, args)`` and the command catalogue. That result is memoised
+under the step's content hash. Re-validating a protocol after an edit
+then only runs pydantic on steps that have not been seen before.
+
+Every validated protocol is kept for a while as a *version*: the per-step
+results in order. A client holding a version id can send just the spliced
+ranges it changed. The server applies them to the stored results,
+validates only the inserted steps, and returns the merged result under a
+new version id. Neither the request nor the validation work then grows
+with protocol length. Unknown or evicted versions raise
+``UnknownVersionError``, and the client falls back to sending the whole
+protocol.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from zoo.models.protocol import StepError
+from zoo.services.command_catalogue import CommandCatalogue
+from zoo.services.memo import canonical_key
+
+# ``(field, message)`` pairs for one step; empty when the step is valid.
+StepResult = Tuple[Tuple[Optional[str], str], ...]
+Step = Tuple[str, Dict[str, Any]]
+
+_MAX_STEP_RESULTS = 200_000
+
+
+class UnknownVersionError(KeyError):
+    """The base version is not (or no longer) held by the server."""
+
+
+@dataclass
+class Splice:
+    """Replace ``delete`` steps at ``start`` with ``insert`` (like ``Array.splice``)."""
+
+    start: int
+    delete: int
+    insert: Sequence[Step]
+
+
+@dataclass
+class ValidationOutcome:
+    version: str
+    commands: List[str]
+    results: List[StepResult]
+    revalidated: int
+
+    def step_errors(self) -> List[StepError]:
+        return [
+            StepError(index=i, command=self.commands[i], field=field, message=message)
+            for i, result in enumerate(self.results)
+            if result
+            for field, message in result
+        ]
+
+
+class IncrementalValidator:
+    def __init__(self, max_versions: int = 32) -> None:
+        self.max_versions = max_versions
+        self._catalogue: Optional[CommandCatalogue] = None
+        self._step_results: Dict[str, StepResult] = {}
+        # version -> (commands, results), both in step order.
+        self._versions: OrderedDict[str, Tuple[List[str], List[StepResult]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _reset_if_stale(self, catalogue: CommandCatalogue) -> None:
+        """Results are only valid for the catalogue that produced them."""
+        if self._catalogue is not catalogue:
+            self._catalogue = catalogue
+            self._step_results.clear()
+            self._versions.clear()
+
+    def _results_for(
+        self, catalogue: CommandCatalogue, steps: Sequence[Step], digest: Any = None
+    ) -> Tuple[List[StepResult], int]:
+        results: List[StepResult] = []
+        memo = self._step_results
+        revalidated = 0
+        for command, args in steps:
+            key = canonical_key([command, args])
+            if digest is not None:
+                digest.update(key.encode())
+            result = memo.get(key)
+            if result is None:
+                result = catalogue.check(command, args)
+                revalidated += 1
+                if len(memo) >= _MAX_STEP_RESULTS:
+                    memo.clear()
+                memo[key] = result
+            results.append(result)
+        return results, revalidated
+
+    def _remember(self, version: str, commands: List[str], results: List[StepResult]) -> None:
+        self._versions[version] = (commands, results)
+        self._versions.move_to_end(version)
+        while len(self._versions) > self.max_versions:
+            self._versions.popitem(last=False)
+
+    def validate(
+        self, catalogue: CommandCatalogue, steps: Sequence[Step]
+    ) -> ValidationOutcome:
+        """Validate a whole protocol, reusing results for steps seen before."""
+        with self._lock:
+            self._reset_if_stale(catalogue)
+            digest = hashlib.sha256(catalogue.etag.encode())
+            results, revalidated = self._results_for(catalogue, steps, digest)
+            commands = [command for command, _ in steps]
+            version = digest.hexdigest()
+            self._remember(version, commands, results)
+        return ValidationOutcome(version, commands, results, revalidated)
+
+    def apply(
+        self, catalogue: CommandCatalogue, base_version: str, splices: Sequence[Splice]
+    ) -> ValidationOutcome:
+        """Validate *base_version* with *splices* applied, in order.
+
+        Raises ``UnknownVersionError`` if the base is not held, and
+        ``IndexError`` if a splice falls outside the protocol.
+        """
+        with self._lock:
+            self._reset_if_stale(catalogue)
+            base = self._versions.get(base_version)
+            if base is None:
+                raise UnknownVersionError(base_version)
+            commands, results = list(base[0]), list(base[1])
+            revalidated = 0
+            for splice in splices:
+                end = splice.start + splice.delete
+                if splice.start < 0 or splice.delete < 0 or end > len(results):
+                    raise IndexError(
+                        f"Change at {splice.start}+{splice.delete} is outside "
+                        f"a protocol of {len(results)} steps"
+                    )
+                inserted, count = self._results_for(catalogue, splice.insert)
+                results[splice.start:end] = inserted
+                commands[splice.start:end] = [command for command, _ in splice.insert]
+                revalidated += count
+            version = canonical_key(
+                [
+                    base_version,
+                    [[s.start, s.delete, [list(step) for step in s.insert]] for s in splices],
+                ]
+            )
+            self._remember(version, commands, results)
+        return ValidationOutcome(version, commands, results, revalidated)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"versions": len(self._versions), "steps": len(self._step_results)}
+
+
+incremental_validator = IncrementalValidator()
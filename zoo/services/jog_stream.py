@@ -0,0 +1,86 @@
+"""Coalesce streamed jog deltas into as few ``$J=`` commands as possible.
+
+While a jog key is held the client streams small relative deltas. Deltas
+that arrive within ``window`` seconds of each other are summed into one
+jog command, and at most ``max_in_flight`` commands are outstanding at
+once. Everything accumulated meanwhile goes out as the next, larger
+segment.
+
+``max_in_flight`` counts commands handed to ``send_jog`` that have not
+returned, i.e. the serial actor's jobs. It bounds how many jogs wait
+for the port, not how many segments sit in GRBL's planner buffer, so it
+says nothing about how far the head travels after the key is released.
+What stops the motion is the jog cancel that releasing the key issues:
+GRBL's 0x85 discards every queued jog segment. Pending deltas are
+dropped and jogs still waiting for the port are withdrawn first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class JogCoalescer:
+    def __init__(
+        self,
+        send_jog: Callable[[float, float, float], Awaitable[None]],
+        send_cancel: Callable[[], Awaitable[None]],
+        *,
+        window: float = 0.03,
+        max_in_flight: int = 2,
+    ) -> None:
+        self._send_jog = send_jog
+        self._send_cancel = send_cancel
+        self.window = window
+        self._pending = [0.0, 0.0, 0.0]
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight: set[asyncio.Task[None]] = set()
+        self.commands_sent = 0
+
+    def add(self, x: float, y: float, z: float) -> None:
+        """Accumulate a relative move; it is sent on the next flush."""
+        self._pending[0] += x
+        self._pending[1] += y
+        self._pending[2] += z
+        if any(self._pending):
+            self._wake.set()
+
+    async def cancel(self) -> None:
+        """Drop pending deltas and stop any jog motion (key released)."""
+        self._pending = [0.0, 0.0, 0.0]
+        self._wake.clear()
+        # Jogs still waiting for the port are withdrawn rather than sent late.
+        for task in list(self._in_flight):
+            task.cancel()
+        await self._send_cancel()
+
+    async def run(self) -> None:
+        """Flush loop; run as a task for the lifetime of the jog channel."""
+        while True:
+            await self._wake.wait()
+            # Let the rest of this burst arrive before building a command.
+            await asyncio.sleep(self.window)
+            await self._slots.acquire()
+            x, y, z = self._pending
+            self._pending = [0.0, 0.0, 0.0]
+            self._wake.clear()
+            if not (x or y or z):
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._dispatch(x, y, z))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, x: float, y: float, z: float) -> None:
+        try:
+            await self._send_jog(x, y, z)
+            self.commands_sent += 1
+        except Exception as e:
+            logger.warning("Jog error (non-fatal): %s", e)
+        finally:
+            self._slots.release()
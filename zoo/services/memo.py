@@ -0,0 +1,83 @@
+"""Thread-safe LRU memo with in-flight de-duplication.
+
+Several browser tabs (or one fast typist) can request the same expensive
+derivation at once. The first caller computes it; identical requests that
+arrive meanwhile wait for that result instead of repeating the work.
+Failures are not cached — every waiter sees the exception and the next
+call tries again.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+def canonical_key(value: Any) -> str:
+    """SHA-256 of *value*'s canonical JSON (sorted keys, no whitespace)."""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class SingleFlightLRU(Generic[V]):
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, V] = OrderedDict()
+        self._in_flight: Dict[Hashable, concurrent.futures.Future[V]] = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "deduplicated": 0}
+
+    def get(self, key: Hashable, compute: Callable[[], V]) -> V:
+        """Return the value for *key*, computing it at most once at a time."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return self._entries[key]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+                self._counters["misses"] += 1
+            else:
+                self._counters["deduplicated"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Store *value* directly, e.g. to warm the cache after a write."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), **self._counters}
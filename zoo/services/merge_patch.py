@@ -0,0 +1,67 @@
+"""JSON merge patches (RFC 7396) over config documents.
+
+``apply_merge_patch`` copies only the objects along patched paths. Every
+untouched subtree is shared with the original, so ``section_diff`` can
+tell changed entries apart with an identity check before falling back to
+``==``. Callers use the diff to validate and return only the entries a
+patch touched, when ``entries_validate_alone`` says that is sound for
+the schema.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """Return *target* with *patch* applied; neither argument is modified."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def section_diff(
+    before: Dict[str, Any], after: Dict[str, Any], section: str
+) -> Tuple[List[str], List[str]]:
+    """Keys of the ``section`` mapping that were added or changed, and removed."""
+    old = before.get(section) or {}
+    new = after.get(section) or {}
+    changed = [
+        key
+        for key, value in new.items()
+        if key not in old or (old[key] is not value and old[key] != value)
+    ]
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+def only_touches(patch: Dict[str, Any], section: str) -> bool:
+    """True if *patch* edits entries of ``section`` and nothing else."""
+    return patch.keys() == {section} and isinstance(patch[section], dict)
+
+
+def entries_validate_alone(schema: Type[BaseModel], section: str) -> bool:
+    """True if *schema* checks each entry of its ``section`` mapping on its own.
+
+    Model validators, validators on the section field and constraints on
+    it (e.g. a minimum length) may look at several entries at once, such
+    as unique names or at most one instrument of a kind. Validating only
+    the changed entries would skip them, so callers validate the whole
+    document instead.
+    """
+    decorators = schema.__pydantic_decorators__
+    if decorators.model_validators or decorators.root_validators:
+        return False
+    for validator in decorators.field_validators.values():
+        if section in validator.info.fields or "*" in validator.info.fields:
+            return False
+    field = schema.model_fields.get(section)
+    return field is not None and not field.metadata
@@ -0,0 +1,154 @@
+"""Ordered, bounded queue of absolute moves with per-move job ids.
+
+Moves run strictly in submission order: the queue hands one move at a time
+to the serial actor and submits the next when it finishes, so no threads
+are spawned per request. Cancelling the running move (or flushing) calls a
+caller-supplied ``halt`` — a GRBL feed hold followed by a soft reset —
+which also drops everything still pending.
+
+A soft reset during motion leaves GRBL in ALARM 3: machine position is
+lost and every later move is rejected until the gantry is re-homed (or
+unlocked with ``$X``). The halted job is marked ``position_lost``. It is
+recorded as cancelled at once, but the queue only moves on once the
+driver's move call returns, which depends on how it reacts to the alarm
+and may take up to the move ``timeout``.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from zoo.models.gantry import MoveJob
+from zoo.services.serial_actor import Priority, QueueFullError, SerialActor
+
+logger = logging.getLogger(__name__)
+
+
+class MotionQueue:
+    def __init__(
+        self,
+        actor: SerialActor,
+        *,
+        max_depth: int = 16,
+        timeout: float = 300.0,
+        history: int = 100,
+    ) -> None:
+        self._actor = actor
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.history = history
+        self._pending: Deque[Tuple[MoveJob, Callable[[], None]]] = deque()
+        self._running: Optional[MoveJob] = None
+        self._jobs: OrderedDict[str, MoveJob] = OrderedDict()
+        # Re-entrant: a future can complete (and call back) inside submit.
+        self._lock = threading.RLock()
+
+    def submit(self, x: float, y: float, z: float, move: Callable[[], None]) -> MoveJob:
+        """Queue *move* (which drives the gantry to x/y/z); raise QueueFullError if full."""
+        with self._lock:
+            if len(self._pending) >= self.max_depth:
+                raise QueueFullError(f"Motion queue full ({self.max_depth} pending moves)")
+            job = MoveJob(id=uuid.uuid4().hex[:12], x=x, y=y, z=z, submitted_at=time.time())
+            self._pending.append((job, move))
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.status in ("queued", "running"):
+                    break
+                self._jobs.popitem(last=False)
+            self._pump_locked()
+            return job.model_copy()
+
+    def get(self, job_id: str) -> Optional[MoveJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job is not None else None
+
+    def jobs(self) -> List[MoveJob]:
+        with self._lock:
+            return [job.model_copy() for job in self._jobs.values()]
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def cancel(self, job_id: str, halt: Callable[[], None]) -> Optional[MoveJob]:
+        """Cancel one move. Stopping the running move flushes the whole queue."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == "queued":
+                self._pending = deque((j, m) for j, m in self._pending if j.id != job_id)
+                self._mark_cancelled(job)
+                return job.model_copy()
+            if job is not self._running:
+                return job.model_copy()
+        self.flush(halt)
+        return self.get(job_id)
+
+    def flush(self, halt: Callable[[], None]) -> List[MoveJob]:
+        """Cancel every pending move and halt the running one."""
+        with self._lock:
+            cancelled = [job for job, _ in self._pending]
+            self._pending.clear()
+            for job in cancelled:
+                self._mark_cancelled(job)
+            running = self._running
+            if running is not None:
+                running.position_lost = running.status == "running"
+                self._mark_cancelled(running)
+                cancelled.append(running)
+        if running is not None:
+            halt()
+        return [job.model_copy() for job in cancelled]
+
+    # ── Internals ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def _mark_cancelled(job: MoveJob) -> None:
+        job.status = "cancelled"
+        job.finished_at = time.time()
+
+    def _pump_locked(self) -> None:
+        while self._running is None and self._pending:
+            job, move = self._pending.popleft()
+
+            def run(job: MoveJob = job, move: Callable[[], None] = move) -> None:
+                with self._lock:
+                    if job.status == "cancelled":
+                        return
+                    job.status = "running"
+                    job.started_at = time.time()
+                move()
+
+            try:
+                future = self._actor.submit(
+                    run, priority=Priority.MOTION, timeout=self.timeout, name=f"move {job.id}"
+                )
+            except QueueFullError as e:
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = time.time()
+                continue
+            self._running = job
+            future.add_done_callback(lambda f, job=job: self._finished(job, f))
+
+    def _finished(self, job: MoveJob, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if job.status != "cancelled":
+                error = future.exception() if not future.cancelled() else None
+                job.status = "failed" if error is not None else "done"
+                job.error = str(error) if error is not None else None
+                job.finished_at = time.time()
+                if error is not None:
+                    logger.error("Move %s failed: %s", job.id, error)
+            if self._running is job:
+                self._running = None
+            self._pump_locked()
@@ -0,0 +1,71 @@
+"""Single gantry status poller fanned out to any number of subscribers.
+
+Browsers used to poll ``/api/gantry/position`` independently, so serial
+traffic grew with every open tab. The broadcaster owns the only status
+query loop: it runs while at least one subscriber is attached, publishes a
+position only when it differs from the previous one, and lets the HTTP
+endpoint answer from the latest sample instead of touching the port.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Optional, Set
+
+from zoo.models.gantry import GantryPosition
+
+logger = logging.getLogger(__name__)
+
+
+class PositionBroadcaster:
+    def __init__(self, query: Callable[[], GantryPosition], interval: float = 0.1) -> None:
+        self._query = query
+        self.interval = interval
+        self.latest: Optional[GantryPosition] = None
+        self._subscribers: Set[asyncio.Queue[GantryPosition]] = set()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self) -> AsyncIterator[GantryPosition]:
+        """Yield the latest position, then every subsequent change."""
+        queue: asyncio.Queue[GantryPosition] = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+        try:
+            if self.latest is not None:
+                yield self.latest
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    def _publish(self, position: GantryPosition) -> None:
+        self.latest = position
+        for queue in self._subscribers:
+            # Slow consumers only ever need the newest sample.
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(position)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                position = await asyncio.to_thread(self._query)
+            except Exception as e:
+                logger.warning("Position poll failed: %s", e)
+            else:
+                if position != self.latest:
+                    self._publish(position)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,162 @@
+"""Windowed access to protocol steps without building the whole list.
+
+A generated protocol can hold tens of thousands of steps. Loading one
+through ``read_yaml`` builds every step's dict just to show the first
+screenful. Instead, the file's text is walked once with the parser's
+event stream. Nothing is composed during the walk; it records where each
+well-formed step (a one-key mapping) starts and ends. The resulting
+``StepIndex`` is cached per file version. A window of steps then costs one
+small parse per step: seeking to step N is an array lookup.
+
+A document that uses aliases inside its protocol cannot be parsed step by
+step, because an alias may refer to an anchor outside the window. Nor can
+one with several top-level ``protocol`` keys, where a full parse keeps the
+last. Such files fall back to a full parse when the index is built, once
+per version.
+"""
+
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from zoo.services.memo import SingleFlightLRU
+from zoo.services.yaml_io import file_signature, read_text
+
+# libyaml when PyYAML was built with it; the pure-Python one otherwise.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+Step = Dict[str, Any]
+
+
+def _is_step(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1
+
+
+class StepIndex:
+    """Offsets of every well-formed step in one version of a protocol file."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.starts = array("q")
+        self.ends = array("q")
+        self.columns = array("l")
+        # Only set when the file cannot be sliced (see module docstring).
+        self.steps: Optional[List[Step]] = None
+        if not self._scan():
+            data = yaml.load(text, Loader=_Loader) or {}
+            if not isinstance(data.get("protocol"), list):
+                raise ValueError("not a protocol YAML: no top-level 'protocol' list")
+            self.steps = [s for s in data["protocol"] if _is_step(s)]
+
+    def __len__(self) -> int:
+        return len(self.steps) if self.steps is not None else len(self.starts)
+
+    def window(self, offset: int, limit: int) -> List[Step]:
+        """Steps ``offset`` to ``offset + limit`` (clamped to the protocol)."""
+        if self.steps is not None:
+            return self.steps[offset:offset + limit]
+        stop = min(offset + limit, len(self.starts))
+        return [self._load(i) for i in range(offset, stop)]
+
+    def _load(self, i: int) -> Step:
+        return self._parse(self.starts[i], self.ends[i], self.columns[i])
+
+    def _parse(self, start: int, end: int, column: int) -> Any:
+        # Re-indent to the step's original column so continuation lines of a
+        # block mapping keep their relative indentation.
+        fragment = " " * column + self.text[start:end]
+        return yaml.load(fragment, Loader=_Loader)
+
+    def _scan(self) -> bool:
+        """Record step offsets; False if the steps use aliases or the
+        document repeats its ``protocol`` key.
+
+        Raises ``ValueError`` when the document has no ``protocol`` list.
+        """
+        depth = 0
+        expect_key = True
+        protocol_key = False
+        in_protocol = False
+        found = False
+        step_start = -1
+        step_column = 0
+        step_keys = 0
+        step_expect_key = True
+        for event in yaml.parse(self.text, Loader=_Loader):
+            if isinstance(event, yaml.CollectionStartEvent):
+                if depth == 0 and not isinstance(event, yaml.MappingStartEvent):
+                    break
+                if depth == 1:
+                    if protocol_key:
+                        if found:
+                            return False
+                        if not isinstance(event, yaml.SequenceStartEvent):
+                            break
+                        in_protocol = found = True
+                elif in_protocol and depth == 2:
+                    if isinstance(event, yaml.MappingStartEvent):
+                        step_start = event.start_mark.index
+                        step_column = event.start_mark.column
+                        step_keys = 0
+                        step_expect_key = True
+                elif in_protocol and depth == 3 and step_start >= 0:
+                    if step_expect_key:
+                        step_keys += 1
+                    step_expect_key = not step_expect_key
+                depth += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                depth -= 1
+                if depth == 1:
+                    # Keep reading: a later ``protocol`` key would win.
+                    in_protocol = False
+                    expect_key = not expect_key
+                elif in_protocol and depth == 2 and step_start >= 0:
+                    # Several key events may still build a one-key mapping
+                    # (``{a: 1, a: 2}``); let the loader decide, as a full
+                    # parse would.
+                    end = event.end_mark.index
+                    if step_keys == 1 or (
+                        step_keys > 1 and _is_step(self._parse(step_start, end, step_column))
+                    ):
+                        self.starts.append(step_start)
+                        self.ends.append(end)
+                        self.columns.append(step_column)
+                    step_start = -1
+            elif isinstance(event, (yaml.ScalarEvent, yaml.AliasEvent)):
+                if in_protocol and isinstance(event, yaml.AliasEvent):
+                    return False
+                if depth == 1:
+                    if expect_key:
+                        protocol_key = isinstance(event, yaml.ScalarEvent) and event.value == "protocol"
+                        if protocol_key and found:
+                            # Duplicate key: the full parse keeps the last value.
+                            return False
+                    else:
+                        protocol_key = False
+                    expect_key = not expect_key
+                elif in_protocol and depth == 3 and step_start >= 0:
+                    if step_expect_key:
+                        step_keys += 1
+                    step_expect_key = not step_expect_key
+        if not found:
+            raise ValueError("not a protocol YAML: no top-level 'protocol' list")
+        return True
+
+
+_indexes: SingleFlightLRU[StepIndex] = SingleFlightLRU(max_entries=8)
+
+
+def step_index(path: Path) -> StepIndex:
+    """Cached index of the current version of the protocol at *path*."""
+    key = path.resolve()
+    # Stat before reading; a change mid-read only costs a rebuild next time.
+    signature = file_signature(key)
+    return _indexes.get((key, signature), lambda: StepIndex(read_text(key)))
+
+
+def cache_stats() -> Dict[str, int]:
+    return _indexes.stats()
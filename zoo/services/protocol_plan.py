@@ -0,0 +1,235 @@
+"""Compile the four run inputs into a resolved, cached execution plan.
+
+Compiling validates the gantry, deck and board configs and every protocol
+step, resolves each ``plate_1.A1``-style position to absolute coordinates
+and binds steps to board instruments. Plans are cached under a SHA-256
+digest of the four files' resolved paths and bytes, so compiling,
+optimising, simulating or batching an unchanged protocol again only pays
+for hashing.
+
+Runs are not made faster by this cache. PANDA_CORE exposes no way to
+build a run context from already-loaded configs: ``setup_protocol`` reads
+and validates the four files itself and returns the protocol with its
+context, which holds run state (tips, volumes, instrument state) and the
+live gantry. Every ``/run`` therefore sets PANDA_CORE up afresh, and uses
+a cached plan only to choose the step order when optimising.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from board.yaml_schema import BoardYamlSchema
+from deck.labware.well_plate import WellPlate
+from protocol_engine.registry import CommandRegistry
+
+from zoo.models.gantry import GantryConfig
+from zoo.models.protocol import PlanStep, Position3D, ProtocolPlan
+from zoo.services import deck_service
+from zoo.services.command_catalogue import get_catalogue
+from zoo.services.yaml_io import flush, read_yaml
+
+# labware key -> {well id: coords} for plates, or a single location (vials).
+LabwareCoordinates = Dict[str, Union[Dict[str, Position3D], Position3D]]
+
+
+class PlanCompileError(ValueError):
+    """One or more inputs failed validation; ``errors`` lists them all."""
+
+    def __init__(self, errors: List[str]) -> None:
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+class CompiledPlan:
+    def __init__(self, plan: ProtocolPlan) -> None:
+        self.plan = plan
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def derive(self, key: str, compute: Callable[[ProtocolPlan], Any]) -> Any:
+        """Memoise a value computed from the plan (e.g. an optimised ordering)."""
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+        value = compute(self.plan)
+        with self._lock:
+            return self._derived.setdefault(key, value)
+
+
+def config_digest(paths: Tuple[Path, ...]) -> str:
+    """Digest of the files' resolved paths and contents.
+
+    A plan records its filenames and runs set up from them, so identical
+    contents under other names must not share a plan.
+    """
+    h = hashlib.sha256()
+    for path in paths:
+        name = str(path.resolve()).encode()
+        h.update(len(name).to_bytes(8, "little"))
+        h.update(name)
+        data = path.read_bytes()
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def _labware_coordinates(deck: Any, deck_raw: Dict[str, Any]) -> LabwareCoordinates:
+    coords: LabwareCoordinates = {}
+    raw_labware = deck_raw.get("labware", {})
+    for key, labware in deck.labware.items():
+        if isinstance(labware, WellPlate):
+            coords[key] = {
+                wid: Position3D(x=round(c.x, 3), y=round(c.y, 3), z=round(c.z, 3))
+                for wid, c in labware.wells.items()
+            }
+            continue
+        location = raw_labware.get(key, {}).get("location")
+        if isinstance(location, dict):
+            coords[key] = Position3D.model_validate(location)
+    return coords
+
+
+def resolve_position(position: str, labware: LabwareCoordinates) -> Position3D:
+    """Resolve ``labware_key[.well]`` to absolute coordinates."""
+    key, _, well = position.partition(".")
+    target = labware.get(key)
+    if target is None:
+        raise KeyError(f"Unknown labware '{key}'")
+    if isinstance(target, Position3D):
+        if well:
+            raise KeyError(f"Labware '{key}' has no wells")
+        return target
+    if not well:
+        raise KeyError(f"Position '{position}' must name a well of '{key}'")
+    if well not in target:
+        raise KeyError(f"Unknown well '{well}' in '{key}'")
+    return target[well]
+
+
+def build_steps(
+    raw_steps: List[Any],
+    labware: LabwareCoordinates,
+    instruments: List[str],
+) -> List[PlanStep]:
+    """Validate every step against the command registry and resolve its target."""
+    commands = get_catalogue(CommandRegistry.instance())
+    errors: List[str] = []
+    steps: List[PlanStep] = []
+    for i, raw_step in enumerate(raw_steps):
+        if not isinstance(raw_step, dict) or len(raw_step) != 1:
+            errors.append(f"Step {i}: expected a single-key mapping")
+            continue
+        command = next(iter(raw_step))
+        args = raw_step[command] or {}
+        if command not in commands:
+            errors.append(f"Step {i}: Unknown command '{command}'")
+            continue
+        try:
+            validated = commands.validate(command, args).model_dump()
+        except Exception as e:
+            errors.append(f"Step {i} ({command}): {e}")
+            continue
+
+        position = validated.get("position")
+        coordinates = None
+        if isinstance(position, str):
+            try:
+                coordinates = resolve_position(position, labware)
+            except KeyError as e:
+                errors.append(f"Step {i} ({command}): {e.args[0]}")
+                continue
+        instrument = validated.get("instrument")
+        if isinstance(instrument, str) and instrument not in instruments:
+            errors.append(f"Step {i} ({command}): Unknown instrument '{instrument}'")
+            continue
+
+        steps.append(
+            PlanStep(
+                index=i,
+                command=command,
+                args=validated,
+                position=position if isinstance(position, str) else None,
+                coordinates=coordinates,
+                instrument=instrument if isinstance(instrument, str) else None,
+            )
+        )
+    if errors:
+        raise PlanCompileError(errors)
+    return steps
+
+
+def _compile(digest: str, files: Tuple[str, str, str, str], paths: Tuple[Path, ...]) -> ProtocolPlan:
+    gantry_path, deck_path, board_path, protocol_path = paths
+    try:
+        gantry = GantryConfig.model_validate(read_yaml(gantry_path))
+    except Exception as e:
+        raise PlanCompileError([f"Gantry config: {e}"])
+    try:
+        version = deck_service.load(deck_path)
+        labware = _labware_coordinates(version.deck, version.raw)
+    except Exception as e:
+        raise PlanCompileError([f"Deck config: {e}"])
+    try:
+        board_raw = read_yaml(board_path)
+        BoardYamlSchema.model_validate(board_raw)
+        instruments = sorted(board_raw.get("instruments", {}))
+    except Exception as e:
+        raise PlanCompileError([f"Board config: {e}"])
+
+    raw_steps = read_yaml(protocol_path).get("protocol")
+    if not isinstance(raw_steps, list):
+        raise PlanCompileError(["Protocol config: missing 'protocol' list"])
+
+    return ProtocolPlan(
+        digest=digest,
+        gantry_file=files[0],
+        deck_file=files[1],
+        board_file=files[2],
+        protocol_file=files[3],
+        gantry=gantry,
+        instruments=instruments,
+        steps=build_steps(raw_steps, labware, instruments),
+    )
+
+
+class PlanCache:
+    """LRU of compiled plans keyed by the digest of their four input files."""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CompiledPlan] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, files: Tuple[str, str, str, str], paths: Tuple[Path, ...]) -> CompiledPlan:
+        """Return the cached plan for the current file contents, compiling on a miss."""
+        # PANDA_CORE reads these paths itself, so pending edits must be on disk.
+        flush(paths)
+        digest = config_digest(paths)
+        with self._lock:
+            compiled = self._entries.get(digest)
+            if compiled is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        compiled = CompiledPlan(_compile(digest, files, paths))
+        with self._lock:
+            self._entries[digest] = compiled
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Shared cache — used by /compile and /run.
+plan_cache = PlanCache()
@@ -0,0 +1,157 @@
+"""Background protocol runs with progress streaming and cancellation.
+
+A run is prepared in the request (so setup errors still surface as HTTP
+errors) and then executed step by step on its own thread. After every
+step the run's snapshot is published to subscribers; a client that
+reloads simply subscribes again and receives the current snapshot first.
+Cancellation is cooperative: the flag is checked between steps, so a step
+that has started always finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Set, Tuple
+
+from zoo.models.protocol import ProtocolRun
+
+logger = logging.getLogger(__name__)
+
+# (command name, callable that executes the step)
+PreparedStep = Tuple[str, Callable[[], Any]]
+
+_FINISHED = ("done", "failed", "cancelled")
+
+
+class RunConflictError(RuntimeError):
+    """Another protocol run is still in progress."""
+
+
+def _offer(queue: "asyncio.Queue[ProtocolRun]", snapshot: ProtocolRun) -> None:
+    # Subscribers only need the newest snapshot; the final one is never lost
+    # because it is always the newest.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(snapshot)
+
+
+class ProtocolRunManager:
+    def __init__(self, history: int = 20) -> None:
+        self.history = history
+        self._runs: OrderedDict[str, ProtocolRun] = OrderedDict()
+        self._cancel: Set[str] = set()
+        self._active: Optional[str] = None
+        self._subscribers: dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    # ── Submission & control ───────────────────────────────────────────
+
+    def submit(self, run: ProtocolRun, steps: Sequence[PreparedStep]) -> ProtocolRun:
+        """Start executing *steps* in the background; raise RunConflictError if busy."""
+        with self._lock:
+            if self._active is not None:
+                raise RunConflictError(f"Protocol run {self._active} is still in progress")
+            run.total_steps = len(steps)
+            self._runs[run.id] = run
+            self._active = run.id
+            while len(self._runs) > self.history:
+                self._runs.popitem(last=False)
+        threading.Thread(
+            target=self._execute, args=(run, list(steps)), name=f"zoo-run-{run.id}", daemon=True
+        ).start()
+        return run.model_copy()
+
+    def cancel(self, run_id: str) -> Optional[ProtocolRun]:
+        """Request a stop before the next step."""
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            if run.status not in _FINISHED:
+                self._cancel.add(run_id)
+            return run.model_copy()
+
+    def get(self, run_id: str) -> Optional[ProtocolRun]:
+        with self._lock:
+            run = self._runs.get(run_id)
+            return run.model_copy() if run is not None else None
+
+    def runs(self) -> List[ProtocolRun]:
+        with self._lock:
+            return [run.model_copy() for run in self._runs.values()]
+
+    # ── Streaming ──────────────────────────────────────────────────────
+
+    async def subscribe(self, run_id: str) -> AsyncIterator[ProtocolRun]:
+        """Yield the current snapshot, then each update until the run finishes."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[ProtocolRun] = asyncio.Queue(maxsize=1)
+        entry = (loop, queue)
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return
+            snapshot = run.model_copy()
+            self._subscribers.setdefault(run_id, set()).add(entry)
+        try:
+            yield snapshot
+            while snapshot.status not in _FINISHED:
+                snapshot = await queue.get()
+                yield snapshot
+        finally:
+            with self._lock:
+                self._subscribers.get(run_id, set()).discard(entry)
+
+    def _publish(self, run: ProtocolRun) -> None:
+        with self._lock:
+            snapshot = run.model_copy()
+            subscribers = list(self._subscribers.get(run.id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, snapshot)
+            except RuntimeError:
+                pass  # subscriber's loop has shut down
+
+    # ── Worker ─────────────────────────────────────────────────────────
+
+    def _update(self, run: ProtocolRun, **changes: Any) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                setattr(run, key, value)
+        self._publish(run)
+
+    def _execute(self, run: ProtocolRun, steps: List[PreparedStep]) -> None:
+        self._update(run, status="running", started_at=time.time())
+        status, error = "done", None
+        try:
+            for index, (command, execute) in enumerate(steps):
+                if run.id in self._cancel:
+                    status = "cancelled"
+                    break
+                self._update(run, current_step=index, current_command=command)
+                execute()
+                self._update(run, steps_completed=index + 1)
+        except Exception as e:
+            logger.exception("Protocol run %s failed", run.id)
+            status, error = "failed", str(e)
+        finally:
+            with self._lock:
+                self._active = None
+                self._cancel.discard(run.id)
+            self._update(
+                run,
+                status=status,
+                error=error,
+                current_step=None,
+                current_command=None,
+                finished_at=time.time(),
+            )
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
@@ -0,0 +1,184 @@
+"""Prioritized single-thread executor for everything that talks to the gantry.
+
+The serial port can only do one thing at a time. Instead of a global lock
+taken first-come-first-served, callers submit work to one dedicated thread
+through a priority queue: real-time work (jogs, status queries) is picked
+before motion, and motion before configuration commands. A command that is
+already executing is never interrupted, so priorities decide what runs
+*next*, not what runs *now*.
+
+Each job carries a deadline; jobs that wait past it fail with
+``CommandTimeoutError`` instead of running late. The queue is bounded and
+rejects new work with ``QueueFullError`` so callers get backpressure rather
+than an ever-growing backlog.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    REALTIME = 0  # jogs, status queries
+    MOTION = 1  # moves, homing, protocol steps
+    CONFIG = 2  # unlock, settings, connect/disconnect
+
+
+class QueueFullError(RuntimeError):
+    """The actor's queue is at capacity; retry later."""
+
+
+class CommandTimeoutError(TimeoutError):
+    """A command did not start (or finish) within its timeout."""
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    fn: Optional[Callable[[], Any]] = field(compare=False)
+    future: concurrent.futures.Future = field(compare=False)
+    deadline: Optional[float] = field(compare=False)
+    name: str = field(compare=False, default="")
+
+
+class SerialActor:
+    def __init__(self, max_depth: int = 32) -> None:
+        self.max_depth = max_depth
+        self._queue: queue.PriorityQueue[_Job] = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._depth: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._current: Optional[str] = None
+        self._counters = {"completed": 0, "failed": 0, "expired": 0, "rejected": 0}
+
+    # ── Submission ─────────────────────────────────────────────────────
+
+    def submit(
+        self,
+        fn: Callable[[], T],
+        *,
+        priority: Priority,
+        timeout: Optional[float] = None,
+        name: str = "",
+    ) -> concurrent.futures.Future[T]:
+        """Queue *fn*; its future fails with CommandTimeoutError if it can't start in time."""
+        future: concurrent.futures.Future[T] = concurrent.futures.Future()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            if sum(self._depth.values()) >= self.max_depth:
+                self._counters["rejected"] += 1
+                raise QueueFullError(
+                    f"Serial queue full ({self.max_depth} pending commands)"
+                )
+            self._depth[priority] += 1
+            self._ensure_thread_locked()
+        self._queue.put(_Job(priority, next(self._seq), fn, future, deadline, name or fn.__name__))
+        return future
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        *,
+        priority: Priority,
+        timeout: Optional[float] = None,
+        name: str = "",
+    ) -> T:
+        """Submit and block the calling thread until *fn* has run."""
+        future = self.submit(fn, priority=priority, timeout=timeout, name=name)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise CommandTimeoutError(f"{name or fn.__name__} timed out after {timeout}s")
+
+    async def run(
+        self,
+        fn: Callable[[], T],
+        *,
+        priority: Priority,
+        timeout: Optional[float] = None,
+        name: str = "",
+    ) -> T:
+        """Submit and await completion without occupying a threadpool worker."""
+        future = self.submit(fn, priority=priority, timeout=timeout, name=name)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise CommandTimeoutError(f"{name or fn.__name__} timed out after {timeout}s")
+
+    # ── Introspection ──────────────────────────────────────────────────
+
+    @property
+    def busy(self) -> bool:
+        """True while a command is executing on the port."""
+        return self._current is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "depth": {p.name.lower(): n for p, n in self._depth.items()},
+                "max_depth": self.max_depth,
+                "current": self._current,
+                **self._counters,
+            }
+
+    # ── Worker ─────────────────────────────────────────────────────────
+
+    def _ensure_thread_locked(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="zoo-serial-actor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker after the commands already queued."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_Job(len(Priority), next(self._seq), None, concurrent.futures.Future(), None))
+            thread.join(timeout=5.0)
+
+    def _loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job.fn is None:
+                return
+            with self._lock:
+                self._depth[Priority(job.priority)] -= 1
+            if not job.future.set_running_or_notify_cancel():
+                continue  # caller gave up while it was queued
+            if job.deadline is not None and time.monotonic() > job.deadline:
+                with self._lock:
+                    self._counters["expired"] += 1
+                job.future.set_exception(
+                    CommandTimeoutError(f"{job.name} expired before it could run")
+                )
+                continue
+            self._current = job.name
+            try:
+                result = job.fn()
+            except BaseException as e:
+                with self._lock:
+                    self._counters["failed"] += 1
+                job.future.set_exception(e)
+            else:
+                with self._lock:
+                    self._counters["completed"] += 1
+                job.future.set_result(result)
+            finally:
+                self._current = None
@@ -0,0 +1,124 @@
+"""Dry-run a compiled protocol plan and estimate its execution time.
+
+Instead of driving a gantry, each step is replayed against an analytic
+motion model. A move is a straight line with a trapezoidal velocity
+profile: accelerate, cruise at the feed rate, decelerate. Short moves
+never reach the feed rate and become triangular. Liquid handling adds
+time in proportion to its volume, and every other command adds a fixed
+overhead. Targets outside the gantry's working volume are reported as
+violations rather than errors, so a plan can still be inspected end to
+end.
+
+Feed rate (mm/min) and acceleration (mm/s²) come from the gantry config's
+``cnc`` section (``feed_rate``, ``acceleration``) when present.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, List, Optional
+
+from zoo.models.gantry import GantryConfig
+from zoo.models.protocol import (
+    PlanStep,
+    Position3D,
+    ProtocolPlan,
+    SimulatedStep,
+    SimulationReport,
+)
+
+DEFAULT_FEED_RATE = 2000.0  # mm/min
+DEFAULT_ACCELERATION = 500.0  # mm/s²
+# Pipette flow rate used to time aspirate/dispense, in µL/s.
+LIQUID_FLOW_UL_S = 50.0
+# Fixed per-command overhead (s) beyond travel; other commands use the default.
+COMMAND_OVERHEAD_S: Dict[str, float] = {
+    "aspirate": 0.5,
+    "dispense": 0.5,
+    "scan": 5.0,
+}
+DEFAULT_OVERHEAD_S = 0.2
+
+
+def move_time(distance: float, feed_rate: float, acceleration: float) -> float:
+    """Seconds for a straight move of *distance* mm from rest to rest."""
+    if distance <= 0:
+        return 0.0
+    v = feed_rate / 60.0
+    if distance >= v * v / acceleration:
+        return distance / v + v / acceleration
+    return 2.0 * math.sqrt(distance / acceleration)
+
+
+def _motion_limits(gantry: GantryConfig) -> tuple[float, float]:
+    extra = (gantry.cnc.model_extra or {}) if gantry.cnc is not None else {}
+    feed = float(extra.get("feed_rate") or DEFAULT_FEED_RATE)
+    accel = float(extra.get("acceleration") or DEFAULT_ACCELERATION)
+    return feed, accel
+
+
+def _step_overhead(step: PlanStep) -> float:
+    seconds = COMMAND_OVERHEAD_S.get(step.command, DEFAULT_OVERHEAD_S)
+    volume = step.args.get("volume_ul")
+    if isinstance(volume, (int, float)):
+        seconds += abs(volume) / LIQUID_FLOW_UL_S
+    return seconds
+
+
+def simulate(
+    plan: ProtocolPlan,
+    *,
+    start: Optional[Position3D] = None,
+    slowest: int = 5,
+) -> SimulationReport:
+    """Estimate per-step and total time, and XYZ travel, for *plan*."""
+    feed, accel = _motion_limits(plan.gantry)
+    wv = plan.gantry.working_volume
+    x, y, z = (start.x, start.y, start.z) if start is not None else (0.0, 0.0, 0.0)
+    clock = travel = tx = ty = tz = 0.0
+    steps: List[SimulatedStep] = []
+    violations: List[str] = []
+
+    for step in plan.steps:
+        distance = 0.0
+        target = step.coordinates
+        if target is not None:
+            if not (
+                wv.x_min <= target.x <= wv.x_max
+                and wv.y_min <= target.y <= wv.y_max
+                and wv.z_min <= target.z <= wv.z_max
+            ):
+                violations.append(
+                    f"Step {step.index} ({step.command}): {step.position} "
+                    f"({target.x}, {target.y}, {target.z}) is outside the working volume"
+                )
+            dx, dy, dz = abs(target.x - x), abs(target.y - y), abs(target.z - z)
+            distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+            tx += dx
+            ty += dy
+            tz += dz
+            x, y, z = target.x, target.y, target.z
+        duration = move_time(distance, feed, accel) + _step_overhead(step)
+        steps.append(
+            SimulatedStep(
+                index=step.index,
+                command=step.command,
+                position=step.position,
+                start_s=round(clock, 3),
+                duration_s=round(duration, 3),
+                travel_mm=round(distance, 3),
+            )
+        )
+        clock += duration
+        travel += distance
+
+    return SimulationReport(
+        digest=plan.digest,
+        total_time_s=round(clock, 3),
+        travel_mm=round(travel, 3),
+        travel_xyz_mm=Position3D(x=round(tx, 3), y=round(ty, 3), z=round(tz, 3)),
+        steps=steps,
+        slowest=heapq.nlargest(slowest, steps, key=lambda s: s.duration_s),
+        violations=violations,
+    )
@@ -0,0 +1,167 @@
+"""Merge consecutive single transfers into multi-dispense trips.
+
+A protocol written as ``aspirate S, v1; dispense D1, v1; aspirate S, v2;
+dispense D2, v2; ...`` sends the gantry back to the source before every
+dispense. When consecutive transfers draw the same source with the same
+aspirate settings, one aspiration of ``v1 + v2 + ...`` can serve all of
+them, as long as the total stays within the pipette's ``max_volume``.
+Dispenses keep their order, targets and volumes. Transfers outside the
+pipette's ``[min_volume, max_volume]`` range are never merged.
+
+Only the chosen pipette's transfers are merged. A step naming another
+instrument is a barrier, like any other step that is not a transfer.
+A step naming no instrument counts as the pipette's only when it is the
+board's sole pipette; otherwise it is not known which one runs it.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+from zoo.models.protocol import (
+    PlanStep,
+    ProtocolPlan,
+    ProtocolStepConfig,
+    TripBatch,
+    TripBatchingReport,
+)
+from zoo.services.simulator import simulate
+
+
+def _volume(step: PlanStep) -> Optional[float]:
+    volume = step.args.get("volume_ul")
+    return float(volume) if isinstance(volume, (int, float)) else None
+
+
+def _aspirate_key(step: PlanStep) -> Tuple[Any, ...]:
+    """Everything about an aspiration except its volume."""
+    return (step.position, sorted((k, repr(v)) for k, v in step.args.items() if k != "volume_ul"))
+
+
+def _owned(step: PlanStep, instrument: Optional[str], sole: bool) -> bool:
+    """True if *step* runs on *instrument* (any step when *instrument* is None)."""
+    if instrument is None:
+        return True
+    return step.instrument == instrument or (step.instrument is None and sole)
+
+
+def _is_transfer(
+    steps: List[PlanStep],
+    i: int,
+    min_volume: float,
+    max_volume: float,
+    instrument: Optional[str] = None,
+    sole: bool = True,
+) -> bool:
+    if i + 1 >= len(steps):
+        return False
+    aspirate, dispense = steps[i], steps[i + 1]
+    if aspirate.command != "aspirate" or dispense.command != "dispense":
+        return False
+    if not (_owned(aspirate, instrument, sole) and _owned(dispense, instrument, sole)):
+        return False
+    if aspirate.position is None:
+        return False
+    volume = _volume(aspirate)
+    return volume is not None and volume == _volume(dispense) and min_volume <= volume <= max_volume
+
+
+def batch_trips(
+    steps: List[PlanStep],
+    min_volume: float,
+    max_volume: float,
+    instrument: Optional[str] = None,
+    sole: bool = True,
+) -> Tuple[List[PlanStep], List[TripBatch]]:
+    """Return *steps* with mergeable transfers combined, and the merged batches.
+
+    With *instrument*, only that pipette's transfers are merged; *sole*
+    says whether it is the board's only pipette (see module docstring).
+    """
+
+    def is_transfer(i: int) -> bool:
+        return _is_transfer(steps, i, min_volume, max_volume, instrument, sole)
+
+    out: List[PlanStep] = []
+    batches: List[TripBatch] = []
+    i = 0
+    while i < len(steps):
+        if not is_transfer(i):
+            out.append(steps[i])
+            i += 1
+            continue
+        first = steps[i]
+        key = _aspirate_key(first)
+        total = _volume(first)
+        dispenses = [steps[i + 1]]
+        j = i + 2
+        while (
+            is_transfer(j)
+            and _aspirate_key(steps[j]) == key
+            and total + _volume(steps[j]) <= max_volume
+        ):
+            total += _volume(steps[j])
+            dispenses.append(steps[j + 1])
+            j += 2
+        if len(dispenses) == 1:
+            out.extend(steps[i : i + 2])
+        else:
+            out.append(first.model_copy(update={"args": {**first.args, "volume_ul": total}}))
+            out.extend(dispenses)
+            batches.append(
+                TripBatch(
+                    source=first.position,
+                    aspirate_volume_ul=total,
+                    dispense_steps=[d.index for d in dispenses],
+                )
+            )
+        i = j
+    return out, batches
+
+
+def _to_protocol(
+    steps: List[PlanStep], raw_steps: List[Dict[str, Any]]
+) -> List[ProtocolStepConfig]:
+    """Rebuild YAML-level steps, keeping the author's args except merged volumes."""
+    protocol = []
+    for step in steps:
+        raw = raw_steps[step.index]
+        command = next(iter(raw))
+        args = copy.deepcopy(raw[command] or {})
+        if step.command == "aspirate" and args.get("volume_ul") != step.args.get("volume_ul"):
+            args["volume_ul"] = step.args["volume_ul"]
+        protocol.append(ProtocolStepConfig(command=command, args=args))
+    return protocol
+
+
+def plan_trip_batches(
+    plan: ProtocolPlan,
+    raw_steps: List[Dict[str, Any]],
+    *,
+    pipette: str,
+    min_volume: float,
+    max_volume: float,
+    sole: bool = True,
+) -> TripBatchingReport:
+    """Propose a multi-dispense version of *plan* for *pipette* and estimate
+    the time saved."""
+    steps, batches = batch_trips(plan.steps, min_volume, max_volume, pipette, sole)
+    before = simulate(plan, slowest=0).total_time_s
+    after = simulate(plan.model_copy(update={"steps": steps}), slowest=0).total_time_s
+
+    def trips(steps: List[PlanStep]) -> int:
+        return sum(1 for s in steps if s.command == "aspirate" and _owned(s, pipette, sole))
+
+    return TripBatchingReport(
+        pipette=pipette,
+        min_volume=min_volume,
+        max_volume=max_volume,
+        trips_before=trips(plan.steps),
+        trips_after=trips(steps),
+        time_before_s=before,
+        time_after_s=after,
+        time_saved_s=round(before - after, 3),
+        batches=batches,
+        protocol=_to_protocol(steps, raw_steps),
+    )
@@ -0,0 +1,132 @@
+"""Batched well-coordinate derivation for well plates.
+
+PANDA_CORE's ``_derive_wells_from_calibration`` builds one Python object
+per well, which dominates deck responses with 384- and 1536-well plates.
+A plate's wells form an affine grid, ``A1 + row * dr + col * dc``. The
+basis is read off PANDA_CORE's own derivation on a 2×2 copy of the entry,
+so calibration and offset semantics stay PANDA_CORE's. Every well of a
+plate is then one numpy broadcast.
+
+Well ids and their (row, column) indices depend only on the plate's shape.
+They are captured once per shape from a full PANDA_CORE derivation, which
+also keeps the id convention identical for plates past row Z.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from deck.loader import _derive_wells_from_calibration
+from deck.yaml_schema import WellPlateYamlEntry
+
+from zoo.services.memo import SingleFlightLRU, canonical_key
+
+
+@dataclass(frozen=True)
+class WellGrid:
+    """All wells of a plate: ids in PANDA_CORE order and an ``(n, 3)`` array."""
+
+    ids: Tuple[str, ...]
+    coords: np.ndarray
+
+    def rounded(self) -> np.ndarray:
+        return np.round(self.coords, 3)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Per-well ``{"x", "y", "z"}`` mapping, rounded to 0.001 mm."""
+        return {
+            wid: {"x": round(x, 3), "y": round(y, 3), "z": round(z, 3)}
+            for wid, (x, y, z) in zip(self.ids, self.coords.tolist())
+        }
+
+    @cached_property
+    def columns(self) -> bytes:
+        """Rounded x, y and z as consecutive little-endian float32 arrays."""
+        return np.ascontiguousarray(self.rounded().T, dtype="<f4").tobytes()
+
+    @cached_property
+    def json(self) -> bytes:
+        """``to_dict()`` serialised once; grids are immutable."""
+        return json.dumps(self.to_dict(), separators=(",", ":")).encode()
+
+
+@dataclass(frozen=True)
+class _Layout:
+    ids: Tuple[str, ...]
+    rows: np.ndarray
+    cols: np.ndarray
+
+
+_layouts: Dict[Tuple[int, int], _Layout] = {}
+_lock = threading.Lock()
+
+
+def _as_array(wells: Dict[str, object]) -> Tuple[Tuple[str, ...], np.ndarray]:
+    ids = tuple(wells)
+    coords = np.array([(c.x, c.y, c.z) for c in wells.values()], dtype=np.float64)
+    return ids, coords
+
+
+def _basis(entry: WellPlateYamlEntry) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Origin (A1), row step and column step of the plate's grid."""
+    wells = _derive_wells_from_calibration(entry.model_copy(update={"rows": 2, "columns": 2}))
+    a1, a2, b1 = (np.array([w.x, w.y, w.z]) for w in (wells["A1"], wells["A2"], wells["B1"]))
+    return a1, b1 - a1, a2 - a1
+
+
+def _learn_layout(
+    ids: Tuple[str, ...], coords: np.ndarray, basis: Tuple[np.ndarray, ...]
+) -> Optional[_Layout]:
+    """Recover each well's (row, column) from a full derivation, if it is affine."""
+    origin, row_step, col_step = basis
+    steps = np.column_stack([row_step, col_step])
+    if np.linalg.matrix_rank(steps) < 2:
+        return None  # degenerate calibration; can't recover grid indices
+    indices, *_ = np.linalg.lstsq(steps, (coords - origin).T, rcond=None)
+    rows, cols = np.rint(indices).astype(np.int64)
+    rebuilt = origin + rows[:, None] * row_step + cols[:, None] * col_step
+    if not np.allclose(rebuilt, coords, rtol=0, atol=1e-6):
+        return None  # not an affine grid
+    return _Layout(ids=ids, rows=rows, cols=cols)
+
+
+def derive_well_grid(entry: WellPlateYamlEntry) -> WellGrid:
+    """Compute every well of *entry* in one batched operation."""
+    basis = _basis(entry)
+    shape = (entry.rows, entry.columns)
+    with _lock:
+        layout = _layouts.get(shape)
+    if layout is None:
+        # First plate of this shape: PANDA_CORE's result is the answer, and
+        # teaches us the id layout for the next one.
+        ids, coords = _as_array(_derive_wells_from_calibration(entry))
+        learned = _learn_layout(ids, coords, basis)
+        if learned is not None:
+            with _lock:
+                _layouts.setdefault(shape, learned)
+        return WellGrid(ids=ids, coords=coords)
+    origin, row_step, col_step = basis
+    coords = origin + layout.rows[:, None] * row_step + layout.cols[:, None] * col_step
+    return WellGrid(ids=layout.ids, coords=coords)
+
+
+# Grids by canonical hash of the raw plate entry. Deck editing previews the
+# same plates over and over; only the plate being edited misses.
+_grid_cache: SingleFlightLRU[WellGrid] = SingleFlightLRU(max_entries=256)
+
+
+def well_grid_for_config(config: Dict[str, Any]) -> WellGrid:
+    """Validate and derive a plate entry, memoised by its content."""
+    return _grid_cache.get(
+        canonical_key(config),
+        lambda: derive_well_grid(WellPlateYamlEntry.model_validate(config)),
+    )
+
+
+def grid_cache_stats() -> Dict[str, int]:
+    return _grid_cache.stats()
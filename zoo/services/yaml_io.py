@@ -1,22 +1,323 @@
-"""Read/write YAML config files safely."""
+"""Read/write YAML config files safely.
+
+Parsed documents are kept in a shared, size-bounded cache keyed by the
+resolved path and the file's ``(mtime, size, inode)`` signature, so repeated
+GETs of an unchanged config skip the disk read and the YAML parse. A
+``watchfiles`` watcher on the configs directory evicts entries as soon as a
+file changes; the stat signature keeps the cache correct even when the
+watcher misses an event (e.g. edits made on another NFS client).
+
+Writes are atomic and coalesced (see ``config_writer``). Rewriting an
+existing file commits the new version in memory and returns; the disk
+write follows once the file has been quiet for a moment. Until then,
+``file_signature``, ``read_yaml`` and ``read_text`` serve the pending
+version, so every cache and ETag keyed by the signature stays consistent.
+Code that hands a path to something reading the disk directly, such as
+PANDA_CORE's loaders, must call ``flush`` first.
+"""
 
 from __future__ import annotations
 
+import copy
+import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+import watchfiles
 import yaml
 
+from zoo.services.config_writer import CoalescingWriter, PendingWrite, atomic_write
+
+logger = logging.getLogger(__name__)
+
+# (st_mtime_ns, st_size, st_ino) — changes whenever the file is rewritten.
+FileSignature = Tuple[int, int, int]
+
+ChangeListener = Callable[[watchfiles.Change, Path], None]
+
+
+def file_signature(path: Path) -> FileSignature:
+    """Version key of the (resolved) *path*, including a pending write."""
+    pending = _writer.pending(path)
+    if pending is not None:
+        return pending.signature
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def disk_signature(path: Path) -> Optional[FileSignature]:
+    """Signature of the (resolved) *path* on disk; None while a write is pending."""
+    if _writer.pending(path) is not None:
+        return None
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ParsedConfigCache:
+    """Thread-safe LRU of parsed YAML documents.
+
+    Entries are only served while the file's current signature matches the
+    one recorded when the entry was stored.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Path, Tuple[FileSignature, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Path, signature: FileSignature) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Path, signature: FileSignature, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (signature, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def rekey(self, key: Path, old: FileSignature, new: FileSignature) -> None:
+        """Re-file *key*'s entry from signature *old* to *new* (same contents)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == old:
+                self._entries[key] = (new, entry[1])
+
+    def invalidate(self, key: Optional[Path] = None) -> None:
+        """Drop one entry, or every entry when *key* is None."""
+        with self._lock:
+            if key is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+# Shared cache — all routers read configs through read_yaml().
+_cache = ParsedConfigCache()
+
+
+def _written(path: Path, pending: PendingWrite) -> None:
+    # Same document, now on disk: keep the parsed entry under the real signature.
+    try:
+        st = path.stat()
+    except OSError:
+        return
+    _cache.rekey(path, pending.signature, (st.st_mtime_ns, st.st_size, st.st_ino))
+
+
+_writer = CoalescingWriter(on_written=_written)
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and occupancy of the parsed-config cache."""
+    return _cache.stats()
+
+
+def clear_cache() -> None:
+    """Empty the parsed-config cache and reset its counters."""
+    _cache.invalidate()
+    _cache.reset_stats()
+
+
+def write_stats() -> Dict[str, int]:
+    """Pending, coalesced and completed config writes."""
+    return _writer.stats()
+
+
+def flush(paths: Optional[Iterable[Path]] = None) -> None:
+    """Put pending writes of *paths* (all files when None) on disk now."""
+    _writer.flush(None if paths is None else [p.resolve() for p in paths])
+
+
+def read_text(path: Path) -> str:
+    """The current text of *path*, including a write that is still pending."""
+    pending = _writer.pending(path.resolve())
+    if pending is not None:
+        return pending.data.decode()
+    return path.read_text()
+
 
 def read_yaml(path: Path) -> Dict[str, Any]:
-    with path.open() as f:
-        data = yaml.safe_load(f)
-    return data if data is not None else {}
+    key = path.resolve()
+    pending = _writer.pending(key)
+    try:
+        # Stat before reading: if the file changes mid-read we store the old
+        # signature, which only costs a re-parse on the next call.
+        signature: Optional[FileSignature] = (
+            pending.signature if pending is not None else file_signature(key)
+        )
+    except OSError:
+        signature = None
+    if signature is not None:
+        cached = _cache.get(key, signature)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+    if pending is not None:
+        data = yaml.safe_load(pending.data)
+    else:
+        with path.open() as f:
+            data = yaml.safe_load(f)
+    data = data if data is not None else {}
+    if signature is not None:
+        _cache.put(key, signature, copy.deepcopy(data))
+    return data
+
+
+def write_text(path: Path, text: str) -> FileSignature:
+    """Atomically replace *path* with *text*; returns the new signature.
+
+    A new file is written before returning, so it shows up in listings
+    and existence checks straight away. Rewrites of an existing file are
+    committed in memory and written in the background. Either way the
+    flat-layout classification index is updated before returning.
+    """
+    from zoo.services.config_index import refresh_path
+
+    key = path.resolve()
+    data = text.encode()
+    if _writer.pending(key) is None and not key.exists():
+        atomic_write(key, data)
+        signature = file_signature(key)
+    else:
+        signature = _writer.submit(key, data)
+    # Don't wait for the watcher: a listing right after the save must see it.
+    refresh_path(key)
+    return signature
 
 
 def write_yaml(path: Path, data: Dict[str, Any]) -> None:
-    with path.open("w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    text = yaml.dump(data, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    signature = write_text(path, text)
+    # Write-through: the document we just dumped is what the next read
+    # would parse, so store it under the new signature.
+    _cache.put(path.resolve(), signature, copy.deepcopy(data))
+
+
+# ── File watching ──────────────────────────────────────────────────────
+
+_listeners: List[ChangeListener] = []
+_watch_thread: Optional[threading.Thread] = None
+_watch_stop: Optional[threading.Event] = None
+_watch_lock = threading.Lock()
+_watch_dir: Optional[Path] = None
+# Bumped on every (re)start so consumers can tell they may have missed events.
+_watch_generation = 0
+
+
+def add_change_listener(listener: ChangeListener) -> None:
+    """Register a callback invoked for every YAML change under the watched dir."""
+    _listeners.append(listener)
+
+
+def _yaml_filter(change: watchfiles.Change, path: str) -> bool:
+    return path.endswith((".yaml", ".yml"))
+
+
+def _watch_loop(directory: Path, stop: threading.Event) -> None:
+    try:
+        for changes in watchfiles.watch(
+            directory, watch_filter=_yaml_filter, stop_event=stop, raise_interrupt=False
+        ):
+            for change, raw_path in changes:
+                path = Path(raw_path).resolve()
+                _cache.invalidate(path)
+                for listener in list(_listeners):
+                    try:
+                        listener(change, path)
+                    except Exception:
+                        logger.exception("Config change listener failed for %s", path)
+    except Exception as e:
+        logger.warning("Config watcher for %s stopped: %s", directory, e)
+
+
+def watch_configs(directory: Path) -> None:
+    """(Re)start the background watcher on *directory*.
+
+    Any previous watcher is stopped first, so this can be called again
+    whenever the PANDA_CORE path changes. Missing directories are ignored.
+    """
+    global _watch_thread, _watch_stop, _watch_dir, _watch_generation
+    with _watch_lock:
+        _stop_watching_locked()
+        if not directory.is_dir():
+            return
+        _watch_dir = directory.resolve()
+        _watch_generation += 1
+        _watch_stop = threading.Event()
+        _watch_thread = threading.Thread(
+            target=_watch_loop,
+            args=(directory, _watch_stop),
+            name="zoo-config-watcher",
+            daemon=True,
+        )
+        _watch_thread.start()
+
+
+def stop_watching() -> None:
+    with _watch_lock:
+        _stop_watching_locked()
+
+
+def watch_state() -> Tuple[Optional[Path], int]:
+    """Directory the watcher currently covers (None if stopped) and its generation."""
+    if _watch_thread is None or not _watch_thread.is_alive():
+        return None, _watch_generation
+    return _watch_dir, _watch_generation
+
+
+def _stop_watching_locked() -> None:
+    global _watch_thread, _watch_stop, _watch_dir
+    if _watch_stop is not None:
+        _watch_stop.set()
+    if _watch_thread is not None:
+        _watch_thread.join(timeout=2.0)
+    _watch_thread = None
+    _watch_stop = None
+    _watch_dir = None
+    # Anything cached while unwatched may belong to the old directory.
+    _cache.invalidate()
+
+
+# Top-level key -> config kind, in classify_config's precedence order.
+_KIND_KEYS = {
+    "labware": "deck",
+    "instruments": "board",
+    "working_volume": "gantry",
+    "protocol": "protocol",
+}
+
+# libyaml's parser when PyYAML was built with it; the pure-Python one otherwise.
+_EventLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def classify_config(data: Dict[str, Any]) -> Optional[str]:
@@ -32,6 +333,49 @@ def classify_config(data: Dict[str, Any]) -> Optional[str]:
     return None
 
 
+def classify_yaml(stream: Union[str, IO[str]]) -> Optional[str]:
+    """Classify a YAML document from its top-level keys without building it.
+
+    Walks the parser's event stream and returns as soon as a key that
+    ``classify_config`` recognises appears at the top level, so the values
+    (e.g. a huge protocol list) are never materialised and usually never
+    even parsed. Unlike ``classify_config``, the first recognised key wins;
+    PANDA_CORE configs only ever carry one of them.
+    """
+    depth = 0
+    expect_key = True
+    for event in yaml.parse(stream, Loader=_EventLoader):
+        if isinstance(event, yaml.CollectionStartEvent):
+            if depth == 0 and not isinstance(event, yaml.MappingStartEvent):
+                return None
+            depth += 1
+        elif isinstance(event, yaml.CollectionEndEvent):
+            depth -= 1
+            if depth == 0:
+                return None
+            if depth == 1:
+                expect_key = not expect_key
+        elif isinstance(event, (yaml.ScalarEvent, yaml.AliasEvent)):
+            if depth == 0:
+                return None
+            if depth == 1:
+                if expect_key and isinstance(event, yaml.ScalarEvent):
+                    kind = _KIND_KEYS.get(event.value)
+                    if kind is not None:
+                        return kind
+                expect_key = not expect_key
+    return None
+
+
+def classify_config_file(path: Path) -> Optional[str]:
+    """Classify a config file by streaming its header (see ``classify_yaml``)."""
+    pending = _writer.pending(path.resolve())
+    if pending is not None:
+        return classify_yaml(pending.data.decode())
+    with path.open() as f:
+        return classify_yaml(f)
+
+
 def resolve_config_path(configs_dir: Path, kind: str, filename: str) -> Path:
     """Return the full path for a config file, using the subdirectory if it exists."""
     sub = configs_dir / kind
@@ -44,22 +388,16 @@ def list_configs(configs_dir: Path, kind: str) -> List[str]:
     """List YAML filenames for the given kind.
 
     Checks ``configs_dir/<kind>/`` first (PANDA_CORE's standard layout),
-    then falls back to a flat scan of ``configs_dir/`` with content-based
-    classification.
+    then falls back to the persistent content-based classification index
+    of ``configs_dir/``.
     """
+    from zoo.services.config_index import get_index
+
     sub = configs_dir / kind
     if sub.is_dir():
         return sorted(p.name for p in sub.glob("*.yaml"))
 
     # Fallback: flat directory with content-based classification.
-    results = []
     if not configs_dir.is_dir():
-        return results
-    for p in sorted(configs_dir.glob("*.yaml")):
-        try:
-            data = read_yaml(p)
-            if classify_config(data) == kind:
-                results.append(p.name)
-        except Exception:
-            continue
-    return results
+        return []
+    return get_index(configs_dir).list(kind)